@@ -35,12 +35,13 @@
 
 /*parseArgs return values:
 *	0: Success
-*	1: not yet implemented
+*	1: not yet implemented or invalid wrapper
 *	2: not WrapperFactory
 */
 int parseArgs(PyObject* factobj, ...){
   PyObject* wrapperObj;
   char* function=NULL;
+  int parseRet;
   va_list args;
   va_start(args,factobj);
 
@@ -53,11 +54,13 @@ int parseArgs(PyObject* factobj, ...){
     wrapperObj = PyObject_GetAttrString(factobj, "function");
     if(wrapperObj == NULL) {
       PyErr_SetString(PyExc_TypeError, "Error when calling PyObject_GetAttrString()");
+      va_end(args);
       return 1;
     }
 
     function = PyUnicode_AsUTF8(wrapperObj);
-    
+    Py_DECREF(wrapperObj);
+
     /**
        Function name found.
        It searches for a parser which can manage this format of wrapper
@@ -67,208 +70,251 @@ int parseArgs(PyObject* factobj, ...){
 	 Function : computeSimilarityMatrix
 	 Parse the wrapper given its format
       */
-      parseLibscoreComputation(factobj,args);
+      parseRet = parseLibscoreComputation(factobj,args);
     }
     else if(!strcmp(function,"_libNeedleman.alignMessages")){
       /**
 	 Function : alignMessages
 	 Parse the wrapper given its format
       */
-      parseLibNeedleman(factobj,args);
+      parseRet = parseLibNeedleman(factobj,args);
     }
 
     else{
-      PyErr_SetObject(PyExc_NameError, PyBytes_FromFormat("%s not yet implemented",function));
+      PyErr_Format(PyExc_NameError, "%s not yet implemented",function);
+      va_end(args);
       return 1;
     }
-    return 0;
+    va_end(args);
+    return parseRet;
   }
   else{
     PyErr_SetString(PyExc_TypeError, "Wrong argument type: must be a WrapperArgsFactory");
+    va_end(args);
     return 2;
   }
 
 }
 
-void parseLibscoreComputation(PyObject* factobj, va_list args){
-  unsigned int i;
-  PyObject* pysize = NULL;
+int parseLibscoreComputation(PyObject* factobj, va_list args){
   unsigned int* nbmess = va_arg(args,unsigned int*);
   t_message** messages = va_arg(args,t_message**);
-  unsigned int debugMode = FALSE;
+  t_semanticTag** tags = va_arg(args,t_semanticTag**);
 
-  /**
-     list : which is a list of messages
-  */
-  PyObject* list = PyObject_GetAttrString(factobj, "args");
+  return parsePackedMessages(factobj, nbmess, messages, tags);
+}
 
-  /**
-     Find the number of elements in the list.
-     This number of elements = number of messages (nbmess)
-  */
-  pysize = PyLong_FromSsize_t(PyList_Size(list));
-  *nbmess = (unsigned int) PyLong_AsLong(pysize);
-  Py_XDECREF(pysize);
+int parseLibNeedleman(PyObject* factobj, va_list args){
+  unsigned int* nbmess = va_arg(args,unsigned int*);
+  t_message** messages = va_arg(args,t_message**);
+  t_semanticTag** tags = va_arg(args,t_semanticTag**);
 
-  /**
-     Reserves an array of [nbmess] t_messages
-  */
-  *messages = (t_message*) malloc((*nbmess)*sizeof(t_message));
+  return parsePackedMessages(factobj, nbmess, messages, tags);
+}
 
-  /**
-     Parse each message and store them in the newly allocated array
-  */
-  for(i=0;i<*nbmess;i++){
-    PyObject* item;
-    item = PyList_GetItem(list,(Py_ssize_t)i);
-    parseMessage(item, &((*messages)[i]));
-  }
+/**
+   getUnsignedIntBuffer:
 
-  // [DEBUG] Display the content of the deserialized messages
-  if (debugMode == TRUE) {
-    unsigned int iMessage;
-    for(iMessage=0;iMessage<*nbmess;iMessage++) {
-      t_message message = (*messages)[iMessage];
-      printf("Message : %d (UID Symbol=%s)\n", iMessage, message.uid);
-      printf("Data : ");
-      for (i=0; i< message.len; i++) {
-	printf("%02x", (unsigned char) message.alignment[i]);
-      }
-      printf("\n");
-      printf("Tags : ");
-      for (i=0; i< message.len; i++) {
-	if (message.semanticTags != NULL && message.semanticTags[i] != NULL && message.semanticTags[i]->name != NULL && strcmp(message.semanticTags[i]->name, "None")!=0) {
-	  printf("!!");
-	} else {
-	  printf("..");
-	}
-      }
-      printf("\n");
-    }
-    // [DEBUG]
+   This function retrieves the buffer of an array of unsigned int
+   (array.array('I')) attached to the specified attribute of the wrapper.
+   @return 0 on success
+*/
+static int getUnsignedIntBuffer(PyObject* factobj, const char* name, Py_buffer* view) {
+  PyObject* obj = PyObject_GetAttrString(factobj, name);
+  if (obj == NULL) {
+    return 1;
+  }
+  if (PyObject_GetBuffer(obj, view, PyBUF_FORMAT) != 0) {
+    Py_DECREF(obj);
+    return 1;
   }
+  Py_DECREF(obj);
+  if (view->itemsize != sizeof(unsigned int) || view->format == NULL || strcmp(view->format, "I") != 0) {
+    PyErr_Format(PyExc_TypeError, "Attribute %s of the wrapper must be an array of unsigned int", name);
+    PyBuffer_Release(view);
+    return 1;
+  }
+  return 0;
 }
 
-void parseMessage(PyObject * item, t_message * message) {
-  char * tmp_alignment;
-  unsigned int j;
-  /**
-     message.alignment contains the message.getReducedStringData() in python raw format. Its the content of the message. If its during orphan reduction, this content is reduced to the considered section (sliding window).
-  */
-  tmp_alignment = PyBytes_AsString(PyObject_GetAttrString(item, "alignment"));
-  message->alignment = (unsigned char*) tmp_alignment;
-
-  /**
-     message->len contains the size of tmp_alignment
-  **/
-  message->len = (unsigned int) PyLong_AsUnsignedLong(PyObject_GetAttrString(item, "length"));
+int parsePackedMessages(PyObject* factobj, unsigned int* nbmess, t_message** messages, t_semanticTag** tags) {
+  PyObject* data = NULL;
+  PyObject* masks = NULL;
+  PyObject* tagNames = NULL;
+  PyObject* uids = NULL;
+  Py_buffer offsetsView;
+  Py_buffer tagIdsView;
+  Bool hasOffsetsView = FALSE;
+  Bool hasTagIdsView = FALSE;
+  unsigned int* offsets;
+  unsigned int* tagIds;
+  unsigned char* buffer;
+  unsigned char* masksBuffer = NULL;
+  unsigned int lenData;
+  unsigned int nbTags;
+  unsigned int i, j;
+  int ret = 1;
+
+  *nbmess = 0;
+  *messages = NULL;
+  *tags = NULL;
 
   /**
-     message->mask will be allocated (no value in it yet) to contain at least ... ?
+     data : the concatenation of all the messages (it must be immutable
+     as the alignments point into it)
   */
-  message->mask = calloc(message->len,sizeof(unsigned char));
+  data = PyObject_GetAttrString(factobj, "data");
+  if (data == NULL) {
+    goto end;
+  }
+  if (!PyBytes_Check(data)) {
+    PyErr_SetString(PyExc_TypeError, "Attribute data of the wrapper must be bytes");
+    goto end;
+  }
+  buffer = (unsigned char*) PyBytes_AS_STRING(data);
+  lenData = (unsigned int) PyBytes_GET_SIZE(data);
 
   /**
-     message->semanticTags contains the list of tags attached to each half-byte of the alignment
+     masks : the mask (EQUAL or DIFFERENT) of each byte of data, so a
+     message can be the profile of a previous alignment (empty if all the
+     bytes are EQUAL)
   */
-  message->semanticTags = calloc(message->len, sizeof(t_semanticTag));
-
-  // retrieve the list of tags
-  PyObject* listOfSemanticTags = PyObject_GetAttrString(item, "semanticTags");
-
-  // verify its a list
-  if (PyList_CheckExact(listOfSemanticTags) && message->len == (unsigned int)PyList_Size(listOfSemanticTags)) {
-    // every half-byte should be tagged (with no-tag or with a real tag)
-    // parse all the tags
-    for (j=0; j<message->len; j++) {
-      PyObject * listItem = PyList_GetItem(listOfSemanticTags,(Py_ssize_t)j);
-      char * tag = PyUnicode_AsUTF8(listItem);
-
-      message->semanticTags[j] = malloc(sizeof(t_semanticTag));
-      message->semanticTags[j]->name = tag;
+  masks = PyObject_GetAttrString(factobj, "masks");
+  if (masks == NULL) {
+    goto end;
+  }
+  if (!PyBytes_Check(masks)) {
+    PyErr_SetString(PyExc_TypeError, "Attribute masks of the wrapper must be bytes");
+    goto end;
+  }
+  if (PyBytes_GET_SIZE(masks) > 0) {
+    if ((unsigned int) PyBytes_GET_SIZE(masks) != lenData) {
+      PyErr_SetString(PyExc_ValueError, "Inconsistent sizes of the packed messages");
+      goto end;
     }
-  } else {
-    printf("[C-Extension] Error while parsing semantic tags.\n");
+    masksBuffer = (unsigned char*) PyBytes_AS_STRING(masks);
   }
-  /**
-     message->uid contains the UID of the symbol which contains
-     the message.
-
-     Warning: I though it was message's UID, but its not !!
-  */
-  message->uid = PyUnicode_AsUTF8(PyObject_GetAttrString(item, "uid"));
-
-}
-
-
-/**
-   parseLibNeedlman:
-
-   This function parses the arguments wrapper following a specific format.
-   The definition of this format can be found in the Python function:
-   netzob.Common.C_Extensions.WrapperArgsFactory:WrapperArgsFactory.computeSimilarityMatrix()
-   Once parsed, the wrapper reveal arguments which will be stored in the args parameter.
-   Format:
-   - List<Message> with Message: (alignment, mask, length, uid)
-*/
-void parseLibNeedleman(PyObject* factobj, va_list args){
-
-  PyObject* pysize = NULL;
-  unsigned int* nbmess = va_arg(args,unsigned int*);
-  t_message** messages = va_arg(args,t_message**);
-  unsigned int debugMode = FALSE;
-  unsigned int i;
 
   /**
-     list : which is a list of messages
+     offsets : the offset of each message in data, followed by the size of data
+     tagIds : the identifier of the semantic tag attached to each byte of data
   */
-  PyObject* list = PyObject_GetAttrString(factobj, "args");
+  if (getUnsignedIntBuffer(factobj, "offsets", &offsetsView)) {
+    goto end;
+  }
+  hasOffsetsView = TRUE;
+  if (getUnsignedIntBuffer(factobj, "tagIds", &tagIdsView)) {
+    goto end;
+  }
+  hasTagIdsView = TRUE;
+  offsets = (unsigned int*) offsetsView.buf;
+  tagIds = (unsigned int*) tagIdsView.buf;
 
   /**
-     Find the number of elements in the list.
-     This number of elements = number of messages (nbmess)
+     tagNames : the name of each semantic tag identifier
+     uids : the UID of the symbol of each message
   */
-  pysize = PyLong_FromSsize_t(PyList_Size(list));
-  *nbmess = (unsigned int) PyLong_AsLong(pysize);
-  Py_XDECREF(pysize);
+  tagNames = PyObject_GetAttrString(factobj, "tagNames");
+  uids = PyObject_GetAttrString(factobj, "uids");
+  if (tagNames == NULL || uids == NULL) {
+    goto end;
+  }
+  if (!PyList_Check(tagNames) || !PyList_Check(uids)) {
+    PyErr_SetString(PyExc_TypeError, "Attributes tagNames and uids of the wrapper must be lists");
+    goto end;
+  }
 
-  /**
-     Reserves an array of [nbmess] t_messages
-  */
-  *messages = (t_message*) malloc((*nbmess)*sizeof(t_message));
+  if (offsetsView.len / (Py_ssize_t) sizeof(unsigned int) != PyList_Size(uids) + 1
+      || (unsigned int) (tagIdsView.len / sizeof(unsigned int)) != lenData
+      || offsets[PyList_Size(uids)] != lenData) {
+    PyErr_SetString(PyExc_ValueError, "Inconsistent sizes of the packed messages");
+    goto end;
+  }
 
   /**
-     Parse each message and store them in the newly allocated array
+     The semantic tags are allocated once, the messages point into this table
   */
-  for(i=0;i<*nbmess;i++){
-    PyObject* item;
-    item = PyList_GetItem(list,(Py_ssize_t)i);
-    parseMessage(item, &((*messages)[i]));
+  nbTags = (unsigned int) PyList_Size(tagNames);
+  *tags = (t_semanticTag*) malloc((nbTags + 1) * sizeof(t_semanticTag));
+  if (*tags == NULL) {
+    PyErr_NoMemory();
+    goto end;
+  }
+  for (i = 0; i < nbTags; i++) {
+    (*tags)[i].name = PyUnicode_AsUTF8(PyList_GET_ITEM(tagNames, i));
+    if ((*tags)[i].name == NULL) {
+      goto end;
+    }
   }
 
-  // [DEBUG] Display the content of the deserialized messages
-  if (debugMode == TRUE) {
-    unsigned int iMessage;
-    for(iMessage=0;iMessage<*nbmess;iMessage++) {
-      printf("Message : %d\n", iMessage);
-      printf("Data : ");
-      t_message message = (*messages)[iMessage];
-
-      for (i=0; i< message.len; i++) {
-	printf("%02x", (unsigned char) message.alignment[i]);
-      }
-      printf("\n");
-      printf("Tags : ");
-      for (i=0; i< message.len; i++) {
-	if (message.semanticTags != NULL && message.semanticTags[i] != NULL && message.semanticTags[i]->name != NULL && strcmp(message.semanticTags[i]->name, "None")!=0) {
-	  printf("!!");
-	} else {
-	  printf("..");
-	}
+  *nbmess = (unsigned int) PyList_Size(uids);
+  *messages = (t_message*) calloc(*nbmess + 1, sizeof(t_message));
+  if (*messages == NULL) {
+    PyErr_NoMemory();
+    goto end;
+  }
+  for (i = 0; i < *nbmess; i++) {
+    t_message* message = &((*messages)[i]);
+    if (offsets[i] > offsets[i + 1]) {
+      PyErr_SetString(PyExc_ValueError, "Offsets of the packed messages must be sorted");
+      goto end;
+    }
+    message->alignment = buffer + offsets[i];
+    message->len = offsets[i + 1] - offsets[i];
+    message->mask = calloc(message->len, sizeof(unsigned char));
+    message->semanticTags = malloc(message->len * sizeof(t_semanticTag*));
+    // an empty message may legitimately get a NULL pointer from the allocator
+    if (message->len > 0 && (message->mask == NULL || message->semanticTags == NULL)) {
+      PyErr_NoMemory();
+      goto end;
+    }
+    if (masksBuffer != NULL) {
+      memcpy(message->mask, masksBuffer + offsets[i], message->len);
+    }
+    for (j = 0; j < message->len; j++) {
+      unsigned int tagId = tagIds[offsets[i] + j];
+      if (tagId >= nbTags) {
+        PyErr_SetString(PyExc_ValueError, "Unknown semantic tag identifier");
+        goto end;
       }
-      printf("\n");
+      message->semanticTags[j] = &((*tags)[tagId]);
     }
-    // [DEBUG]
+    message->uid = PyUnicode_AsUTF8(PyList_GET_ITEM(uids, i));
+    if (message->uid == NULL) {
+      goto end;
+    }
+  }
+  ret = 0;
+
+ end:
+  if (ret != 0) {
+    freeMessages(*nbmess, *messages, *tags);
+    *nbmess = 0;
+    *messages = NULL;
+    *tags = NULL;
+  }
+  if (hasOffsetsView == TRUE) {
+    PyBuffer_Release(&offsetsView);
+  }
+  if (hasTagIdsView == TRUE) {
+    PyBuffer_Release(&tagIdsView);
   }
+  // the wrapper keeps a reference on these objects during the call
+  Py_XDECREF(data);
+  Py_XDECREF(masks);
+  Py_XDECREF(tagNames);
+  Py_XDECREF(uids);
+  return ret;
+}
 
+void freeMessages(unsigned int nbmess, t_message* messages, t_semanticTag* tags) {
+  unsigned int i;
+  if (messages != NULL) {
+    for (i = 0; i < nbmess; i++) {
+      free(messages[i].mask);
+      free(messages[i].semanticTags);
+    }
+    free(messages);
+  }
+  free(tags);
 }
@@ -39,16 +39,42 @@
 #endif
 #include "commonLib.h"
 #include <math.h>
+#include <limits.h>
 
 //+---------------------------------------------------------------------------+
 //|  alignMessages : align a group of messages and get their common regex
 //+---------------------------------------------------------------------------+
-void alignMessages(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, Bool debugMode);
+void alignMessages(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int bandWidth, Bool debugMode);
+
+//+---------------------------------------------------------------------------+
+//|  alignMessagesWithGuideTree : progressive alignment of a group of messages
+//|   following a guide tree (guideTree holds the two nodes aligned by each of
+//|   the nbMessages-1 merges, node nbMessages+k being the result of merge k).
+//|   Independent subtrees are aligned by nbThreads threads.
+//|   Returns 0 if the alignment could not be computed
+//+---------------------------------------------------------------------------+
+int alignMessagesWithGuideTree(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int * guideTree, unsigned int nbThreads, unsigned int bandWidth, Bool debugMode);
+
+//+---------------------------------------------------------------------------+
+//|  freeProfile : releases the buffers of an alignment computed by
+//|   alignTwoMessages or alignMessagesWithGuideTree (the names of its
+//|   semantic tags are borrowed)
+//+---------------------------------------------------------------------------+
+void freeProfile(t_message * profile);
 
 //+---------------------------------------------------------------------------+
 //| alignTwoMessages : align 2 messages and get common regex
+//|   if bandWidth is not 0, only the cells at most bandWidth diagonals away
+//|   from the diagonals joining the first and last cells are computed
+//+---------------------------------------------------------------------------+
+char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, unsigned int bandWidth, Bool debugMode);
+
+//+---------------------------------------------------------------------------+
+//| alignTwoMessagesWithBound : align 2 messages unless their alignment score
+//|   cannot reach minAlignmentScore (then NULL is returned and resMessage is
+//|   not modified)
 //+---------------------------------------------------------------------------+
-char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, Bool debugMode);
+char* alignTwoMessagesWithBound(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, unsigned int bandWidth, float minAlignmentScore, Bool debugMode);
 
 /*!
  * @function getSimilarityScore
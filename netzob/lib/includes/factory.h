@@ -34,6 +34,13 @@
 #include <stdio.h>
 #include <stdarg.h>
 
+/**
+   parseArgs:
+
+   This function parses the arguments wrapper of the specified function.
+   Its variable arguments are (unsigned int* nbmess, t_message** messages,
+   t_semanticTag** tags), to be released with freeMessages().
+*/
 int parseArgs(PyObject* factobj, ...);
 
 /**
@@ -43,21 +50,32 @@ int parseArgs(PyObject* factobj, ...);
    The definition of this format can be found in the Python function:
    netzob.Common.C_Extensions.WrapperArgsFactory:WrapperArgsFactory.computeSimilarityMatrix()
    Once parsed, the wrapper reveal arguments which will be stored in the args parameter.
-   Format:
-   - List<Message> with Message: (alignment, mask, length, uid)
+   Format: see parsePackedMessages()
 */
-void parseLibscoreComputation(PyObject* factobj, va_list args);
+int parseLibscoreComputation(PyObject* factobj, va_list args);
+
+int parseLibNeedleman(PyObject* factobj, va_list args);
 
-void parseLibNeedleman(PyObject* factobj, va_list args);
+/**
+   parsePackedMessages:
+
+   This function parses the messages packed by the python WrapperArgsFactory:
+   - data : the concatenation of the messages (bytes)
+   - offsets : the offset of each message in data followed by the size of data (array of unsigned int)
+   - tagIds : the identifier of the semantic tag attached to each byte of data (array of unsigned int)
+   - tagNames : the name attached to each identifier of semantic tag (list of str)
+   - uids : the UID of the symbol of each message (list of str)
+   The buffers are not copied: the alignment of each message points into
+   data and its semantic tags point into the table of tags, allocated once.
+   @return 0 on success, otherwise a python exception is set
+*/
+int parsePackedMessages(PyObject* factobj, unsigned int* nbmess, t_message** messages, t_semanticTag** tags);
 
 /**
-   parseMessage:
+   freeMessages:
 
-   This function parses a python Netzob message to its C representation
-   @param item : the PyObject which host the python representation of the message
-   @param message : the message which should host the python extracted message's information
-   @return void
+   This function releases the messages and the table of tags allocated by parseArgs
 */
-void parseMessage(PyObject * item, t_message * message);
+void freeMessages(unsigned int nbmess, t_message* messages, t_semanticTag* tags);
 
 #endif
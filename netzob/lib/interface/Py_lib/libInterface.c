@@ -70,12 +70,18 @@ PyObject* PyInit__libInterface(void) {
   return PyModule_Create(&moduledef);
 }
 
+//+---------------------------------------------------------------------------+
+//| callbackIsFinish : calls the python wrapper (the GIL is acquired if the
+//|                    caller released it)
+//+---------------------------------------------------------------------------+
 int callbackIsFinish(void) {
 	if (python_callback_isFinish != NULL) {
 			int isFinish;
 			PyObject *result_cb;
+			PyGILState_STATE gstate = PyGILState_Ensure();
 			result_cb = PyObject_CallObject(python_callback_isFinish, NULL);
 			if (result_cb == NULL) {
+				PyGILState_Release(gstate);
 				return -1;
 			}
 			if (result_cb == Py_True) {
@@ -87,6 +93,7 @@ int callbackIsFinish(void) {
 				isFinish = -1;
 			}
 			Py_DECREF(result_cb);
+			PyGILState_Release(gstate);
 			return isFinish;
 	}
 	return -1;
@@ -109,14 +116,17 @@ int callbackStatus(int stage, double percent, char* message, ...) {
 	va_end(args);
 	buffer[4095] = '\0';
 	if (python_callback != NULL) {
+		PyGILState_STATE gstate = PyGILState_Ensure();
 		arglist_cb = Py_BuildValue("(i,d,s)", stage, percent, buffer);
 		result_cb = PyObject_CallObject(python_callback, arglist_cb);
 		Py_DECREF(arglist_cb);
 
 		if (result_cb == NULL) {
+		  PyGILState_Release(gstate);
 		  return -1;
 		}
 		Py_DECREF(result_cb);
+		PyGILState_Release(gstate);
 		return 1;
 	}
 	else {
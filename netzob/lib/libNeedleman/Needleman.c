@@ -31,14 +31,135 @@
 //+---------------------------------------------------------------------------+
 //| Import Associated Header
 //+---------------------------------------------------------------------------+
+#ifdef CCALLFORDEBUG
+#define _POSIX_C_SOURCE 200112L
+#endif
 #include "Needleman.h"
 
 #ifdef _WIN32
 #include <stdio.h>
 #include <malloc.h>
+#else
+#include <pthread.h>
+#include <time.h>
+#include <errno.h>
 #endif
 
-void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, Bool debugMode) {
+// Period (in ms) between two calls to the callbacks when aligning in threads
+#define STATUS_PERIOD 250
+
+// Score of the cells which are not in the band (they are never reached)
+#define OUT_OF_BAND (SHRT_MIN / 2)
+
+// Matrix of the Needleman scores, only the cells in the band are stored
+typedef struct {
+  unsigned int nbRows;
+  short int ** rows;
+  unsigned int * firstColumns; // first column stored in each row
+  unsigned int * lastColumns; // last column stored in each row (included)
+} t_scoreMatrix;
+
+/**
+   createScoreMatrix:
+
+   Allocates the matrix used to align two messages. If bandWidth is not 0,
+   only the cells which are at most bandWidth diagonals away from the band
+   joining the first and the last cells are stored.
+   Returns 0 if the matrix could not be allocated.
+*/
+static int createScoreMatrix(t_scoreMatrix * matrix, unsigned int len1, unsigned int len2, unsigned int bandWidth) {
+  unsigned int i;
+  long lowDiag = 0;
+  long highDiag = 0;
+  long first;
+  long last;
+
+  if (bandWidth > 0) {
+    // the band contains the diagonals between the first and the last cells
+    lowDiag = ((long) len2 < (long) len1 ? (long) len2 - (long) len1 : 0) - bandWidth;
+    highDiag = ((long) len2 > (long) len1 ? (long) len2 - (long) len1 : 0) + bandWidth;
+  }
+
+  matrix->nbRows = len1 + 1;
+  matrix->rows = calloc(len1 + 1, sizeof(short int*));
+  matrix->firstColumns = malloc((len1 + 1) * sizeof(unsigned int));
+  matrix->lastColumns = malloc((len1 + 1) * sizeof(unsigned int));
+  if (matrix->rows == NULL || matrix->firstColumns == NULL || matrix->lastColumns == NULL) {
+    return 0;
+  }
+  for (i = 0; i < len1 + 1; i++) {
+    first = 0;
+    last = len2;
+    if (bandWidth > 0) {
+      first = (long) i + lowDiag > 0 ? (long) i + lowDiag : 0;
+      last = (long) i + highDiag < (long) len2 ? (long) i + highDiag : (long) len2;
+    }
+    matrix->firstColumns[i] = first;
+    matrix->lastColumns[i] = last;
+    matrix->rows[i] = calloc(last - first + 1, sizeof(short int));
+    if (matrix->rows[i] == NULL) {
+      return 0;
+    }
+  }
+  return 1;
+}
+
+static void freeScoreMatrix(t_scoreMatrix * matrix) {
+  unsigned int i;
+  if (matrix->rows != NULL) {
+    for (i = 0; i < matrix->nbRows; i++) {
+      free(matrix->rows[i]);
+    }
+  }
+  free(matrix->rows);
+  free(matrix->firstColumns);
+  free(matrix->lastColumns);
+}
+
+static inline short int getScore(t_scoreMatrix * matrix, unsigned int i, unsigned int j) {
+  if (j < matrix->firstColumns[i] || j > matrix->lastColumns[i]) {
+    return OUT_OF_BAND;
+  }
+  return matrix->rows[i][j - matrix->firstColumns[i]];
+}
+
+/**
+   hasSemanticTags:
+
+   Returns TRUE if at least one half-byte of the message has a semantic tag
+*/
+static Bool hasSemanticTags(t_message * message) {
+  unsigned int i;
+  if (message->semanticTags == NULL) {
+    return FALSE;
+  }
+  for (i = 0; i < message->len; i++) {
+    if (message->semanticTags[i] != NULL && message->semanticTags[i]->name != NULL && strcmp(message->semanticTags[i]->name, "None") != 0) {
+      return TRUE;
+    }
+  }
+  return FALSE;
+}
+
+/**
+   getAlignmentScore:
+
+   Converts a Needleman score into the alignment score of the two messages
+   (the percentage of the score they would have get if they were equals)
+*/
+static float getAlignmentScore(int scoreMatrix, unsigned int len1, unsigned int len2) {
+  unsigned int lenLargestPayload = len1 > len2 ? len1 : len2;
+  float maxScore = lenLargestPayload * MATCH;
+  float scoreAlignment = (100.0f / maxScore) * (float) scoreMatrix;
+  if (scoreAlignment > 100.0f) {
+    scoreAlignment = 100.0f;
+  } else if (scoreAlignment < 0.0f) {
+    scoreAlignment = 0.0f;
+  }
+  return scoreAlignment;
+}
+
+void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int bandWidth, Bool debugMode) {
   // local variable
   unsigned int numberOfOperations = 0;
   double costOfOperation;
@@ -69,13 +190,11 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
   current_message.len = messages[0].len;
   current_message.alignment = messages[0].alignment;
   current_message.mask = malloc(messages[0].len * sizeof(unsigned char));
-  current_message.semanticTags = malloc(messages[0].len * sizeof(t_semanticTag*));
-  for (unsigned int j=0; j<messages[0].len; j++) {
-    current_message.semanticTags[j] = malloc(sizeof(t_semanticTag));
-    current_message.semanticTags[j]->name = malloc((strlen(messages[0].semanticTags[j]->name)+1) * sizeof(char));
-    strcpy(current_message.semanticTags[j]->name, messages[0].semanticTags[j]->name);
-  }
-  memset(current_message.mask, 0, messages[0].len);
+  // semantic tags are only read while aligning: share those of the
+  // arguments (they are released by the caller)
+  current_message.semanticTags = messages[0].semanticTags;
+  // a message may be the profile of a previous alignment
+  memcpy(current_message.mask, messages[0].mask, messages[0].len);
   current_message.score = &score;
 
   // Prepare for the resMessage
@@ -98,18 +217,12 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
     new_message.len = messages[i_message].len;
     new_message.alignment = messages[i_message].alignment;
     new_message.mask = malloc(messages[i_message].len * sizeof(unsigned char));
-    new_message.semanticTags = malloc(messages[i_message].len * sizeof(t_semanticTag*));
-    for (unsigned int j=0; j<messages[i_message].len; j++) {
-      new_message.semanticTags[j] = malloc(sizeof(t_semanticTag));
-      new_message.semanticTags[j]->name = malloc((strlen(messages[i_message].semanticTags[j]->name)+1) * sizeof(char));
-      strcpy(new_message.semanticTags[j]->name, messages[i_message].semanticTags[j]->name);
-
-    }
+    new_message.semanticTags = messages[i_message].semanticTags;
 
-    memset(new_message.mask, 0, messages[i_message].len);
+    memcpy(new_message.mask, messages[i_message].mask, messages[i_message].len);
 
     // Align current_message with new_message
-    regex = alignTwoMessages(resMessage, doInternalSlick, &current_message, &new_message, debugMode);
+    regex = alignTwoMessages(resMessage, doInternalSlick, &current_message, &new_message, bandWidth, debugMode);
     // regex is malloced by the function alignTwoMessages() and we don't need it here
     if(regex)
       free(regex);
@@ -129,15 +242,384 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
   if (callbackStatus(0, status, "The %d messages have sucessfully been aligned.", nbMessages) == -1) {
     printf("Error, error while executing C callback.\n");
   }
+}
+
+
+// Definition of the work shared by the threads aligning the nodes of a
+// guide tree. Nodes 0 to nbMessages-1 are the messages, node nbMessages+k
+// is the alignment of the two nodes guideTree[2k] and guideTree[2k+1].
+typedef struct {
+  unsigned int nbMessages;
+  unsigned int * guideTree;
+  Bool doInternalSlick;
+  unsigned int bandWidth;
+  Bool debugMode;
+  t_message * nodes; // the profile of each node
+  t_score * scores; // the scores of each internal node
+  unsigned int * parents; // the merge in which each node is used
+  unsigned char * nbAlignedChildren; // per merge
+  unsigned int * readyMerges; // stack of the merges whose children are aligned
+  unsigned int nbReadyMerges;
+  unsigned int nbAlignedMerges;
+  unsigned int nbRunningThreads;
+  Bool stop; // set when the user requested to stop or on error
+  Bool failed;
+#ifndef _WIN32
+  pthread_mutex_t lock;
+  pthread_cond_t progress;
+#endif
+} t_guideTreeJob;
 
+/**
+   freeProfile:
 
-  free(messages);
+   Releases an alignment computed by alignTwoMessages() (the names of its
+   semantic tags are borrowed).
+*/
+void freeProfile(t_message * profile) {
+  unsigned int i;
+  if (profile->semanticTags != NULL) {
+    for (i = 0; i < profile->len; i++) {
+      free(profile->semanticTags[i]);
+    }
+    free(profile->semanticTags);
+  }
+  free(profile->alignment);
+  free(profile->mask);
+  profile->semanticTags = NULL;
+  profile->alignment = NULL;
+  profile->mask = NULL;
+}
+
+/**
+   alignGuideTreeMerge:
+
+   Aligns the two children of the specified merge. It does not call any
+   python callback so it can be executed in a thread.
+   Returns 0 if the alignment could not be computed.
+*/
+static int alignGuideTreeMerge(t_guideTreeJob * job, unsigned int merge) {
+  unsigned int i;
+  unsigned int child;
+  t_message * profile = &job->nodes[job->nbMessages + merge];
+  char * regex = NULL;
+
+  profile->score = &job->scores[merge];
+  regex = alignTwoMessages(profile, job->doInternalSlick, &job->nodes[job->guideTree[2 * merge]], &job->nodes[job->guideTree[2 * merge + 1]], job->bandWidth, job->debugMode);
+  if (regex == NULL) {
+    return 0;
+  }
+  free(regex);
+
+  // the profiles of the children are not needed anymore
+  for (i = 0; i < 2; i++) {
+    child = job->guideTree[2 * merge + i];
+    if (child >= job->nbMessages) {
+      freeProfile(&job->nodes[child]);
+    }
+  }
+  return 1;
+}
+
+/**
+   markMergeAsAligned:
+
+   Registers the alignment of a merge and returns the merge of its parent
+   if it is now ready to be aligned (nbMessages - 1 otherwise).
+*/
+static unsigned int markMergeAsAligned(t_guideTreeJob * job, unsigned int merge) {
+  unsigned int parent = job->parents[job->nbMessages + merge];
+  job->nbAlignedMerges++;
+  if (parent < job->nbMessages - 1 && ++job->nbAlignedChildren[parent] == 2) {
+    return parent;
+  }
+  return job->nbMessages - 1;
+}
+
+/**
+   reportGuideTreeStatus:
+
+   Executes the callbacks with the current status of the job and returns
+   1 if the user requested to stop the execution
+*/
+static int reportGuideTreeStatus(t_guideTreeJob * job, unsigned int nbAlignedMerges) {
+  double val = (double) 100.0 * nbAlignedMerges / (job->nbMessages - 1);
+  if (callbackStatus(0, val, "%d merges of the guide tree have been aligned", nbAlignedMerges) == -1) {
+    printf("Error, error while executing C callback.\n");
+  }
+  return callbackIsFinish() == 1;
+}
+
+#ifndef _WIN32
+/**
+   getStatusDeadline:
+
+   Computes the date of the next call to the callbacks
+*/
+static void getStatusDeadline(struct timespec * deadline) {
+  clock_gettime(CLOCK_REALTIME, deadline);
+  deadline->tv_sec += STATUS_PERIOD / 1000;
+  deadline->tv_nsec += (STATUS_PERIOD % 1000) * 1000000L;
+  if (deadline->tv_nsec >= 1000000000L) {
+    deadline->tv_sec++;
+    deadline->tv_nsec -= 1000000000L;
+  }
+}
+
+/**
+   alignGuideTreeMerges:
+
+   Body of the threads: aligns the merges whose children are aligned
+   until the root has been aligned
+*/
+static void* alignGuideTreeMerges(void* arg) {
+  t_guideTreeJob* job = (t_guideTreeJob*) arg;
+  unsigned int merge;
+  unsigned int parent;
+  int aligned;
+
+  pthread_mutex_lock(&job->lock);
+  while (!job->stop && job->nbAlignedMerges < job->nbMessages - 1) {
+    if (job->nbReadyMerges == 0) {
+      pthread_cond_wait(&job->progress, &job->lock);
+      continue;
+    }
+    merge = job->readyMerges[--job->nbReadyMerges];
+    pthread_mutex_unlock(&job->lock);
+
+    aligned = alignGuideTreeMerge(job, merge);
+
+    pthread_mutex_lock(&job->lock);
+    if (!aligned) {
+      job->failed = TRUE;
+      job->stop = TRUE;
+    } else {
+      parent = markMergeAsAligned(job, merge);
+      if (parent < job->nbMessages - 1) {
+        job->readyMerges[job->nbReadyMerges++] = parent;
+      }
+    }
+    // wakes up the idle threads and the calling thread
+    pthread_cond_broadcast(&job->progress);
+  }
+  job->nbRunningThreads--;
+  pthread_cond_broadcast(&job->progress);
+  pthread_mutex_unlock(&job->lock);
+  return NULL;
 }
 
+/**
+   alignGuideTreeInThreads:
+
+   Aligns the merges using nbThreads threads. The calling thread only
+   aggregates the progress and executes the callbacks every STATUS_PERIOD
+   ms. Returns 0 if the threads could not be created.
+*/
+static int alignGuideTreeInThreads(t_guideTreeJob* job, unsigned int nbThreads) {
+  unsigned int i;
+  unsigned int nbCreatedThreads = 0;
+  unsigned int nbAlignedMerges;
+  struct timespec deadline;
+  pthread_t* threads = malloc(nbThreads * sizeof(pthread_t));
+  if (threads == NULL) {
+    return 0;
+  }
 
-char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, Bool debugMode){
+  pthread_mutex_init(&job->lock, NULL);
+  pthread_cond_init(&job->progress, NULL);
+
+  pthread_mutex_lock(&job->lock);
+  for (i = 0; i < nbThreads; i++) {
+    if (pthread_create(&threads[i], NULL, alignGuideTreeMerges, job) != 0) {
+      break;
+    }
+    nbCreatedThreads++;
+    job->nbRunningThreads++;
+  }
+
+  // the condition is also signaled after each merge, the callbacks are
+  // executed once per period
+  getStatusDeadline(&deadline);
+  while (job->nbRunningThreads > 0) {
+    if (pthread_cond_timedwait(&job->progress, &job->lock, &deadline) == ETIMEDOUT) {
+      // Executes the callbacks without preventing the threads to progress
+      nbAlignedMerges = job->nbAlignedMerges;
+      pthread_mutex_unlock(&job->lock);
+      int stop = reportGuideTreeStatus(job, nbAlignedMerges);
+      pthread_mutex_lock(&job->lock);
+      if (stop) {
+        job->stop = TRUE;
+        pthread_cond_broadcast(&job->progress);
+      }
+      getStatusDeadline(&deadline);
+    }
+  }
+  pthread_mutex_unlock(&job->lock);
+
+  for (i = 0; i < nbCreatedThreads; i++) {
+    pthread_join(threads[i], NULL);
+  }
+  free(threads);
+
+  pthread_cond_destroy(&job->progress);
+  pthread_mutex_destroy(&job->lock);
+
+  return nbCreatedThreads > 0;
+}
+#endif
+
+/**
+   alignMessagesWithGuideTree:
+
+   Progressive alignment of the messages following a guide tree: the two
+   nodes of each merge are aligned once their own alignments are computed,
+   so independent subtrees are aligned in parallel by nbThreads threads.
+   @param guideTree: the 2*(nbMessages-1) nodes aligned by each merge, the
+   node nbMessages+k being the result of the merge k (the last merge is the root)
+   Returns 0 if the alignment could not be computed or has been stopped.
+*/
+int alignMessagesWithGuideTree(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int * guideTree, unsigned int nbThreads, unsigned int bandWidth, Bool debugMode) {
+  unsigned int i;
+  unsigned int merge;
+  unsigned int parent;
+  unsigned int nbNodes = 2 * nbMessages - 1;
+  int result = 0;
+  Bool alignedInThreads = FALSE;
+  t_guideTreeJob job;
+  t_message * root;
+
+  // the alignment of a single message is a copy of it
+  if (nbMessages == 1) {
+    resMessage->len = messages[0].len;
+    resMessage->alignment = malloc(messages[0].len * sizeof(unsigned char));
+    resMessage->mask = malloc(messages[0].len * sizeof(unsigned char));
+    resMessage->semanticTags = calloc(messages[0].len, sizeof(t_semanticTag*));
+    if (resMessage->alignment == NULL || resMessage->mask == NULL || resMessage->semanticTags == NULL) {
+      freeProfile(resMessage);
+      return 0;
+    }
+    memcpy(resMessage->alignment, messages[0].alignment, messages[0].len);
+    memcpy(resMessage->mask, messages[0].mask, messages[0].len);
+    for (i = 0; i < messages[0].len; i++) {
+      resMessage->semanticTags[i] = malloc(sizeof(t_semanticTag));
+      if (resMessage->semanticTags[i] == NULL) {
+        freeProfile(resMessage);
+        return 0;
+      }
+      resMessage->semanticTags[i]->name = messages[0].semanticTags[i]->name;
+    }
+    return 1;
+  }
+
+  job.nbMessages = nbMessages;
+  job.guideTree = guideTree;
+  job.doInternalSlick = doInternalSlick;
+  job.bandWidth = bandWidth;
+  job.debugMode = debugMode;
+  job.nodes = calloc(nbNodes, sizeof(t_message));
+  job.scores = calloc(nbMessages - 1, sizeof(t_score));
+  job.parents = malloc(nbNodes * sizeof(unsigned int));
+  job.nbAlignedChildren = calloc(nbMessages - 1, sizeof(unsigned char));
+  job.readyMerges = malloc((nbMessages - 1) * sizeof(unsigned int));
+  job.nbReadyMerges = 0;
+  job.nbAlignedMerges = 0;
+  job.nbRunningThreads = 0;
+  job.stop = FALSE;
+  job.failed = FALSE;
+  if (job.nodes == NULL || job.scores == NULL || job.parents == NULL || job.nbAlignedChildren == NULL || job.readyMerges == NULL) {
+    printf("Error while trying to allocate memory for the guide tree.\n");
+    goto end;
+  }
+
+  // the messages are the leaves (their masks are usually empty)
+  memcpy(job.nodes, messages, nbMessages * sizeof(t_message));
+
+  // the merges of two messages can be aligned first
+  job.parents[nbNodes - 1] = nbMessages - 1;
+  for (merge = 0; merge < nbMessages - 1; merge++) {
+    for (i = 0; i < 2; i++) {
+      job.parents[guideTree[2 * merge + i]] = merge;
+      if (guideTree[2 * merge + i] < nbMessages) {
+        job.nbAlignedChildren[merge]++;
+      }
+    }
+    if (job.nbAlignedChildren[merge] == 2) {
+      job.readyMerges[job.nbReadyMerges++] = merge;
+    }
+  }
+
+#ifndef _WIN32
+  if (nbThreads > nbMessages - 1) {
+    nbThreads = nbMessages - 1;
+  }
+  if (nbThreads > 1 && alignGuideTreeInThreads(&job, nbThreads)) {
+    alignedInThreads = TRUE;
+  }
+#else
+  (void) nbThreads;
+#endif
+
+  // sequential alignment (if the threads are not available)
+  while (!alignedInThreads && !job.stop && job.nbReadyMerges > 0) {
+    merge = job.readyMerges[--job.nbReadyMerges];
+    if (!alignGuideTreeMerge(&job, merge)) {
+      job.failed = TRUE;
+      break;
+    }
+    parent = markMergeAsAligned(&job, merge);
+    if (parent < nbMessages - 1) {
+      job.readyMerges[job.nbReadyMerges++] = parent;
+    }
+    if (reportGuideTreeStatus(&job, job.nbAlignedMerges) == 1) {
+      job.stop = TRUE;
+    }
+  }
+
+  if (job.failed) {
+    printf("Error while aligning the nodes of the guide tree.\n");
+  }
+  if (job.failed || job.nbAlignedMerges < nbMessages - 1) {
+    goto end;
+  }
+
+  // the root is the alignment of all the messages
+  root = &job.nodes[nbNodes - 1];
+  resMessage->len = root->len;
+  resMessage->alignment = root->alignment;
+  resMessage->mask = root->mask;
+  resMessage->semanticTags = root->semanticTags;
+  *resMessage->score = *root->score;
+  root->alignment = NULL;
+  root->mask = NULL;
+  root->semanticTags = NULL;
+  result = 1;
+
+  // Update the execution status
+  if (callbackStatus(0, 100.0, "The %d messages have sucessfully been aligned.", nbMessages) == -1) {
+    printf("Error, error while executing C callback.\n");
+  }
+
+end:
+  if (job.nodes != NULL) {
+    for (i = nbMessages; i < nbNodes; i++) {
+      freeProfile(&job.nodes[i]);
+    }
+  }
+  free(job.nodes);
+  free(job.scores);
+  free(job.parents);
+  free(job.nbAlignedChildren);
+  free(job.readyMerges);
+  return result;
+}
+
+char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, unsigned int bandWidth, Bool debugMode){
+  return alignTwoMessagesWithBound(resMessage, doInternalSlick, message1, message2, bandWidth, 0.0f, debugMode);
+}
+
+char* alignTwoMessagesWithBound(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, unsigned int bandWidth, float minAlignmentScore, Bool debugMode){
   // local variables
-  short int ** matrix = NULL;
+  t_scoreMatrix matrix;
   unsigned int i = 0;
   unsigned int j = 0;
 
@@ -147,7 +629,15 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
   //  float levenshtein = 0.0;
   float scoreAlignment = 0;
 
-  unsigned int maxLen = 0;
+  // Needleman matrix
+  unsigned int minLen = 0;
+  int maxScoreMatrix = 0;
+  int bestReachableScore = 0;
+  short int bestCellScore = MATCH;
+  short int * row = NULL;
+  unsigned int firstColumn = 0;
+  unsigned int remaining = 0;
+
   // Traceback
   unsigned char * contentMessage1 = NULL;
   unsigned int * mapMessage1 = NULL;
@@ -178,100 +668,75 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
   }
 
   //+------------------------------------------------------------------------+
-  // Create and initialize the matrix
+  // Early abandon: the best possible score is obtained when each half-byte
+  // of the smallest message matches
   //+------------------------------------------------------------------------+
-  matrix = (short int**) malloc( sizeof(short int*) * (message1->len + 1) );
-  for (i = 0; i < (message1->len + 1); i++) {
-    matrix[i] = (short int*) calloc( (message2->len + 1), sizeof(short int) );
+  if (hasSemanticTags(message1) || hasSemanticTags(message2)) {
+    bestCellScore += SEMANTIC_MATCH;
+  }
+  minLen = message1->len <= message2->len ? message1->len : message2->len;
+  matrix.rows = NULL;
+  matrix.firstColumns = NULL;
+  matrix.lastColumns = NULL;
+  if (minAlignmentScore > 0 && getAlignmentScore(minLen * bestCellScore, message1->len, message2->len) < minAlignmentScore) {
+    if (debugMode == TRUE) {
+      printf("Alignment abandoned (lengths of the messages).\n");
+    }
+    goto end;
   }
 
   //+------------------------------------------------------------------------+
-  // Fullfill the matrix given the two messages
+  // Create and initialize the matrix
   //+------------------------------------------------------------------------+
-  // Parralelization:
-  unsigned int nbDiag = 0;
-  unsigned int nbBlock = 0; // Depends on which diagonal we are on
-  unsigned int minLen = 0;
-  unsigned int firsti = 0;
-  unsigned int firstj = 0;
-  unsigned int diagloop = 0;
-  unsigned int blockLoop = 0;
-  unsigned int iblock = 0;
-  unsigned int jblock = 0;
-  unsigned int maxLoopi = 0;
-  unsigned int maxLoopj = 0;
-  unsigned int lastRow = 0;
-  unsigned int lastColumn = 0;
-  int maxScoreMatrix = 0;
-
-  lastRow = ((message1->len+1)/BLEN) * BLEN;
-  lastColumn = ((message2->len+1)/BLEN) * BLEN;
-
-  nbDiag  = (message1->len+1)/BLEN + (message2->len+1)/BLEN + ((message1->len+1)%BLEN!=0); // reminder: BLEN = blocklength
-
-  minLen = message1->len+1 <= message2->len+1 ? message1->len+1 : message2->len+1;
-  maxLen = message1->len+1 > message2->len+1 ? message1->len+1 : message2->len+1;
-
-  // Begin loop over diagonals
-  for (diagloop = 0; diagloop < nbDiag; diagloop++){
-  	//printf("Diag n %d\n",diagloop);
-    for (blockLoop = 0;blockLoop <= nbBlock; blockLoop++){
-	  //printf("Block n %d\n",blockLoop);
-	  //(iblock,jblock are moving from the bottom left of the current diagonal to the top right)
-      iblock = firsti - blockLoop * BLEN;
-      jblock = firstj + blockLoop * BLEN;
-      maxLoopi = iblock + BLEN <= message1->len + 1? iblock + BLEN:message1->len + 1;
-      maxLoopj = jblock + BLEN <= message2->len + 1? jblock + BLEN:message2->len + 1;
-
-      for(i = iblock;i < maxLoopi; i++){
-
-        for(j = jblock; j < maxLoopj; j++){
-          if (i > 0 && j > 0){
-            elt1 = matrix[i - 1][j - 1];
-
-	    elt1 += getSimilarityScore(message1, message2, i, j);
-            elt2 = matrix[i][j - 1] + GAP;
-            elt3 = matrix[i - 1][j] + GAP;
-            max = elt1 > elt2 ? elt1 : elt2;
-            max = max > elt3 ? max : elt3;
-	    matrix[i][j] = max;
-	    if (max > maxScoreMatrix) {
-	      maxScoreMatrix = max;
-	    }
-
-	  }//printf("%d,\t",matrix[i][j]);
-       }
-       //printf("\n");
-     }//End for iblock
-    }//End for blockLoop
-
-   //Actualize the number of block for the next time
-   if (diagloop < minLen/BLEN){
-      nbBlock++;
-   }
-   else if (diagloop > maxLen/BLEN){
-      nbBlock--;
-   }
-
-   //Actualise the first position of the cursor (bottom left of the next diagonal)
-   if (firsti != lastRow) // If we are not at the last row
-        firsti = firsti + BLEN ;
-
-   else if (firstj != lastColumn) // Else If we are not at the last column
-        firstj += BLEN;
+  if (!createScoreMatrix(&matrix, message1->len, message2->len, bandWidth)) {
+    printf("Error while trying to allocate memory for the matrix.\n");
+    goto end;
+  }
 
+  //+------------------------------------------------------------------------+
+  // Fullfill the matrix given the two messages (only the cells of the band)
+  //+------------------------------------------------------------------------+
+  for (i = 1; i < message1->len + 1; i++) {
+    row = matrix.rows[i];
+    firstColumn = matrix.firstColumns[i];
+    bestReachableScore = maxScoreMatrix;
+    if (firstColumn == 0) {
+      // cells of the first column are null
+      remaining = message1->len - i < message2->len ? message1->len - i : message2->len;
+      if ((int) remaining * bestCellScore > bestReachableScore) {
+        bestReachableScore = remaining * bestCellScore;
+      }
+    }
+    for (j = firstColumn > 1 ? firstColumn : 1; j <= matrix.lastColumns[i]; j++) {
+      elt1 = getScore(&matrix, i - 1, j - 1);
+      elt1 += getSimilarityScore(message1, message2, i, j);
+      elt2 = getScore(&matrix, i, j - 1) + GAP;
+      elt3 = getScore(&matrix, i - 1, j) + GAP;
+      max = elt1 > elt2 ? elt1 : elt2;
+      max = max > elt3 ? max : elt3;
+      row[j - firstColumn] = max;
+      if (max > maxScoreMatrix) {
+        maxScoreMatrix = max;
+      }
+      if (minAlignmentScore > 0) {
+        remaining = message1->len - i < message2->len - j ? message1->len - i : message2->len - j;
+        if (max + (int) remaining * bestCellScore > bestReachableScore) {
+          bestReachableScore = max + remaining * bestCellScore;
+        }
+      }
+    }
 
-  }//End for diagloop
+    // Early abandon: the cells of the next rows derive from this one
+    if (minAlignmentScore > 0 && getAlignmentScore(bestReachableScore, message1->len, message2->len) < minAlignmentScore) {
+      if (debugMode == TRUE) {
+        printf("Alignment abandoned (row %d).\n", i);
+      }
+      goto end;
+    }
+  }
 
   // Compute score of the alignment (ratio regarding the max score these two payloads could have get if they were equals)
-  unsigned int lenSmallestPayload = message1->len > message2->len ? message1->len : message2->len;
-  float maxScore = lenSmallestPayload * MATCH;
-  scoreAlignment = (100.0f / maxScore) * (float) maxScoreMatrix;
-  if (scoreAlignment > 100.0f) {
-    scoreAlignment = 100.0f;
-  } else if (scoreAlignment < 0.0f) {
-    scoreAlignment = 0.0f;
-  }
+  scoreAlignment = getAlignmentScore(maxScoreMatrix, message1->len, message2->len);
   //levenshtein = MATCH*(float)matrix[message1->len][message2->len] / maxLen;
   //float levcop = matrix[message1->len][message2->len];
   //levenshtein = levenshtein * 10 / maxLen;
@@ -316,9 +781,9 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
   // DIAGONAL (almost) TRACEBACK
   while ((i > 0) && (j > 0)) {
-    eltL = matrix[i][j - 1];
-    eltD = matrix[i - 1][j - 1];
-    eltT = matrix[i - 1][j];
+    eltL = getScore(&matrix, i, j - 1);
+    eltD = getScore(&matrix, i - 1, j - 1);
+    eltT = getScore(&matrix, i - 1, j);
 
     if ((eltL > eltD) && (eltL > eltT)) {
       --j;
@@ -520,7 +985,8 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
       tagNameMessage2 = message2->semanticTags[jTag]->name;
     }
 
-    if (strcmp(tagNameMessage1, tagNameMessage2) == 0) {
+    // tags parsed from the arguments share their names
+    if (tagNameMessage1 == tagNameMessage2 || strcmp(tagNameMessage1, tagNameMessage2) == 0) {
       tagNewMessage = tagNameMessage1;
     } else {
       tagNewMessage = "None";
@@ -650,14 +1116,7 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
 end:
   // Room service
-  if(matrix) {
-    for (i = 0; i < (message1->len + 1); i++) {
-      if(matrix[i]) {
-	free(matrix[i]);
-      }
-    }
-    free(matrix);
-  }
+  freeScoreMatrix(&matrix);
   if(contentMessage1) {
     free(contentMessage1);
   }
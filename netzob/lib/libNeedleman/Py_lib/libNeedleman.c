@@ -67,6 +67,56 @@ PyObject* PyInit__libNeedleman(void) {
   return PyModule_Create(&moduledef);
 }
 
+//+---------------------------------------------------------------------------+
+//| getGuideTree : gets the buffer of the guide tree (an array('I') of the two
+//|                nodes aligned by each merge) and checks it describes a
+//|                binary tree whose leaves are the nbMessages messages.
+//|                Returns 1 (and sets a python error) if it is not valid
+//+---------------------------------------------------------------------------+
+static int getGuideTree(PyObject* guideTreeObj, unsigned int nbMessages, Py_buffer* view) {
+  unsigned int* guideTree;
+  unsigned char* used;
+  unsigned int i;
+  int invalid = 0;
+
+  if (PyObject_GetBuffer(guideTreeObj, view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) != 0) {
+    return 1;
+  }
+  if (view->format == NULL || strcmp(view->format, "I") != 0 || view->itemsize != sizeof(unsigned int)) {
+    PyErr_SetString(PyExc_TypeError, "The guide tree must be an array of unsigned int ('I')");
+    PyBuffer_Release(view);
+    return 1;
+  }
+  if (view->len / view->itemsize != 2 * ((Py_ssize_t) nbMessages - 1)) {
+    PyErr_SetString(PyExc_ValueError, "The guide tree must hold two nodes for each of the nbMessages-1 merges");
+    PyBuffer_Release(view);
+    return 1;
+  }
+
+  // each node is aligned once, after it has been computed
+  guideTree = (unsigned int*) view->buf;
+  used = calloc(2 * nbMessages, sizeof(unsigned char));
+  if (used == NULL) {
+    PyErr_NoMemory();
+    PyBuffer_Release(view);
+    return 1;
+  }
+  for (i = 0; i < 2 * (nbMessages - 1) && !invalid; i++) {
+    if (guideTree[i] >= nbMessages + i / 2 || used[guideTree[i]]) {
+      invalid = 1;
+    } else {
+      used[guideTree[i]] = 1;
+    }
+  }
+  free(used);
+  if (invalid) {
+    PyErr_SetString(PyExc_ValueError, "The guide tree is not a valid binary tree of the messages");
+    PyBuffer_Release(view);
+    return 1;
+  }
+  return 0;
+}
+
 //+---------------------------------------------------------------------------+
 //| py_alignSequences : Python wrapper for alignMessages
 //+---------------------------------------------------------------------------+
@@ -75,9 +125,13 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   // parameters
   PyObject* wrapperFactory;
   t_message *messages;
+  t_semanticTag *tags;
   PyObject *temp_cb;
   unsigned int doInternalSlick = 0;
   unsigned int debugMode = 0;
+  unsigned int bandWidth = 0;
+  PyObject* guideTreeObj = Py_None;
+  unsigned int nbThreads = 1;
 
   // local variables
   t_message * resMessage;
@@ -86,9 +140,13 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   Bool bool_doInternalSlick;
   int parseRet;
   t_score score;
+  PyObject* result;
+  Py_buffer guideTreeView;
+  unsigned int* guideTree = NULL;
+  int aligned;
 
   // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hOhO", &doInternalSlick, &temp_cb, &debugMode, &wrapperFactory)) {
+  if (!PyArg_ParseTuple(args, "hOhO|IOI", &doInternalSlick, &temp_cb, &debugMode, &wrapperFactory, &bandWidth, &guideTreeObj, &nbThreads)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_alignMessages");
     return NULL;
   }
@@ -112,12 +170,21 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
     printf("py_alignSequences : Deserialization of the arguments (format, serialMessages).\n");
   }
 
-  parseRet = parseArgs(wrapperFactory,&nbMessages,&messages);
+  parseRet = parseArgs(wrapperFactory,&nbMessages,&messages,&tags);
   //Parsing error: PyErr allready set in parseArgs
   if(parseRet){
     return NULL;
   }
 
+  // The guide tree (optional) is read through the buffer protocol
+  if (guideTreeObj != Py_None) {
+    if (getGuideTree(guideTreeObj, nbMessages, &guideTreeView)) {
+      freeMessages(nbMessages, messages, tags);
+      return NULL;
+    }
+    guideTree = (unsigned int*) guideTreeView.buf;
+  }
+
   // Convert debugMode parameter in a BOOL
   if (debugMode) {
     bool_debugMode = TRUE;
@@ -137,30 +204,52 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   }
 
   // Fix the default values associated with resMessage
-  resMessage = (t_message *) malloc(sizeof(t_message));
+  resMessage = (t_message *) calloc(1, sizeof(t_message));
   score.s1 = 0;
   score.s2 = 0;
   score.s3 = 0;
   resMessage->score = &score;
-  resMessage->alignment = malloc(messages[0].len * sizeof(unsigned char));
-  resMessage->semanticTags = malloc(messages[0].len * sizeof(t_semanticTag*));
-  for (unsigned int i=0; i<messages[0].len; i++) {
-    resMessage->semanticTags[i] = malloc(sizeof(t_semanticTag));
-  }
-  memset(resMessage->alignment, '\0', messages[0].len);
   //+------------------------------------------------------------------------+
   // Execute the alignment process
   //+------------------------------------------------------------------------+
   int t=clock();
-  alignMessages(resMessage, bool_doInternalSlick, nbMessages, messages, bool_debugMode);
+  if (guideTree != NULL) {
+    // The nodes are aligned without the GIL (callbacks acquire it)
+    Py_BEGIN_ALLOW_THREADS
+    aligned = alignMessagesWithGuideTree(resMessage, bool_doInternalSlick, nbMessages, messages, guideTree, nbThreads, bandWidth, bool_debugMode);
+    Py_END_ALLOW_THREADS
+    PyBuffer_Release(&guideTreeView);
+    if (!aligned) {
+      free(resMessage);
+      freeMessages(nbMessages, messages, tags);
+      PyErr_SetString(PyExc_RuntimeError, "The alignment of the guide tree has not been computed");
+      return NULL;
+    }
+  } else {
+    resMessage->alignment = malloc(messages[0].len * sizeof(unsigned char));
+    resMessage->semanticTags = malloc(messages[0].len * sizeof(t_semanticTag*));
+    for (unsigned int i=0; i<messages[0].len; i++) {
+      resMessage->semanticTags[i] = malloc(sizeof(t_semanticTag));
+    }
+    memset(resMessage->alignment, '\0', messages[0].len);
+    alignMessages(resMessage, bool_doInternalSlick, nbMessages, messages, bandWidth, bool_debugMode);
+  }
   int t1=clock();
 
   if (debugMode == 1) {
     printf ("It took %f operation to align messages.\n",(float)(t1-t)/CLOCKS_PER_SEC);
   }
 
-  // Return the serialization of the message
-  return serializeMessage(resMessage);
+  // Return the serialization of the message (its semantic tags are
+  // borrowed from the arguments)
+  result = serializeMessage(resMessage);
+  if (guideTree != NULL) {
+    // the buffers of the alignment are owned by resMessage
+    freeProfile(resMessage);
+  }
+  free(resMessage);
+  freeMessages(nbMessages, messages, tags);
+  return result;
 }
 
 
@@ -175,6 +264,7 @@ PyObject* py_alignTwoMessages(__attribute__((unused))PyObject* self, PyObject* a
   unsigned char *serialMessages;
   int sizeSerialMessages;
   unsigned int debugMode = 0;
+  unsigned int bandWidth = 0;
 
   // local variables
   unsigned int nbDeserializedMessage = 0;
@@ -189,7 +279,7 @@ PyObject* py_alignTwoMessages(__attribute__((unused))PyObject* self, PyObject* a
   Bool bool_debugMode;
 
   // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hs#s#h", &doInternalSlick, &format, &sizeFormat, &serialMessages, &sizeSerialMessages, &debugMode)) {
+  if (!PyArg_ParseTuple(args, "hs#s#h|I", &doInternalSlick, &format, &sizeFormat, &serialMessages, &sizeSerialMessages, &debugMode, &bandWidth)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_alignTwoMessages");
     return NULL;
   }
@@ -273,7 +363,7 @@ PyObject* py_alignTwoMessages(__attribute__((unused))PyObject* self, PyObject* a
     memset(resMessage.alignment, 0, message2.len);
   }*/
   // Execute the C function
-  alignTwoMessages(&resMessage, bool_doInternalSlick, &message1, &message2, bool_debugMode);
+  alignTwoMessages(&resMessage, bool_doInternalSlick, &message1, &message2, bandWidth, bool_debugMode);
 
   free(message1.mask);
   free(message2.mask);
@@ -63,6 +63,9 @@ PyObject* PyInit__libScoreComputation(void) {
     NULL
   };
 
+  // computeSimilarityMatrix releases the GIL and calls back python
+  PyEval_InitThreads();
+
   return PyModule_Create(&moduledef);
 }
 
@@ -72,19 +75,23 @@ PyObject* PyInit__libScoreComputation(void) {
 PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyObject* args) {
   unsigned int doInternalSlick = 0;
   unsigned int debugMode = 0;
+  unsigned int nbThreads = 1;
+  unsigned int bandWidth = 0;
+  float minAlignmentScore = 0.0f;
   int i = 0;
-  unsigned int j = 0;
   PyObject *temp_cb;
   PyObject *temp2_cb;
   Bool bool_debugMode;
   PyObject* wrapperFactory;
   float **scoreMatrix = NULL;
   t_message *mesmessages;
+  t_semanticTag *tags;
   long nbmessage = 0;
+  unsigned int nbParsedMessages = 0;
 
 
   // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hOOhO", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory)) {
+  if (!PyArg_ParseTuple(args, "hOOhO|IIf", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory, &nbThreads, &bandWidth, &minAlignmentScore)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_getHighestEquivalentGroup");
     return NULL;
   }
@@ -108,11 +115,12 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
   python_callback_isFinish = temp2_cb;    /* Remember new callback */
 
   int parseRet;
-  parseRet = parseArgs(wrapperFactory, &nbmessage, &mesmessages);
+  parseRet = parseArgs(wrapperFactory, &nbParsedMessages, &mesmessages, &tags);
   //Parsing error: PyErr allready set in parseArgs
   if(parseRet){
     return NULL;
   }
+  nbmessage = nbParsedMessages;
 
   //init matrix
   scoreMatrix = (float**) malloc (nbmessage*sizeof(float*));
@@ -129,7 +137,10 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
     bool_debugMode = FALSE;
   }
 
-  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix);
+  // The scores are computed without the GIL (callbacks acquire it)
+  Py_BEGIN_ALLOW_THREADS
+  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix, nbThreads, bandWidth, minAlignmentScore);
+  Py_END_ALLOW_THREADS
 
   //Compute the scores recorded in a python list://TODO Return Factory
   PyObject *recordedScores = PyList_New((nbmessage*(nbmessage-1))/2);
@@ -157,18 +168,12 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
      }
   }
 
-  //Free all //TODO: do a freeFactory
+  //Free all
   for(i=0; i<nbmessage; i++) {
-    for (j=0; j<mesmessages[i].len; j++) {
-      free(mesmessages[i].semanticTags[j]);
-    }
-    free(mesmessages[i].semanticTags);
-
-    free(mesmessages[i].mask);
     free(scoreMatrix[i]);
   }
   free(scoreMatrix);
-  free(mesmessages);
+  freeMessages(nbParsedMessages, mesmessages, tags);
 
   return Py_BuildValue("S", recordedScores);
 }
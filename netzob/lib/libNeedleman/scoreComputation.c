@@ -31,10 +31,202 @@
 //+---------------------------------------------------------------------------+
 //| Import Associated Header
 //+---------------------------------------------------------------------------+
+#ifdef CCALLFORDEBUG
+#define _POSIX_C_SOURCE 200112L
+#endif
 #include "scoreComputation.h"
 #ifdef _WIN32
 #include <stdio.h>
 #include <malloc.h>
+#else
+#include <pthread.h>
+#include <time.h>
+#include <errno.h>
+#endif
+
+// Period (in ms) between two calls to the callbacks when computing in threads
+#define STATUS_PERIOD 250
+
+// Definition of the work shared by the threads computing a similarity matrix
+typedef struct {
+  int nbMessage;
+  t_message* messages;
+  Bool debugMode;
+  float** scoreMatrix;
+  unsigned int bandWidth; // 0 to compute the full Needleman matrix
+  float minAlignmentScore; // pairs that cannot reach it get a null score
+  int nextRow; // the next row of the matrix to compute
+  long nbComputedCouples; // number of couples of messages already computed
+  unsigned int nbRunningThreads;
+  Bool stop; // set when the user requested to stop
+#ifndef _WIN32
+  pthread_mutex_t lock;
+  pthread_cond_t progress;
+#endif
+} t_similarityJob;
+
+/**
+   computeSimilarityScore:
+
+   This function aligns two messages and returns their similarity score.
+   It does not call any python callback so it can be executed in a thread.
+   The score is null if the alignment has been abandoned.
+*/
+static float computeSimilarityScore(t_similarityJob* job, t_message* message1, t_message* message2) {
+  Bool debugMode = job->debugMode;
+  unsigned int j;
+  t_message tmpResultMessage;
+  t_score score;
+
+  tmpResultMessage.len = 0;
+  tmpResultMessage.alignment = NULL;
+  tmpResultMessage.mask = NULL;
+  tmpResultMessage.semanticTags = NULL;
+  score.s1 = 0;
+  score.s2 = 0;
+  score.s3 = 0;
+  tmpResultMessage.score = &score;
+
+  char * regex = alignTwoMessagesWithBound(&tmpResultMessage, FALSE, message1, message2, job->bandWidth, job->minAlignmentScore, debugMode);
+  if (regex == NULL) {
+    return 0.0f;
+  }
+  if (debugMode) {
+    printf("Regex = %s\n", regex);
+  }
+  free(regex);
+
+  // the computed alignment is not needed (names of semantic tags are borrowed)
+  if (tmpResultMessage.semanticTags != NULL) {
+    for (j = 0; j < tmpResultMessage.len; j++) {
+      free(tmpResultMessage.semanticTags[j]);
+    }
+    free(tmpResultMessage.semanticTags);
+  }
+  free(tmpResultMessage.alignment);
+  free(tmpResultMessage.mask);
+
+  return computeDistance(tmpResultMessage.score);
+}
+
+/**
+   computeSimilarityRow:
+
+   This function computes the scores between messages[i] and messages[p]
+   with i < p (a row of the diag. superior matrix)
+*/
+static void computeSimilarityRow(t_similarityJob* job, int i) {
+  int p;
+  for (p = i + 1; p < job->nbMessage; p++) {
+    if (job->debugMode) {
+      printf("Align two messages (%d, %d)\n", i, p);
+    }
+    job->scoreMatrix[i][p] = computeSimilarityScore(job, &job->messages[i], &job->messages[p]);
+  }
+}
+
+/**
+   reportStatus:
+
+   Executes the callbacks with the current status of the job and returns
+   1 if the user requested to stop the execution
+*/
+static int reportStatus(t_similarityJob* job, long nbComputedCouples) {
+  long nbCouples = ((long) job->nbMessage * (job->nbMessage - 1)) / 2;
+  double val = (double) 100.0 * nbComputedCouples / nbCouples;
+  if (callbackStatus(0,val,"Building Status (%.2lf %%)",(float) val) == -1) {
+    printf("Error, error while executing C callback.\n");
+  }
+  return callbackIsFinish() == 1;
+}
+
+#ifndef _WIN32
+/**
+   computeSimilarityRows:
+
+   Body of the threads: computes the rows of the matrix which have not
+   yet been computed by another thread
+*/
+static void* computeSimilarityRows(void* arg) {
+  t_similarityJob* job = (t_similarityJob*) arg;
+  int i;
+
+  pthread_mutex_lock(&job->lock);
+  while (!job->stop && job->nextRow < job->nbMessage - 1) {
+    i = job->nextRow++;
+    pthread_mutex_unlock(&job->lock);
+
+    computeSimilarityRow(job, i);
+
+    pthread_mutex_lock(&job->lock);
+    job->nbComputedCouples += job->nbMessage - i - 1;
+  }
+  job->nbRunningThreads--;
+  pthread_cond_signal(&job->progress);
+  pthread_mutex_unlock(&job->lock);
+  return NULL;
+}
+
+/**
+   computeSimilarityMatrixInThreads:
+
+   Computes the matrix using nbThreads threads. The calling thread only
+   aggregates the progress and executes the callbacks every STATUS_PERIOD
+   ms. Returns 0 if the threads could not be created.
+*/
+static int computeSimilarityMatrixInThreads(t_similarityJob* job, unsigned int nbThreads) {
+  unsigned int i;
+  unsigned int nbCreatedThreads = 0;
+  long nbComputedCouples;
+  struct timespec deadline;
+  pthread_t* threads = malloc(nbThreads * sizeof(pthread_t));
+  if (threads == NULL) {
+    return 0;
+  }
+
+  pthread_mutex_init(&job->lock, NULL);
+  pthread_cond_init(&job->progress, NULL);
+
+  pthread_mutex_lock(&job->lock);
+  for (i = 0; i < nbThreads; i++) {
+    if (pthread_create(&threads[i], NULL, computeSimilarityRows, job) != 0) {
+      break;
+    }
+    nbCreatedThreads++;
+    job->nbRunningThreads++;
+  }
+
+  while (job->nbRunningThreads > 0) {
+    clock_gettime(CLOCK_REALTIME, &deadline);
+    deadline.tv_sec += STATUS_PERIOD / 1000;
+    deadline.tv_nsec += (STATUS_PERIOD % 1000) * 1000000L;
+    if (deadline.tv_nsec >= 1000000000L) {
+      deadline.tv_sec++;
+      deadline.tv_nsec -= 1000000000L;
+    }
+    if (pthread_cond_timedwait(&job->progress, &job->lock, &deadline) == ETIMEDOUT) {
+      // Executes the callbacks without preventing the threads to progress
+      nbComputedCouples = job->nbComputedCouples;
+      pthread_mutex_unlock(&job->lock);
+      int stop = reportStatus(job, nbComputedCouples);
+      pthread_mutex_lock(&job->lock);
+      if (stop) {
+        job->stop = TRUE;
+      }
+    }
+  }
+  pthread_mutex_unlock(&job->lock);
+
+  for (i = 0; i < nbCreatedThreads; i++) {
+    pthread_join(threads[i], NULL);
+  }
+  free(threads);
+
+  pthread_cond_destroy(&job->progress);
+  pthread_mutex_destroy(&job->lock);
+
+  return nbCreatedThreads > 0;
+}
 #endif
 
 /**
@@ -46,64 +238,60 @@
    @param messages: a list containing messages to work with
    @param debug: activate or deactive debug messages
    @param scoreMatrix: a double-dimension array where the matrix score will be stored
+   @param nbThreads: the number of threads used to compute the scores
+   @param bandWidth: width of the band of the Needleman matrix (0 for the full matrix)
+   @param minAlignmentScore: the couples whose alignment score cannot reach it are abandoned (their score is null)
 */
-void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix) {
+void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix, unsigned int nbThreads, unsigned int bandWidth, float minAlignmentScore) {
   int i;
-  t_message tmpResultMessage;
-  t_score score;
-
-  // local variable
-  int p = 0;
+  t_similarityJob job;
 
   /**
      Stops the execution if user requested so
   */
-  if (callbackIsFinish() == 1) {
+  if (callbackIsFinish() == 1 || nbMessage < 2) {
+    return;
+  }
+
+  job.nbMessage = nbMessage;
+  job.messages = messages;
+  job.debugMode = debugMode;
+  job.scoreMatrix = scoreMatrix;
+  job.bandWidth = bandWidth;
+  job.minAlignmentScore = minAlignmentScore;
+  job.nextRow = 0;
+  job.nbComputedCouples = 0;
+  job.nbRunningThreads = 0;
+  job.stop = FALSE;
+
+#ifndef _WIN32
+  if (nbThreads > (unsigned int) nbMessage - 1) {
+    nbThreads = nbMessage - 1;
+  }
+  if (nbThreads > 1 && computeSimilarityMatrixInThreads(&job, nbThreads)) {
+    if (!job.stop) {
+      reportStatus(&job, job.nbComputedCouples);
+    }
     return;
   }
+#else
+  (void) nbThreads;
+#endif
 
   /**
      We loop over each different couple of messages
      messages[i] and messages [p] with i < p
      (diag. superior matrix)
   */
-  for (i = 0; i < nbMessage; i++) {
-    /**
-     Stops the execution if user requested so
-    */
-    if (callbackIsFinish() == 1) {
-      return;
-    }
-
-    for (p = i + 1; p < nbMessage; p++) {
-      /**
-	 Computes the NeedlemanScore between messages i and p
-	 result is stored in the matrix[i][p]
-      */
-      tmpResultMessage.len = 0;
-      score.s1 = 0;
-      score.s2 = 0;
-      score.s3 = 0;
-      tmpResultMessage.score = &score;
-
-      if (debugMode) {
-	printf("Align two messages (%d, %d)\n", i, p);
-      }
-
-      char * regex = alignTwoMessages(&tmpResultMessage, FALSE, &messages[i], &messages[p], debugMode);
-      if (debugMode) {
-	printf("Regex = %s\n", regex);
-      }
-      free(regex);
-      scoreMatrix[i][p] = computeDistance(tmpResultMessage.score);
-    }
+  for (i = 0; i < nbMessage - 1; i++) {
+    computeSimilarityRow(&job, i);
+    job.nbComputedCouples += nbMessage - i - 1;
 
     /**
-       Update the current status
+       Update the current status and stops the execution if user requested so
     */
-    double val = (double) 100.0 * (i * nbMessage + nbMessage - 1) / ((nbMessage - 1) * (nbMessage + 1));
-    if (callbackStatus(0,val,"Building Status (%.2lf %%)",(float) val) == -1) {
-      printf("Error, error while executing C callback.\n");
+    if (reportStatus(&job, job.nbComputedCouples) == 1) {
+      return;
     }
   }
 }
@@ -130,6 +130,9 @@ toolsPath = opj(libPath, "tools")
 # Generate the random binary identifier BID
 macros = [('BID', '"{0}"'.format(str(uuid.uuid4())))]
 
+# The similarity matrix is computed in threads (POSIX threads)
+threadLibraries = [] if sys.platform == "win32" else ["pthread"]
+
 # Module Needleman
 moduleLibNeedleman = Extension('netzob._libNeedleman',
                                extra_compile_args=extraCompileArgs,
@@ -141,7 +144,8 @@ moduleLibNeedleman = Extension('netzob._libNeedleman',
                                         opj(argsFactoriesPath, "factory.c"),
                                         opj(toolsPath, "getBID.c")],
                                define_macros=macros,
-                               include_dirs=includes)
+                               include_dirs=includes,
+                               libraries=threadLibraries)
 
 # Module ScoreComputation
 moduleLibScoreComputation = Extension('netzob._libScoreComputation',
@@ -154,7 +158,8 @@ moduleLibScoreComputation = Extension('netzob._libScoreComputation',
                                                opj(argsFactoriesPath, "factory.c"),
                                                opj(toolsPath, "getBID.c")],
                                       define_macros=macros,
-                                      include_dirs=includes)
+                                      include_dirs=includes,
+                                      libraries=threadLibraries)
 
 # Module Interface
 moduleLibInterface = Extension('netzob._libInterface',
@@ -25,11 +25,14 @@
 #|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
 #+---------------------------------------------------------------------------+
 
+#+---------------------------------------------------------------------------+
+#| Standard library imports
+#+---------------------------------------------------------------------------+
+from array import array
+
 #+---------------------------------------------------------------------------+
 #| Local application imports
 #+---------------------------------------------------------------------------+
-from netzob.Common.C_Extensions.WrapperMessage import WrapperMessage
-from netzob.Model.Vocabulary.Messages.RawMessage import RawMessage
 from netzob.Common.NetzobException import NetzobException
 from netzob import _libScoreComputation
 
@@ -39,6 +42,35 @@ class WrapperArgsFactory(object):
     This object will be transfered to the C extensions with its attributes which are:
     - self.typeList : a map between function name and function pointer
     - self.function : the function for which the parameters will be wrapped.
+
+    The messages are packed in the attributes read by the C extensions
+    through the buffer protocol (without any copy):
+    - self.data : the concatenation of the data of all the messages
+    - self.offsets : the offsets of each message in data (plus the total length)
+    - self.masks : the mask of each byte of data (0 for a static byte, 1 for a
+      dynamic one) or an empty bytes if all of them are static. It allows to
+      align a profile computed by a previous alignment.
+    - self.tagIds : the identifier of the semantic tag of each byte of data
+    - self.tagNames : the name of each semantic tag identifier
+    - self.uids : the identifier of each message
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.C_Extensions.WrapperArgsFactory import WrapperArgsFactory
+    >>> wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
+    >>> wrapper.alignMessages([(b"abc", {2: "T"}), (b"de", {})])
+    >>> wrapper.data
+    b'abcde'
+    >>> list(wrapper.offsets)
+    [0, 3, 5]
+    >>> list(wrapper.tagIds)
+    [0, 1, 0, 0, 0]
+    >>> wrapper.tagNames
+    ['None', "['T']"]
+    >>> wrapper.masks
+    b''
+    >>> wrapper.alignMessages([(b"abc", {}), (b"de", {})], [b"\\x00\\x01\\x00", None])
+    >>> wrapper.masks
+    b'\\x00\\x01\\x00\\x00\\x00'
     """
 
     def __init__(self, function):
@@ -55,18 +87,57 @@ class WrapperArgsFactory(object):
             raise NetzobException("Function " + str(function) +
                                   " not implemented")
 
+        self.__packMessages([])
+
     def __str__(self):
-        return str(self.args)
+        return str([(self.data[self.offsets[i]:self.offsets[i + 1]], uid)
+                    for i, uid in enumerate(self.uids)])
 
     def computeSimilarityMatrix(self, symbols):
-        self.args = []
-        for s in symbols:
-            self.args.append(WrapperMessage(s.messages[0], str(s.id)))
-
-    def alignMessages(self, values):
-        self.args = []
-        for (data, tags) in values:
-            message = RawMessage(data=data)
-            for pos, tag in list(tags.items()):
-                message.addSemanticTag(pos, tag)
-            self.args.append(WrapperMessage(message, "Virtual symbol"))
+        self.__packMessages([(s.messages[0].data, s.messages[0].semanticTags,
+                              str(s.id)) for s in symbols])
+
+    def alignMessages(self, values, masks=None):
+        # tags are attached the same way RawMessage.addSemanticTag does
+        self.__packMessages([(data, {pos: [tag]
+                                     for pos, tag in tags.items()},
+                              "Virtual symbol") for (data, tags) in values])
+        if masks is not None:
+            if len(masks) != len(values):
+                raise ValueError(
+                    "There should be a mask (or None) for each value")
+            self.masks = b"".join(
+                bytes(len(data)) if mask is None else mask
+                for ((data, tags), mask) in zip(values, masks))
+            if len(self.masks) != len(self.data):
+                raise ValueError("Each mask should cover its value")
+
+    def __packMessages(self, messages):
+        """Pack the specified (data, semanticTags, uid) in the attributes
+        read by the C extensions. The semantic tag of a byte is the one
+        attached to its first half-byte ("None" if none is attached)."""
+
+        self.offsets = array('I', [0])
+        self.uids = []
+        self.tagNames = [str(None)]
+        tagIdentifiers = {str(None): 0}
+        for (data, semanticTags, uid) in messages:
+            self.offsets.append(self.offsets[-1] + len(data))
+            self.uids.append(uid)
+
+        self.data = b"".join(data for (data, semanticTags, uid) in messages)
+        self.masks = b""
+        self.tagIds = array('I', [0]) * len(self.data)
+        for i_message, (data, semanticTags, uid) in enumerate(messages):
+            offset = self.offsets[i_message]
+            for position, tags in semanticTags.items():
+                if position % 2 != 0 or not 0 <= position < len(data) * 2:
+                    continue
+                # SemanticTag can be "None" (that's why the str method)
+                name = str(tags)
+                tagId = tagIdentifiers.get(name)
+                if tagId is None:
+                    tagId = len(self.tagNames)
+                    tagIdentifiers[name] = tagId
+                    self.tagNames.append(name)
+                self.tagIds[offset + position // 2] = tagId
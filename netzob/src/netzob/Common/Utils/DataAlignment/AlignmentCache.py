@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+from collections import OrderedDict
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Utils.MatrixList import MatrixList
+
+
+@NetzobLogger
+class AlignmentCache(object):
+    """Stores the alignment of data computed with a field, so that only
+    data that have not yet been aligned are parsed on the next alignment.
+
+    Cached alignments are indexed by the aligned data and are only valid
+    for the structure under which they were computed: the structure
+    version of the root field, the leaf fields, their names, their
+    domains and their encoding functions. Any modification of them
+    invalidates the cache.
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.Utils.DataAlignment.AlignmentCache import AlignmentCache
+    >>> f1 = Field("hello ", name="f1")
+    >>> f2 = Field(ASCII(nbChars=(3, 4)), name="f2")
+    >>> symbol = Symbol([f1, f2])
+    >>> cache = AlignmentCache()
+    >>> print(cache.align(symbol, [b"hello john", b"hello bob"], encoded=False))
+    f1       | f2    
+    -------- | ------
+    'hello ' | 'john'
+    'hello ' | 'bob' 
+    -------- | ------
+    >>> cache.nbAlignedData
+    2
+    >>> print(cache.align(symbol, [b"hello john", b"hello kurt", b"hello bob"], encoded=False))
+    f1       | f2    
+    -------- | ------
+    'hello ' | 'john'
+    'hello ' | 'kurt'
+    'hello ' | 'bob' 
+    -------- | ------
+    >>> cache.nbAlignedData
+    3
+    >>> f2.domain = Raw(nbBytes=(3, 4))
+    >>> print(cache.align(symbol, [b"hello bob"], encoded=False))
+    f1       | f2   
+    -------- | -----
+    'hello ' | 'bob'
+    -------- | -----
+    >>> cache.nbAlignedData
+    4
+
+    """
+
+    def __init__(self):
+        # encoded -> (structure signature, headers, {data: aligned data})
+        self.__entries = dict()
+        self.__nbAlignedData = 0
+
+    def __reduce__(self):
+        # Cached alignments are neither serialized nor copied
+        return (AlignmentCache, ())
+
+    def clear(self):
+        """Forgets all the cached alignments."""
+        self.__entries = dict()
+
+    def align(self, field, data, encoded=True):
+        """Returns the alignment of the specified data with the provided
+        field. Only data that are not already in the cache are aligned.
+
+        :param field: the field to consider when aligning
+        :type field: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :param data: the data to align
+        :type data: :class:`list`
+        :keyword encoded: indicates if the result should be encoded following field definition
+        :type encoded: :class:`bool`
+        :return: the aligned data
+        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        """
+        signature = self.__computeSignature(field, encoded)
+
+        (cachedSignature, headers, alignedData) = self.__entries.get(
+            encoded, (None, None, dict()))
+        if cachedSignature != signature:
+            headers = None
+            alignedData = dict()
+
+        newData = [d for d in OrderedDict.fromkeys(data) if d not in alignedData]
+        if len(newData) > 0:
+            self._logger.debug("Align {0} new data out of {1}".format(
+                len(newData), len(data)))
+            from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
+            if ParallelDataAlignment.isRelevantFor(newData):
+                # Execute a parallel alignment
+                newAlignedData = ParallelDataAlignment.align(
+                    newData, field, encoded=encoded)
+            else:
+                # Execute a sequential alignment
+                from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
+                newAlignedData = DataAlignment.align(
+                    newData, field, encoded=encoded)
+            headers = newAlignedData.headers
+            for (d, alignedD) in zip(newData, newAlignedData):
+                alignedData[d] = alignedD
+            self.__nbAlignedData += len(newData)
+
+        # Only the alignment of the requested data are kept
+        result = MatrixList()
+        result.headers = headers
+        keptData = dict()
+        for d in data:
+            keptData[d] = alignedData[d]
+            result.append(list(alignedData[d]))
+        self.__entries[encoded] = (signature, headers, keptData)
+
+        return result
+
+    def __computeSignature(self, field, encoded):
+        """Computes a signature of the structure used to align data with
+        the specified field. The domains are described in the signature
+        so that their in-place modifications are also detected."""
+
+        root = field
+        while root.hasParent():
+            root = root.parent
+
+        signature = [id(root), root.structureVersion]
+        for leafField in [field] + root.getLeafFields():
+            domain = getattr(leafField, "domain", None)
+            if domain is not None:
+                domainSignature = (id(domain), domain._str_debug())
+            else:
+                domainSignature = None
+            if encoded:
+                encodingSignature = tuple(
+                    id(f) for f in leafField.encodingFunctions.values())
+            else:
+                encodingSignature = None
+            signature.append((leafField.id, leafField.name, domainSignature,
+                              encodingSignature))
+        return tuple(signature)
+
+    @property
+    def nbAlignedData(self):
+        """The number of data that have been aligned through this cache.
+
+        :type: :class:`int`
+        """
+        return self.__nbAlignedData
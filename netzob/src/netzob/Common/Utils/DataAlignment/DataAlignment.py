@@ -157,10 +157,26 @@ class DataAlignment(object):
 
         result.headers = [str(field.name) for field in targetedFieldLeafFields]
         from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+        from netzob.Model.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+
+        # the fields are compiled once and the plan is reused for every data
+        plan = ParsingPlan(targetedFieldLeafFields)
+        fieldLeafFields = self.field.getLeafFields(depth=self.depth)
+        fieldsEncodingFunctions = []
+        for currentField in targetedFieldLeafFields:
+            if self.encoded:
+                fieldsEncodingFunctions.append(
+                    list(currentField.encodingFunctions.values()))
+            else:
+                fieldsEncodingFunctions.append([])
+        fieldsInResult = [
+            currentField in fieldLeafFields
+            for currentField in targetedFieldLeafFields
+        ]
+
         for d in self.data:
             mp = MessageParser()
-            # alignedMsg = mp.parseRaw(TypeConverter.convert(d, HexaString, Raw), targetedFieldLeafFields)
-            alignedMsg = next(mp.parseRaw(d, targetedFieldLeafFields))
+            alignedMsg = next(mp.parseRaw(d, plan))
 
             alignedEncodedMsg = []
             for ifield, currentField in enumerate(targetedFieldLeafFields):
@@ -168,16 +184,14 @@ class DataAlignment(object):
                 # now we apply encoding and mathematic functions
                 fieldValue = alignedMsg[ifield]
 
-                if self.encoded and len(
-                        list(currentField.encodingFunctions.values())) > 0:
-                    for encodingFunction in list(
-                            currentField.encodingFunctions.values()):
+                if len(fieldsEncodingFunctions[ifield]) > 0:
+                    for encodingFunction in fieldsEncodingFunctions[ifield]:
                         fieldValue = encodingFunction.encode(fieldValue)
                 else:
                     fieldValue = TypeConverter.convert(fieldValue, BitArray,
                                                        Raw)
 
-                if currentField in self.field.getLeafFields(depth=self.depth):
+                if fieldsInResult[ifield]:
                     alignedEncodedMsg.append(fieldValue)
 
             result.append(alignedEncodedMsg)
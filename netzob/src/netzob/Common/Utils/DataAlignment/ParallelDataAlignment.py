@@ -34,7 +34,12 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports
 # +---------------------------------------------------------------------------+
+import atexit
+import hashlib
+import io
+import math
 import multiprocessing
+import pickle
 import time
 from collections import OrderedDict
 
@@ -46,16 +51,103 @@ from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
 from netzob.Common.Utils.MatrixList import MatrixList
 
+# Pool of processes shared by all the parallel alignments
+_pool = None
+_poolSize = None
+
+# Maximum time (in seconds) a worker waits for the others while the
+# field of an alignment is broadcasted
+_BROADCAST_TIMEOUT = 60
+
+# Fields already deserialized by the current worker, indexed by the
+# digest of their serialization
+_workerFields = dict()
+
+# Barrier shared by the workers of the pool, it ensures each worker
+# receives one of the broadcasted fields
+_workerBarrier = None
+
+
+class _FieldPickler(pickle.Pickler):
+    """Pickler that does not serialize the messages attached to the
+    symbol of the field, as they are not needed to align data."""
+
+    def __init__(self, file, messages):
+        super(_FieldPickler, self).__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.messages = messages
+
+    def persistent_id(self, obj):
+        if self.messages is not None and obj is self.messages:
+            return "messages"
+        return None
+
+
+class _FieldUnpickler(pickle.Unpickler):
+    """Unpickler that replaces the messages left apart by
+    :class:`_FieldPickler` with an empty list of messages."""
+
+    def persistent_load(self, pid):
+        from netzob.Common.Utils.TypedList import TypedList
+        from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
+        return TypedList(AbstractMessage)
+
+
+def _initializeWorker(barrier):
+    """Initializer of the workers of the pool."""
+    global _workerBarrier
+    _workerBarrier = barrier
+
+
+def _loadField(arg):
+    """Deserializes the broadcasted field in the current worker, unless
+    it already holds it. The worker then waits for all the others, so
+    each worker of the pool receives exactly one broadcast. Returns
+    False if the field cannot be deserialized, for instance if it
+    references a class that was defined after the pool was created.
+    """
+    (fieldDigest, serializedField) = arg
+
+    loaded = True
+    if fieldDigest not in _workerFields:
+        _workerFields.clear()
+        try:
+            _workerFields[fieldDigest] = _FieldUnpickler(
+                io.BytesIO(serializedField)).load()
+        except Exception:
+            loaded = False
+
+    _workerBarrier.wait()
+    return loaded
+
 
 def _executeDataAlignment(arg, **kwargs):
     """Wrapper used to parallelize the DataAlignment using
-    a pool of threads.
+    a pool of processes. The field has been broadcasted to the workers
+    beforehand, the tasks only carry the digest of its serialization.
     """
-    data = arg[0]
-    field = arg[1]
-    encoded = arg[2]
-    alignedData = DataAlignment.align([data], field, encoded=encoded)
-    return (data, alignedData)
+    (fieldDigest, data, depth, encoded) = arg
+
+    field = _workerFields.get(fieldDigest)
+    if field is None:
+        raise Exception(
+            "The field {0} has not been broadcasted to this worker".format(
+                fieldDigest))
+
+    alignedData = DataAlignment.align(
+        data, field, depth=depth, encoded=encoded)
+    return (alignedData.headers, list(alignedData))
+
+
+def _terminatePool():
+    global _pool, _poolSize
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    _pool = None
+    _poolSize = None
+
+
+atexit.register(_terminatePool)
 
 
 @NetzobLogger
@@ -63,6 +155,14 @@ class ParallelDataAlignment(object):
     """Allows to align specified datas given a common field definition
     in parallel way.
 
+    The alignment relies on a pool of processes that is created once
+    and reused by all the alignments. The field definition is serialized
+    (without the messages of its symbol) and broadcasted once per
+    alignment to the workers, which only deserialize it if they do not
+    already hold it. Data are then split in chunks that only reference
+    the field by its digest, and aligned data are returned following the
+    order of the provided data.
+
     >>> from netzob.all import *
     >>> import random
     >>> import time
@@ -102,15 +202,67 @@ class ParallelDataAlignment(object):
     >>> logging.getLogger(Data.__name__).setLevel(old_logging_level)
     >>> logging.getLogger(DataAlignment.__name__).setLevel(old_logging_level)
 
+    Aligned data follow the order of the provided data, whatever the
+    size of the chunks sent to the workers. The messages of the symbol are
+    not sent to the workers.
+
+    >>> messages = [RawMessage("hello {0}, welcome".format(name)) for name in ["john", "kurt", "john", "bob"]]
+    >>> symbol = Symbol([Field("hello "), Field(ASCII(nbChars=(3, 4))), Field(", welcome")], messages=messages)
+    >>> data = [message.data for message in messages]
+    >>> print(ParallelDataAlignment.align(data, symbol, nbThread=2, chunkSize=1))
+    Field    | Field  | Field      
+    -------- | ------ | -----------
+    'hello ' | 'john' | ', welcome'
+    'hello ' | 'kurt' | ', welcome'
+    'hello ' | 'john' | ', welcome'
+    'hello ' | 'bob'  | ', welcome'
+    -------- | ------ | -----------
+    >>> print(len(symbol.messages))
+    4
+
+    If the field references a class unknown to the workers (here, a
+    module created after the pool), the pool is created again before
+    aligning the data.
+
+    >>> import sys, types
+    >>> pool = ParallelDataAlignment.getPool(2)
+    >>> module = types.ModuleType("netzob_late_fields")
+    >>> sys.modules[module.__name__] = module
+    >>> module.LateField = type("LateField", (Field, ), {"__module__": module.__name__})
+    >>> symbol = Symbol([Field("hello "), module.LateField(ASCII(nbChars=(3, 4))), Field(", welcome")])
+    >>> print(ParallelDataAlignment.align(data, symbol, nbThread=2, chunkSize=1))
+    Field    | Field  | Field      
+    -------- | ------ | -----------
+    'hello ' | 'john' | ', welcome'
+    'hello ' | 'kurt' | ', welcome'
+    'hello ' | 'john' | ', welcome'
+    'hello ' | 'bob'  | ', welcome'
+    -------- | ------ | -----------
+    >>> ParallelDataAlignment.getPool(2) is pool
+    False
+    >>> del sys.modules[module.__name__]
+
+    Above :attr:`ParallelDataAlignment.AUTO_THRESHOLD` messages (and if
+    more than one processor is available), :meth:`AbstractField.getCells`
+    relies on a parallel alignment. This threshold can be changed, or set
+    to None to always use a sequential alignment.
+
+    >>> ParallelDataAlignment.AUTO_THRESHOLD
+    1000
 
     """
 
+    # Number of data from which the cells of a field are computed with
+    # a parallel alignment
+    AUTO_THRESHOLD = 1000
+
     def __init__(self,
                  field,
                  depth=None,
                  nbThread=None,
                  encoded=False,
-                 styled=False):
+                 styled=False,
+                 chunkSize=None):
         """Constructor.
 
         :param field: the format definition that will be user
@@ -123,6 +275,8 @@ class ParallelDataAlignment(object):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword chunkSize: the number of data sent at once to a worker (use None for an automatic size)
+        :type chunkSize: :class:`int`
 
         """
 
@@ -132,27 +286,85 @@ class ParallelDataAlignment(object):
         self.nbThread = nbThread
         self.encoded = encoded
         self.styled = styled
+        self.chunkSize = chunkSize
 
-    def __collectResults_cb(self, tupple_result):
-        """This callback is executed by each thread when it finishes
-        to align data. Every thread submit its results using these callback.
-        :param data: the data to align
-        :type data: :class:`str`
-        :param result: the result of an alignment
-        :type result: :class:`list`
-        :raise Exception: if the parameter is not valid
-        """
-        if tupple_result is None:
-            raise TypeError("parameter cannot be none")
+    @staticmethod
+    def isRelevantFor(data):
+        """Returns True if a parallel alignment should be prefered to a
+        sequential one to align the specified data.
+
+        >>> from netzob.all import *
+        >>> ParallelDataAlignment.isRelevantFor([b"hello"])
+        False
 
-        for (data, result) in tupple_result:
-            if data is None:
-                raise TypeError("data cannot be None")
+        :param data: the list of data that will be aligned
+        :type data: a :class:`list` of data to align
+        :rtype: :class:`bool`
+        """
+        threshold = ParallelDataAlignment.AUTO_THRESHOLD
+        if threshold is None or len(data) < threshold:
+            return False
+        if multiprocessing.cpu_count() < 2:
+            return False
+        # daemonic processes (such as pool workers) cannot have children
+        return not multiprocessing.current_process().daemon
 
-            if result is None:
-                raise TypeError("result cannot be none")
+    @staticmethod
+    def getPool(nbThread):
+        """Returns the pool of processes shared by the parallel
+        alignments. The pool is only created again if a different
+        number of processes is requested.
 
-            self.asyncResult[data] = result
+        :param nbThread: the number of processes of the pool
+        :type nbThread: :class:`int`
+        :rtype: :class:`multiprocessing.pool.Pool`
+        """
+        global _pool, _poolSize
+        if _pool is None or _poolSize != nbThread:
+            _terminatePool()
+            barrier = multiprocessing.Barrier(
+                nbThread, timeout=_BROADCAST_TIMEOUT)
+            _pool = multiprocessing.Pool(
+                nbThread, initializer=_initializeWorker, initargs=(barrier, ))
+            _poolSize = nbThread
+        return _pool
+
+    def __broadcastField(self, fieldDigest, serializedField):
+        """Sends the serialized field once to each worker of the pool and
+        returns the pool. If a worker cannot deserialize it, the pool is
+        created again (its workers then know all the classes defined so
+        far) and None is returned if the field still cannot be
+        deserialized."""
+
+        broadcast = [(fieldDigest, serializedField)] * self.nbThread
+        for attempt in range(2):
+            pool = ParallelDataAlignment.getPool(self.nbThread)
+            try:
+                loaded = pool.map(_loadField, broadcast, chunksize=1)
+            except Exception as e:
+                self._logger.debug(
+                    "Cannot broadcast the field to the workers: {0}".format(e))
+                loaded = [False]
+            if all(loaded):
+                return pool
+            _terminatePool()
+        return None
+
+    def __serializeField(self):
+        """Serializes the field definition, without the messages
+        attached to its symbol."""
+
+        messages = None
+        root = self.field
+        while root.hasParent():
+            root = root.parent
+        from netzob.Model.Vocabulary.Symbol import Symbol
+        if isinstance(root, Symbol):
+            messages = root.messages
+
+        output = io.BytesIO()
+        _FieldPickler(output, messages).dump(self.field)
+        return output.getvalue()
 
     @typeCheck(list)
     def execute(self, data):
@@ -165,44 +377,68 @@ class ParallelDataAlignment(object):
         """
 
         # Create a list of data removed from duplicate entry
-        noDuplicateData = list(set(data))
-
-        # Async result host just aligned data under form [(data, alignedData)]
-        self.asyncResult = OrderedDict()
+        noDuplicateData = list(OrderedDict.fromkeys(data))
 
         # Measure start time
         start = time.time()
 
-        # Create a pool of 'nbThead' threads (process)
-        pool = multiprocessing.Pool(self.nbThread)
-
-        # Execute Data Alignment
-        pool.map_async(
-            _executeDataAlignment,
-            list(
-                zip(noDuplicateData, [self.field] * len(noDuplicateData),
-                    [self.encoded] * len(noDuplicateData), [self.styled] * len(
-                        noDuplicateData))),
-            callback=self.__collectResults_cb)
-
-        # Waits all alignment tasks finish
-        pool.close()
-        pool.join()
+        try:
+            serializedField = self.__serializeField()
+        except Exception as e:
+            self._logger.debug("Cannot serialize the field: {0}".format(e))
+            serializedField = None
+
+        pool = None
+        if serializedField is not None:
+            fieldDigest = hashlib.sha1(serializedField).hexdigest()
+            pool = self.__broadcastField(fieldDigest, serializedField)
+
+        alignedData = dict()
+        headers = None
+        if pool is None:
+            # the workers cannot rebuild the field, it is aligned in-process
+            self._logger.debug(
+                "The field cannot be sent to the workers, data are aligned sequentially")
+            chunkResult = DataAlignment.align(
+                noDuplicateData, self.field, depth=self.depth,
+                encoded=self.encoded)
+            headers = chunkResult.headers
+            for (d, alignedD) in zip(noDuplicateData, chunkResult):
+                alignedData[d] = alignedD
+        else:
+            chunkSize = self.chunkSize
+            if chunkSize is None:
+                # a few chunks per worker balance the load between workers
+                chunkSize = int(
+                    math.ceil(len(noDuplicateData) / float(self.nbThread * 4)))
+            chunkSize = max(1, chunkSize)
+
+            tasks = []
+            for i in range(0, len(noDuplicateData), chunkSize):
+                tasks.append((fieldDigest, noDuplicateData[i:i + chunkSize],
+                              self.depth, self.encoded))
+
+            # Execute Data Alignment, results are returned in the order of the tasks
+            results = pool.imap(_executeDataAlignment, tasks)
+            for (task, (chunkHeaders, chunkResult)) in zip(tasks, results):
+                headers = chunkHeaders
+                for (d, alignedD) in zip(task[1], chunkResult):
+                    alignedData[d] = alignedD
 
         # Measure end time
         end = time.time()
 
         # create a Matrix List based on aligned data and requested data
         result = MatrixList()
-        if len(data) > 0:
-            result.headers = self.asyncResult[data[0]].headers
+        if headers is not None:
+            result.headers = headers
 
         for d in data:
-            if d not in list(self.asyncResult.keys()):
+            if d not in alignedData:
                 raise Exception(
                     "At least one data ({0}) has not been successfully computed by the alignment".
                     format(repr(d)))
-            result.extend(self.asyncResult[d])
+            result.append(alignedData[d])
 
         # check the number of computed alignment
         if len(result) != len(data):
@@ -221,7 +457,8 @@ class ParallelDataAlignment(object):
               depth=None,
               nbThread=None,
               encoded=False,
-              styled=False):
+              styled=False,
+              chunkSize=None):
         """Execute an alignment of specified data with provided field.
         The alignment will be perfomed in parallel
         Data must be provided as a list of hexastring.
@@ -238,12 +475,14 @@ class ParallelDataAlignment(object):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword chunkSize: the number of data sent at once to a worker (use None for an automatic size)
+        :type chunkSize: :class:`int`
 
         :return: the aligned data
         :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
         """
         pAlignment = ParallelDataAlignment(field, depth, nbThread, encoded,
-                                           styled)
+                                           styled, chunkSize)
         return pAlignment.execute(data)
 
     # Properties
@@ -339,3 +578,23 @@ class ParallelDataAlignment(object):
             raise ValueError("Styled cannot be None")
 
         self.__styled = styled
+
+    @property
+    def chunkSize(self):
+        """The chunkSize represents the number of data sent at once to
+        a worker of the pool.
+
+        If set to None, data are split in four chunks per worker.
+
+        :type: :class:`int`
+        """
+        return self.__chunkSize
+
+    @chunkSize.setter
+    @typeCheck(int)
+    def chunkSize(self, chunkSize):
+        if chunkSize is not None and chunkSize < 1:
+            raise ValueError(
+                "ChunkSize cannot be <1, use None for an automatic size.")
+
+        self.__chunkSize = chunkSize
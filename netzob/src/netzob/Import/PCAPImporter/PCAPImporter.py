@@ -29,6 +29,8 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 import errno
+import socket
+import struct
 from gettext import gettext as _
 
 #+---------------------------------------------------------------------------+
@@ -49,6 +51,7 @@ from netzob.Import.PCAPImporter import ImpactDecoder as Decoders
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Common.Utils.SortedTypedList import SortedTypedList
 from netzob.Common.NetzobException import NetzobImportException
+from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Types.HexaString import HexaString
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
@@ -145,6 +148,16 @@ class PCAPImporter(object):
 
     PROTOCOL201 = 201
 
+    # Protocol numbers of the decoded layers
+    VLAN_TAGS = (0x8100, 0x88a8, 0x9100)
+    ETHERTYPE_IP = 0x0800
+    ETHERTYPE_IPV6 = 0x86DD
+    IP_PROTOCOL_TCP = 6
+    IP_PROTOCOL_UDP = 17
+    IPV6_FRAGMENT = 44
+    IPV6_AUTHENTICATION = 51
+    IPV6_EXTENSION_HEADERS = (0, 43, 44, 51, 60, 135)
+
     # Supported datalinks (by pcapy)
     SUPPORTED_DATALINKS = {
         pcapy.DLT_ARCNET: "DLT_ARCNET",
@@ -169,8 +182,16 @@ class PCAPImporter(object):
         pass
 
     @typeCheck(str, str, int)
-    def __readMessagesFromFile(self, filePath, bpfFilter, nbPackets):
-        """Internal methods to read all messages from a given PCAP file."""
+    def __iterMessagesFromFile(self, filePath, bpfFilter, nbPackets):
+        """Internal generator that reads the messages of a given PCAP file,
+        packets are decoded one at a time (following their order in the
+        file).
+
+        When no BPF filter is requested, the file is mapped in memory and
+        parsed by a :class:`PCAPReader`: packets and headers are read in
+        place and a single copy of the payload is made when the message is
+        built. Otherwise, libpcap (through pcapy) reads and filters the
+        packets."""
         if (filePath is None):
             raise TypeError("filePath cannot be None")
         if (nbPackets < 0):
@@ -190,6 +211,16 @@ class PCAPImporter(object):
             else:
                 raise e
 
+        if (bpfFilter is None or len(bpfFilter) == 0) and PCAPReader.isSupported(filePath):
+            packetReader = PCAPReader(filePath)
+            self.__checkDatalink(self.__normalizeDatalink(packetReader.datalink))
+            for (epoch, datalink, payload) in packetReader.iterPackets(nbPackets):
+                self.datalink = self.__normalizeDatalink(datalink)
+                message = self.__decodePacket(epoch, payload)
+                if message is not None:
+                    yield message
+            return
+
         # Check (and configure) the bpf filter
         packetReader = pcapy.open_offline(filePath)
         try:
@@ -199,8 +230,31 @@ class PCAPImporter(object):
                 "The provided BPF filter is not valid (it should follow the BPF format)"
             )
 
-        # Check the datalink
-        self.datalink = packetReader.datalink()
+        self.__checkDatalink(packetReader.datalink())
+
+        nbReadPackets = 0
+        while nbPackets == 0 or nbReadPackets < nbPackets:
+            (header, payload) = packetReader.next()
+            if header is None:
+                break
+            nbReadPackets += 1
+            (secs, usecs) = header.getts()
+            epoch = secs + (usecs / 1000000.0)
+            message = self.__decodePacket(epoch, memoryview(payload))
+            if message is not None:
+                yield message
+
+    def __normalizeDatalink(self, datalink):
+        """Converts a datalink returned by a :class:`PCAPReader` in the
+        equivalent pcapy value."""
+        if datalink == PCAPReader.DLT_RAW:
+            return pcapy.DLT_RAW
+        return datalink
+
+    def __checkDatalink(self, datalink):
+        """Verifies the datalink of a capture can be decoded at the
+        requested import layer."""
+        self.datalink = datalink
         if self.datalink not in list(PCAPImporter.SUPPORTED_DATALINKS.keys()):
             self._logger.debug("Unkown datalinks")
 
@@ -212,65 +266,61 @@ class PCAPImporter(object):
                                  str(self.datalink))
             raise NetzobImportException("PCAP", errorMessage,
                                         self.INVALID_LAYER2)
-        else:
-            packetReader.loop(nbPackets, self.__packetHandler)
 
-    def __packetHandler(self, header, payload):
-        """Internal callback executed on each packet when parsing the pcap"""
-        (secs, usecs) = header.getts()
-        epoch = secs + (usecs / 1000000.0)
-        self._logger.debug('ImportLayer = '+ str(self.importLayer))
+    def __decodePacket(self, epoch, payload):
+        """Internal method that decodes a packet of the pcap and returns
+        the associated message (or None if the packet is ignored).
+        The payload is a :class:`memoryview`, it is only copied once the
+        data of the message is known."""
         if self.importLayer == 1:
             if len(payload) == 0:
-                return
+                return None
             # Build the RawMessage
-            rawMessage = RawMessage(payload, epoch, source=None, destination=None)
-
-            self.messages.add(rawMessage)
+            rawMessage = RawMessage(bytes(payload), epoch, source=None, destination=None)
+            return rawMessage
 
         elif self.importLayer == 2:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
-                 etherType) = self.__decodeLayer2(header, payload)
+                 etherType) = self.__decodeLayer2(payload)
             except NetzobImportException as e:
                 self._logger.warn(
                     "An error occured while decoding layer2 of a packet: {0}".
                     format(e))
-                return
+                return None
             if len(l2Payload) == 0:
-                return
+                return None
 
             # Build the L2NetworkMessage
-            l2Message = L2NetworkMessage(l2Payload, epoch, l2Proto, l2SrcAddr,
-                                         l2DstAddr)
-
-            self.messages.add(l2Message)
+            l2Message = L2NetworkMessage(bytes(l2Payload), epoch, l2Proto,
+                                         l2SrcAddr, l2DstAddr)
+            return l2Message
 
         elif self.importLayer == 3:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
-                 etherType) = self.__decodeLayer2(header, payload)
+                 etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload,
                  ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
             except NetzobImportException as e:
                 self._logger.warn(
                     "An error occured while decoding layer2 and layer3 of a packet: {0}".
                     format(e))
-                return
+                return None
 
             if len(l3Payload) == 0:
-                return
+                return None
 
             # Build the L3NetworkMessage
-            l3Message = L3NetworkMessage(l3Payload, epoch, l2Proto, l2SrcAddr,
-                                         l2DstAddr, l3Proto, l3SrcAddr,
-                                         l3DstAddr)
-            self.messages.add(l3Message)
+            l3Message = L3NetworkMessage(bytes(l3Payload), epoch, l2Proto,
+                                         l2SrcAddr, l2DstAddr, l3Proto,
+                                         l3SrcAddr, l3DstAddr)
+            return l3Message
 
         elif self.importLayer == 4:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
-                 etherType) = self.__decodeLayer2(header, payload)
+                 etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload,
                  ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
                 (l4Proto, l4SrcPort, l4DstPort,
@@ -279,21 +329,20 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2, layer3 or layer4 of a packet: {0}".
                     format(e))
-                return
+                return None
             if len(l4Payload) == 0:
-                return
+                return None
 
             # Build the L4NetworkMessage
             l4Message = L4NetworkMessage(
-                l4Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto,
-                l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
-
-            self.messages.add(l4Message)
+                bytes(l4Payload), epoch, l2Proto, l2SrcAddr, l2DstAddr,
+                l3Proto, l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
+            return l4Message
 
         else:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
-                 etherType) = self.__decodeLayer2(header, payload)
+                 etherType) = self.__decodeLayer2(payload)
                 (l3Proto, l3SrcAddr, l3DstAddr, l3Payload,
                  ipProtocolNum) = self.__decodeLayer3(etherType, l2Payload)
                 (l4Proto, l4SrcPort, l4DstPort,
@@ -302,75 +351,121 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2, layer3, layer4 or layer5 of a packet: {0}".
                     format(e))
-                return
+                return None
             if len(l4Payload) == 0:
-                return
+                return None
 
             l5Message = L4NetworkMessage(
-                l4Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto,
-                l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
-            
-            self.messages.add(l5Message)
+                bytes(l4Payload), epoch, l2Proto, l2SrcAddr, l2DstAddr,
+                l3Proto, l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
+            return l5Message
+
+    def __checkHeaderSize(self, payload, headerSize, layer, errorCode):
+        """Raises a NetzobImportException if the payload is too short to
+        contain the expected header."""
+        if len(payload) < headerSize:
+            warnMessage = _("Cannot import one of the provided packets since "
+                            + "its layer {0} is truncated ({1} bytes instead "
+                            + "of {2})").format(layer, len(payload),
+                                                headerSize)
+            raise NetzobImportException("PCAP", warnMessage, errorCode)
 
-    def __decodeLayer2(self, header, payload):
-        """Internal method that parses the specified header and extracts
-        layer2 related proprieties."""
+    def __decodeLayer2(self, payload):
+        """Internal method that parses the specified frame and extracts
+        layer2 related proprieties. Headers are read in place, the returned
+        payload is a slice of the provided :class:`memoryview`."""
 
-        def formatMacAddress(arrayMac):
-            return ":".join("{0:0>2}".format(hex(b)[2:])
-                            for b in arrayMac.tolist())
+        def formatMacAddress(mac):
+            return ":".join("{0:02x}".format(b) for b in mac)
 
         if self.datalink == pcapy.DLT_EN10MB:
-            l2Decoder = Decoders.EthDecoder()
+            self.__checkHeaderSize(payload, 14, 2, self.INVALID_LAYER2)
             l2Proto = "Ethernet"
-            layer2 = l2Decoder.decode(payload)
-            l2SrcAddr = formatMacAddress(layer2.get_ether_shost())
-            l2DstAddr = formatMacAddress(layer2.get_ether_dhost())
-            l2Payload = payload[layer2.get_header_size():]
-            etherType = layer2.get_ether_type()
+            l2DstAddr = formatMacAddress(payload[0:6])
+            l2SrcAddr = formatMacAddress(payload[6:12])
+            # skip the VLAN tags (if any)
+            headerSize = 14
+            (etherType, ) = struct.unpack_from("!H", payload, 12)
+            while etherType in PCAPImporter.VLAN_TAGS and len(
+                    payload) >= headerSize + 4:
+                (etherType, ) = struct.unpack_from("!H", payload,
+                                                   headerSize + 2)
+                headerSize += 4
+            l2Payload = payload[headerSize:]
         elif self.datalink == pcapy.DLT_LINUX_SLL:
-            l2Decoder = Decoders.LinuxSLLDecoder()
+            self.__checkHeaderSize(payload, 16, 2, self.INVALID_LAYER2)
             l2Proto = "Linux SLL"
-            layer2 = l2Decoder.decode(payload)
-            l2SrcAddr = layer2.get_addr()
+            l2SrcAddr = bytes(payload[6:14])
             l2DstAddr = None
-            l2Payload = payload[layer2.get_header_size():]
-            etherType = layer2.get_ether_type()
+            (etherType, ) = struct.unpack_from("!H", payload, 14)
+            l2Payload = payload[16:]
         elif self.datalink == PCAPImporter.PROTOCOL201:
+            self.__checkHeaderSize(payload, 8, 2, self.INVALID_LAYER2)
             l2Proto = "Protocol 201"
-            hdr = payload.encode('hex')[0:8]
-            if hdr[6:] == "01":
+            if payload[3] == 0x01:
                 l2SrcAddr = "Received"
             else:
                 l2SrcAddr = "Sent"
             l2DstAddr = None
             l2Payload = payload[8:]
-            etherType = payload[4:6]
+            etherType = bytes(payload[4:6])
         elif self.datalink == pcapy.DLT_RAW:
             l2Proto = None
             l2SrcAddr = None
             l2DstAddr = None
             l2Payload = payload
-            etherType = 0x0800
+            etherType = PCAPImporter.ETHERTYPE_IP
+            if len(payload) > 0 and payload[0] >> 4 == 6:
+                etherType = PCAPImporter.ETHERTYPE_IPV6
+        else:
+            warnMessage = _("Cannot import one of the provided packets since "
+                            + "its layer 2 is unsupported ({0})").format(
+                                self.datalink)
+            raise NetzobImportException("PCAP", warnMessage,
+                                        self.INVALID_LAYER2)
 
         return (l2Proto, l2SrcAddr, l2DstAddr, l2Payload, etherType)
 
     def __decodeLayer3(self, etherType, l2Payload):
-        """Internal method that parses the specified header and extracts
+        """Internal method that parses the specified packet and extracts
         layer3 related proprieties."""
 
-        if etherType == Packets.IP.ethertype:
+        if etherType == PCAPImporter.ETHERTYPE_IP:
+            self.__checkHeaderSize(l2Payload, 20, 3, self.INVALID_LAYER3)
             l3Proto = "IP"
-            l3Decoder = Decoders.IPDecoder()
-            layer3 = l3Decoder.decode(l2Payload)
-            paddingSize = len(l2Payload) - layer3.get_ip_len()
+            headerSize = (l2Payload[0] & 0x0F) * 4
+            (ipLength, ) = struct.unpack_from("!H", l2Payload, 2)
+            paddingSize = len(l2Payload) - ipLength
 
-            l3SrcAddr = layer3.get_ip_src()
-            l3DstAddr = layer3.get_ip_dst()
-            l3Payload = l2Payload[layer3.get_header_size():]
+            l3SrcAddr = socket.inet_ntoa(bytes(l2Payload[12:16]))
+            l3DstAddr = socket.inet_ntoa(bytes(l2Payload[16:20]))
+            l3Payload = l2Payload[headerSize:]
             if paddingSize > 0 and len(l3Payload) > paddingSize:
                 l3Payload = l3Payload[:len(l3Payload) - paddingSize]
-            ipProtocolNum = layer3.get_ip_p()
+            ipProtocolNum = l2Payload[9]
+            return (l3Proto, l3SrcAddr, l3DstAddr, l3Payload, ipProtocolNum)
+        elif etherType == PCAPImporter.ETHERTYPE_IPV6:
+            self.__checkHeaderSize(l2Payload, 40, 3, self.INVALID_LAYER3)
+            l3Proto = "IPv6"
+            (payloadLength, ) = struct.unpack_from("!H", l2Payload, 4)
+            l3SrcAddr = socket.inet_ntop(socket.AF_INET6,
+                                         bytes(l2Payload[8:24]))
+            l3DstAddr = socket.inet_ntop(socket.AF_INET6,
+                                         bytes(l2Payload[24:40]))
+            l3Payload = l2Payload[40:40 + payloadLength]
+
+            # skip the extension headers
+            ipProtocolNum = l2Payload[6]
+            while ipProtocolNum in PCAPImporter.IPV6_EXTENSION_HEADERS:
+                self.__checkHeaderSize(l3Payload, 8, 3, self.INVALID_LAYER3)
+                if ipProtocolNum == PCAPImporter.IPV6_FRAGMENT:
+                    headerSize = 8
+                elif ipProtocolNum == PCAPImporter.IPV6_AUTHENTICATION:
+                    headerSize = (l3Payload[1] + 2) * 4
+                else:
+                    headerSize = (l3Payload[1] + 1) * 8
+                ipProtocolNum = l3Payload[0]
+                l3Payload = l3Payload[headerSize:]
             return (l3Proto, l3SrcAddr, l3DstAddr, l3Payload, ipProtocolNum)
         else:
             warnMessage = _("Cannot import one of the provided packets since "
@@ -382,24 +477,21 @@ class PCAPImporter(object):
                                         self.INVALID_LAYER3)
 
     def __decodeLayer4(self, ipProtocolNum, l3Payload):
-        """Internal method that parses the specified header and extracts
+        """Internal method that parses the specified segment and extracts
         layer4 related proprieties."""
 
-        if ipProtocolNum == Packets.UDP.protocol:
+        if ipProtocolNum == PCAPImporter.IP_PROTOCOL_UDP:
+            self.__checkHeaderSize(l3Payload, 8, 4, self.INVALID_LAYER4)
             l4Proto = "UDP"
-            l4Decoder = Decoders.UDPDecoder()
-            layer4 = l4Decoder.decode(l3Payload)
-            l4SrcPort = layer4.get_uh_sport()
-            l4DstPort = layer4.get_uh_dport()
-            l4Payload = layer4.get_data_as_string()
+            (l4SrcPort, l4DstPort) = struct.unpack_from("!HH", l3Payload, 0)
+            l4Payload = l3Payload[8:]
             return (l4Proto, l4SrcPort, l4DstPort, l4Payload)
-        elif ipProtocolNum == Packets.TCP.protocol:
+        elif ipProtocolNum == PCAPImporter.IP_PROTOCOL_TCP:
+            self.__checkHeaderSize(l3Payload, 20, 4, self.INVALID_LAYER4)
             l4Proto = "TCP"
-            l4Decoder = Decoders.TCPDecoder()
-            layer4 = l4Decoder.decode(l3Payload)
-            l4SrcPort = layer4.get_th_sport()
-            l4DstPort = layer4.get_th_dport()
-            l4Payload = layer4.get_data_as_string()
+            (l4SrcPort, l4DstPort) = struct.unpack_from("!HH", l3Payload, 0)
+            headerSize = (l3Payload[12] >> 4) * 4
+            l4Payload = l3Payload[headerSize:]
             return (l4Proto, l4SrcPort, l4DstPort, l4Payload)
         else:
             warnMessage = _("Cannot import one of the provided packets since "
@@ -441,6 +533,55 @@ class PCAPImporter(object):
         :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
         """
 
+        self.__prepareImport(filePathList, importLayer)
+
+        # Call the method that does the import job for each PCAP file
+        self.messages = SortedTypedList(AbstractMessage)
+        for filePath in filePathList:
+            for message in self.__iterMessagesFromFile(filePath, bpfFilter,
+                                                       nbPackets):
+                self.messages.add(message)
+
+        # if requested, we merge consecutive messages that share same source and destination
+        if mergePacketsInFlow:
+            mergedMessages = SortedTypedList(AbstractMessage)
+            for message in self.__mergePacketsInFlow(self.messages.values()):
+                mergedMessages.add(message)
+            self.messages = mergedMessages
+
+        return self.messages
+
+    @typeCheck(list, str, int, int, bool)
+    def iterMessages(self,
+                     filePathList,
+                     bpfFilter="",
+                     importLayer=5,
+                     nbPackets=0,
+                     mergePacketsInFlow=False):
+        """Returns an iterator over the messages of a list of PCAP files.
+        Contrary to :meth:`readMessages`, packets are read and decoded on
+        demand, so the memory used does not depend on the size of the
+        captures. Messages are not sorted by date, they follow the order
+        of the files and of the packets in each file.
+
+        Parameters are the same as the ones of :meth:`readMessages`.
+
+        :return: an iterator over the captured messages
+        :rtype: an iterator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
+        self.__prepareImport(filePathList, importLayer)
+
+        messages = self.__iterMessagesFromFiles(filePathList, bpfFilter,
+                                                nbPackets)
+        if mergePacketsInFlow:
+            messages = self.__mergePacketsInFlow(messages)
+        return messages
+
+    def __prepareImport(self, filePathList, importLayer):
+        """Verifies the input files can be read and configures the
+        import layer."""
+
         # Verify the existence of input files
         errorMessageList = []
         for filePath in filePathList:
@@ -467,24 +608,27 @@ class PCAPImporter(object):
                 "Only layers level {0} are available.".format(availableLayers))
         self.importLayer = importLayer
 
-        # Call the method that does the import job for each PCAP file
-        self.messages = SortedTypedList(AbstractMessage)
+    def __iterMessagesFromFiles(self, filePathList, bpfFilter, nbPackets):
+        """Internal generator that reads the messages of each PCAP file"""
         for filePath in filePathList:
-            self.__readMessagesFromFile(filePath, bpfFilter, nbPackets)
-        
-        # if requested, we merge consecutive messages that share same source and destination
-        if mergePacketsInFlow:
-            mergedMessages = SortedTypedList(AbstractMessage)
-            previousMessage = None
-            for message in self.messages.values():
-                if previousMessage is not None and message.source == previousMessage.source and message.destination == previousMessage.destination:
-                    previousMessage.data += message.data
-                else:
-                    mergedMessages.add(message)
-                    previousMessage = message
-            self.messages = mergedMessages
-            
-        return self.messages
+            for message in self.__iterMessagesFromFile(filePath, bpfFilter,
+                                                       nbPackets):
+                yield message
+
+    def __mergePacketsInFlow(self, messages):
+        """Internal generator that merges consecutive messages that share
+        same source and destination. A message is yielded once the next
+        message of another flow has been read."""
+        previousMessage = None
+        for message in messages:
+            if previousMessage is not None and message.source == previousMessage.source and message.destination == previousMessage.destination:
+                previousMessage.data += message.data
+            else:
+                if previousMessage is not None:
+                    yield previousMessage
+                previousMessage = message
+        if previousMessage is not None:
+            yield previousMessage
 
     @staticmethod
     @typeCheck(list, str, int, int, bool)
@@ -545,6 +689,111 @@ class PCAPImporter(object):
         return importer.readFiles([filePath], bpfFilter, importLayer,
                                   nbPackets, mergePacketsInFlow)
 
+    @staticmethod
+    @typeCheck(list, str, int, int, bool)
+    def iterFiles(filePathList,
+                  bpfFilter="",
+                  importLayer=5,
+                  nbPackets=0,
+                  mergePacketsInFlow=False):
+        r"""Returns an iterator over the messages of a list of PCAP files.
+        Packets are decoded on demand (see :meth:`iterMessages`), it allows
+        to import captures bigger than the available memory.
+
+        >>> from netzob.all import *
+        >>> messages = PCAPImporter.iterFiles(["./test/resources/pcaps/test_import_udp.pcap"])
+        >>> print(repr(next(messages).data))
+        b'CMDidentify#\x07\x00\x00\x00Roberto'
+        >>> print(len(list(messages)))
+        13
+
+        :return: an iterator over the captured messages
+        :rtype: an iterator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
+        importer = PCAPImporter()
+        return importer.iterMessages(filePathList, bpfFilter, importLayer,
+                                     nbPackets, mergePacketsInFlow)
+
+    @staticmethod
+    @typeCheck(str, str, int, int, bool)
+    def iterFile(filePath,
+                 bpfFilter="",
+                 importLayer=5,
+                 nbPackets=0,
+                 mergePacketsInFlow=False):
+        """Returns an iterator over the messages of the specified PCAP
+        file (see :meth:`iterFiles`).
+
+        >>> from netzob.all import *
+        >>> messages = PCAPImporter.iterFile("./test/resources/pcaps/test_import_http_flow.pcap", mergePacketsInFlow=True)
+        >>> print([len(message.data) for message in messages])
+        [410, 3224]
+
+        :return: an iterator over the captured messages
+        :rtype: an iterator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
+        return PCAPImporter.iterFiles([filePath], bpfFilter, importLayer,
+                                      nbPackets, mergePacketsInFlow)
+
+    @staticmethod
+    @typeCheck(list, object, int, str, int, int, bool)
+    def readFilesByBatch(filePathList,
+                         callback,
+                         batchSize=1000,
+                         bpfFilter="",
+                         importLayer=5,
+                         nbPackets=0,
+                         mergePacketsInFlow=False):
+        """Reads the messages of a list of PCAP files and calls the callback
+        with each batch of (at most) `batchSize` consecutive messages.
+        Only one batch is kept in memory by the importer, so captures can be
+        piped into a symbol or an inference algorithm.
+
+        >>> from netzob.all import *
+        >>> symbol = Symbol(messages=[])
+        >>> PCAPImporter.readFilesByBatch(["./test/resources/pcaps/test_import_udp.pcap"], symbol.messages.extend, batchSize=5)
+        14
+        >>> print(len(symbol.messages))
+        14
+        >>> batchSizes = []
+        >>> PCAPImporter.readFilesByBatch(["./test/resources/pcaps/test_import_udp.pcap"], lambda batch: batchSizes.append(len(batch)), batchSize=5)
+        14
+        >>> print(batchSizes)
+        [5, 5, 4]
+
+        :param filePathList: a list of pcap files to read
+        :type filePathList: a list of :class:`str`
+        :param callback: the function called with each batch (a list of messages)
+        :type callback: a callable
+        :param batchSize: the maximum number of messages in a batch
+        :type batchSize: :class:`int`
+        :return: the number of imported messages
+        :rtype: :class:`int`
+
+        The other parameters are the ones of :meth:`readFiles`.
+        """
+        if callback is None:
+            raise TypeError("Callback cannot be None")
+        if batchSize < 1:
+            raise ValueError("The size of a batch must be >0.")
+
+        nbMessages = 0
+        batch = []
+        for message in PCAPImporter.iterFiles(filePathList, bpfFilter,
+                                              importLayer, nbPackets,
+                                              mergePacketsInFlow):
+            batch.append(message)
+            if len(batch) == batchSize:
+                callback(batch)
+                nbMessages += len(batch)
+                batch = []
+        if len(batch) > 0:
+            callback(batch)
+            nbMessages += len(batch)
+        return nbMessages
+
     @staticmethod
     @typeCheck(L2NetworkMessage)
     def getMessageDetails(message):
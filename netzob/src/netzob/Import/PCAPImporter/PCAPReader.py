@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports
+#+---------------------------------------------------------------------------+
+import mmap
+import struct
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+
+
+@NetzobLogger
+class PCAPReader(object):
+    r"""Reader of capture files (classic pcap and pcapng formats) that
+    maps the file in memory and parses the record headers in place. Packets
+    are returned as :class:`memoryview` slices of the mapped file, so no
+    copy is made until a message is built out of them.
+
+    >>> from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
+    >>> PCAPReader.isSupported("./test/resources/pcaps/test_import_udp.pcap")
+    True
+    >>> reader = PCAPReader("./test/resources/pcaps/test_import_udp.pcap")
+    >>> print(reader.datalink)
+    1
+    >>> packets = [(epoch, datalink, bytes(data)) for (epoch, datalink, data) in reader.iterPackets()]
+    >>> print(len(packets))
+    14
+    >>> (epoch, datalink, data) = packets[0]
+    >>> print(datalink, len(data))
+    1 65
+    >>> print(repr(data[-23:]))
+    b'CMDidentify#\x07\x00\x00\x00Roberto'
+
+    The number of packets to read can be limited.
+
+    >>> print(len(list(reader.iterPackets(nbPackets=3))))
+    3
+
+    Files following the pcapng format are also supported.
+
+    >>> reader = PCAPReader("./test/resources/pcaps/atm_capture1.pcap")
+    >>> packets = [bytes(data) for (epoch, datalink, data) in reader.iterPackets()]
+    >>> print(repr(packets[0][:20]))
+    b'E\x00\x00T\x17\x82\x00\x00@\x01U\xd3\xc0\xa8F\x01\xc0\xa8F\x02'
+
+    Other files are rejected.
+
+    >>> PCAPReader.isSupported("./test/resources/files/test_import_text_message.txt")
+    False
+    """
+
+    # Magic numbers of the classic pcap format (microsecond and
+    # nanosecond resolution)
+    PCAP_MAGIC_USEC = 0xa1b2c3d4
+    PCAP_MAGIC_NSEC = 0xa1b23c4d
+
+    # Block types of the pcapng format
+    PCAPNG_SECTION_HEADER = 0x0A0D0D0A
+    PCAPNG_INTERFACE_DESCRIPTION = 0x00000001
+    PCAPNG_OBSOLETE_PACKET = 0x00000002
+    PCAPNG_SIMPLE_PACKET = 0x00000003
+    PCAPNG_ENHANCED_PACKET = 0x00000006
+    PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+    # Options of the interface description block
+    PCAPNG_OPTION_END = 0
+    PCAPNG_OPTION_TSRESOL = 9
+    PCAPNG_OPTION_TSOFFSET = 14
+
+    # Link types stored in capture files that differ from the DLT values
+    # returned by libpcap
+    LINKTYPE_RAW = 101
+    LINKTYPE_IPV4 = 228
+    LINKTYPE_IPV6 = 229
+    DLT_RAW = 12
+
+    @typeCheck(str)
+    def __init__(self, filePath):
+        if filePath is None:
+            raise TypeError("filePath cannot be None")
+        self.filePath = filePath
+        self.datalink = None
+        self.datalink = self.__readDatalink()
+
+    @staticmethod
+    @typeCheck(str)
+    def isSupported(filePath):
+        """Returns True if the specified file starts with the magic number of
+        a classic pcap file or of a pcapng file."""
+        try:
+            with open(filePath, 'rb') as fd:
+                header = fd.read(24)
+        except IOError:
+            return False
+        if len(header) < 24:
+            return False
+        return PCAPReader.__getFormat(header) is not None
+
+    @staticmethod
+    def __getFormat(header):
+        """Returns the format ("pcap" or "pcapng") and the byte order of
+        the capture that starts with the specified header."""
+        for byteOrder in ("<", ">"):
+            (magic, ) = struct.unpack_from(byteOrder + "I", header, 0)
+            if magic in (PCAPReader.PCAP_MAGIC_USEC,
+                         PCAPReader.PCAP_MAGIC_NSEC):
+                return ("pcap", byteOrder)
+            if magic == PCAPReader.PCAPNG_SECTION_HEADER:
+                (byteOrderMagic, ) = struct.unpack_from(byteOrder + "I",
+                                                        header, 8)
+                if byteOrderMagic == PCAPReader.PCAPNG_BYTE_ORDER_MAGIC:
+                    return ("pcapng", byteOrder)
+        return None
+
+    @staticmethod
+    def normalizeDatalink(linkType):
+        """Converts a link type stored in a capture file in the equivalent
+        DLT value (as returned by libpcap)."""
+        if linkType in (PCAPReader.LINKTYPE_RAW, PCAPReader.LINKTYPE_IPV4,
+                        PCAPReader.LINKTYPE_IPV6):
+            return PCAPReader.DLT_RAW
+        return linkType
+
+    def __readDatalink(self):
+        """Returns the datalink of the first interface of the capture."""
+        for (epoch, datalink, data) in self.iterPackets(nbPackets=1):
+            return datalink
+        # the capture has no packet, only its header can be read
+        with open(self.filePath, 'rb') as fd:
+            header = fd.read(24)
+        captureFormat = PCAPReader.__getFormat(header) if len(header) >= 24 else None
+        if captureFormat is None:
+            raise ValueError("{0} is not a pcap or a pcapng file".format(
+                self.filePath))
+        (name, byteOrder) = captureFormat
+        if name == "pcap":
+            (linkType, ) = struct.unpack_from(byteOrder + "I", header, 20)
+            return PCAPReader.normalizeDatalink(linkType & 0xFFFF)
+        return None
+
+    @typeCheck(int)
+    def iterPackets(self, nbPackets=0):
+        """Generator over the packets of the capture. Each packet is
+        returned as a tuple (epoch, datalink, data) where data is a
+        :class:`memoryview` over the mapped file. A data slice must not be
+        kept after the iteration is over (copy it with :func:`bytes`).
+
+        :param nbPackets: the maximum number of packets to read (0 means all)
+        :type nbPackets: :class:`int`
+        """
+        if nbPackets is None or nbPackets < 0:
+            raise ValueError(
+                "A positive (or null) value is required for the number of packets to read."
+            )
+
+        with open(self.filePath, 'rb') as fd:
+            try:
+                mappedFile = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("{0} is not a pcap or a pcapng file".format(
+                    self.filePath))
+
+        view = memoryview(mappedFile)
+        try:
+            captureFormat = None
+            if len(view) >= 24:
+                captureFormat = PCAPReader.__getFormat(view)
+            if captureFormat is None:
+                raise ValueError("{0} is not a pcap or a pcapng file".format(
+                    self.filePath))
+            (name, byteOrder) = captureFormat
+            if name == "pcap":
+                packets = self.__iterPCAPPackets(view, byteOrder)
+            else:
+                packets = self.__iterPCAPNGPackets(view)
+
+            nbReadPackets = 0
+            for packet in packets:
+                yield packet
+                nbReadPackets += 1
+                if nbReadPackets == nbPackets:
+                    break
+            packets.close()
+        finally:
+            view.release()
+            try:
+                mappedFile.close()
+            except BufferError:
+                # a packet is still referenced, the mapping is closed once
+                # it is garbage collected
+                pass
+
+    def __iterPCAPPackets(self, view, byteOrder):
+        """Parses the records of a classic pcap file."""
+        (magic, versionMajor, versionMinor, thisZone, sigFigs, snapLen,
+         linkType) = struct.unpack_from(byteOrder + "IHHiIII", view, 0)
+        datalink = PCAPReader.normalizeDatalink(linkType & 0xFFFF)
+        nanoseconds = (magic == PCAPReader.PCAP_MAGIC_NSEC)
+
+        recordHeader = struct.Struct(byteOrder + "IIII")
+        offset = 24
+        size = len(view)
+        while offset + recordHeader.size <= size:
+            (secs, fraction, capturedLength,
+             originalLength) = recordHeader.unpack_from(view, offset)
+            offset += recordHeader.size
+            if offset + capturedLength > size:
+                self._logger.warn(
+                    "The capture {0} is truncated, its last packet is ignored".
+                    format(self.filePath))
+                return
+            usecs = fraction // 1000 if nanoseconds else fraction
+            yield (secs + (usecs / 1000000.0), datalink,
+                   view[offset:offset + capturedLength])
+            offset += capturedLength
+
+    def __iterPCAPNGPackets(self, view):
+        """Parses the blocks of a pcapng file. Each section has its own
+        byte order and its own list of interfaces."""
+        size = len(view)
+        offset = 0
+        byteOrder = "<"
+        interfaces = []
+        while offset + 12 <= size:
+            (blockType, ) = struct.unpack_from(byteOrder + "I", view, offset)
+            if blockType == PCAPReader.PCAPNG_SECTION_HEADER:
+                (byteOrderMagic, ) = struct.unpack_from("<I", view, offset + 8)
+                if byteOrderMagic == PCAPReader.PCAPNG_BYTE_ORDER_MAGIC:
+                    byteOrder = "<"
+                else:
+                    byteOrder = ">"
+                interfaces = []
+            (blockLength, ) = struct.unpack_from(byteOrder + "I", view,
+                                                 offset + 4)
+            if blockLength < 12 or offset + blockLength > size:
+                self._logger.warn(
+                    "The capture {0} is truncated, its last block is ignored".
+                    format(self.filePath))
+                return
+            body = offset + 8
+            end = offset + blockLength - 4
+
+            if blockType == PCAPReader.PCAPNG_INTERFACE_DESCRIPTION:
+                interfaces.append(
+                    self.__parseInterface(view, byteOrder, body, end))
+            elif blockType == PCAPReader.PCAPNG_ENHANCED_PACKET:
+                (interfaceId, tsHigh, tsLow, capturedLength,
+                 originalLength) = struct.unpack_from(byteOrder + "IIIII",
+                                                      view, body)
+                start = body + 20
+                yield self.__buildPacket(view, interfaces, interfaceId,
+                                         (tsHigh << 32) | tsLow, start,
+                                         min(start + capturedLength, end))
+            elif blockType == PCAPReader.PCAPNG_OBSOLETE_PACKET:
+                (interfaceId, drops, tsHigh, tsLow, capturedLength,
+                 originalLength) = struct.unpack_from(byteOrder + "HHIIII",
+                                                      view, body)
+                start = body + 20
+                yield self.__buildPacket(view, interfaces, interfaceId,
+                                         (tsHigh << 32) | tsLow, start,
+                                         min(start + capturedLength, end))
+            elif blockType == PCAPReader.PCAPNG_SIMPLE_PACKET:
+                # simple packets have no timestamp and belong to the first
+                # interface
+                (originalLength, ) = struct.unpack_from(byteOrder + "I", view,
+                                                        body)
+                start = body + 4
+                capturedLength = originalLength
+                if len(interfaces) > 0 and interfaces[0][1] > 0:
+                    capturedLength = min(capturedLength, interfaces[0][1])
+                yield self.__buildPacket(view, interfaces, 0, None, start,
+                                         min(start + capturedLength, end))
+            offset += blockLength
+
+    def __parseInterface(self, view, byteOrder, body, end):
+        """Returns the (datalink, snapLen, units per second, offset) of the
+        interface described in the specified block."""
+        (linkType, reserved, snapLen) = struct.unpack_from(byteOrder + "HHI",
+                                                           view, body)
+        unitsPerSecond = 1000000
+        tsOffset = 0
+        offset = body + 8
+        while offset + 4 <= end:
+            (code, length) = struct.unpack_from(byteOrder + "HH", view, offset)
+            if code == PCAPReader.PCAPNG_OPTION_END:
+                break
+            value = offset + 4
+            if code == PCAPReader.PCAPNG_OPTION_TSRESOL and length >= 1:
+                resolution = view[value]
+                if resolution & 0x80:
+                    unitsPerSecond = 2**(resolution & 0x7F)
+                else:
+                    unitsPerSecond = 10**resolution
+            elif code == PCAPReader.PCAPNG_OPTION_TSOFFSET and length >= 8:
+                (tsOffset, ) = struct.unpack_from(byteOrder + "q", view, value)
+            # option values are padded to 32 bits
+            offset = value + ((length + 3) & ~3)
+        return (PCAPReader.normalizeDatalink(linkType), snapLen,
+                unitsPerSecond, tsOffset)
+
+    def __buildPacket(self, view, interfaces, interfaceId, timestamp, start,
+                      end):
+        """Returns the (epoch, datalink, data) tuple of a pcapng packet."""
+        if interfaceId >= len(interfaces):
+            raise ValueError(
+                "The capture {0} refers to an undescribed interface ({1})".
+                format(self.filePath, interfaceId))
+        (datalink, snapLen, unitsPerSecond, tsOffset) = interfaces[interfaceId]
+        epoch = None
+        if timestamp is not None:
+            # timestamps are truncated to the microsecond, as libpcap does
+            secs = timestamp // unitsPerSecond
+            usecs = (timestamp % unitsPerSecond) * 1000000 // unitsPerSecond
+            epoch = secs + tsOffset + (usecs / 1000000.0)
+        return (epoch, datalink, view[start:end])
@@ -42,7 +42,6 @@ import os
 #+---------------------------------------------------------------------------+
 from pylstar.LSTAR import LSTAR
 from pylstar.Letter import Letter
-from pylstar.eqtests.RandomWalkMethod import RandomWalkMethod
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
@@ -50,9 +49,17 @@ from pylstar.eqtests.RandomWalkMethod import RandomWalkMethod
 from netzob.Common.Utils.Decorators import NetzobLogger
 from netzob.Simulator.AbstractionLayer import AbstractionLayer
 from netzob.Inference.Grammar.GenericMAT import GenericMAT
+from netzob.Inference.Grammar.PooledMAT import PooledMAT
+from netzob.Inference.Grammar.BatchRandomWalkMethod import BatchRandomWalkMethod
 
 @NetzobLogger
 class ActiveGrammarInferer(Thread):
+    """Infers the grammar of a target with the LSTAR algorithm.
+
+    The process wrapper and the channel can also be lists describing
+    several instances of the target (e.g. listening on distinct ports),
+    in which case the queries are submitted to them in parallel.
+    """
 
     def __init__(self, input_symbols, output_symbols, process_wrapper, channel, tmp_path=None):
         Thread.__init__(self)
@@ -73,8 +80,8 @@ class ActiveGrammarInferer(Thread):
 
         if self.lstar is not None:
             self.lstar.stop()
-        if self.process_wrapper is not None:
-            self.process_wrapper.stop(force=True)
+        for process_wrapper in self.__getProcessWrappers():
+            process_wrapper.stop(force=True)
             
     def run(self):
         self._logger.info("Configuring the inference process")
@@ -83,19 +90,35 @@ class ActiveGrammarInferer(Thread):
         input_letters = [Letter(s) for s in self.input_symbols]
 
         try:
-            # creates an abstraction layer on top of the channel to abstract and specialize received and sent messages
-            abstraction_layer = AbstractionLayer(
-                channel=self.channel,
-                symbols=self.input_symbols + self.output_symbols
-            )
-            # creates a minimal adequat teacher
-            mat = GenericMAT(
-                abstraction_layer=abstraction_layer,
-                process_wrapper=self.process_wrapper,
-                cache_file_path=os.path.join(self.tmp_path, "cache.dump"))
-
-            # configures the RandomWalkMethod that will be used as an equivalence query
-            eqtests = RandomWalkMethod(
+            cache_file_path = os.path.join(self.tmp_path, "cache.dump")
+            if isinstance(self.channel, list):
+                # creates an abstraction layer on top of each target instance
+                abstraction_layers = [
+                    AbstractionLayer(
+                        channel=channel,
+                        symbols=self.input_symbols + self.output_symbols)
+                    for channel in self.channel
+                ]
+                # creates a minimal adequat teacher that queries the instances in parallel
+                mat = PooledMAT(
+                    abstraction_layers=abstraction_layers,
+                    process_wrappers=self.__getProcessWrappers() or None,
+                    cache_file_path=cache_file_path,
+                    input_letters=input_letters)
+            else:
+                # creates an abstraction layer on top of the channel to abstract and specialize received and sent messages
+                abstraction_layer = AbstractionLayer(
+                    channel=self.channel,
+                    symbols=self.input_symbols + self.output_symbols
+                )
+                # creates a minimal adequat teacher
+                mat = GenericMAT(
+                    abstraction_layer=abstraction_layer,
+                    process_wrapper=self.process_wrapper,
+                    cache_file_path=cache_file_path)
+
+            # configures the BatchRandomWalkMethod that will be used as an equivalence query
+            eqtests = BatchRandomWalkMethod(
                 knowledge_base=mat,
                 input_letters=input_letters,
                 max_steps=50000,
@@ -117,9 +140,16 @@ class ActiveGrammarInferer(Thread):
             
             
         finally:
-            try:
-                self.process_wrapper.stop(force=True)
-            except Exception as e:
-                self._logger.info("Encountered the following error while stoping the process wrapper: {}".format(e))
-
-        
+            for process_wrapper in self.__getProcessWrappers():
+                try:
+                    process_wrapper.stop(force=True)
+                except Exception as e:
+                    self._logger.info("Encountered the following error while stoping the process wrapper: {}".format(e))
+
+    def __getProcessWrappers(self):
+        """Returns the list of the process wrappers of the target instances"""
+        if self.process_wrapper is None:
+            return []
+        if isinstance(self.process_wrapper, list):
+            return self.process_wrapper
+        return [self.process_wrapper]
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <gbossert (a) miskin.fr>                          |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import random
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from pylstar.Word import Word
+from pylstar.OutputQuery import OutputQuery
+from pylstar.eqtests.RandomWalkMethod import RandomWalkMethod
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Inference.Grammar.QueryPlanner import QueryPlanner
+
+
+@NetzobLogger
+class BatchRandomWalkMethod(RandomWalkMethod):
+    """This equivalence test performs random walks accross the hypothesis
+    states like the :class:`RandomWalkMethod`, but the walks are
+    generated by batches before being submitted. The walks of a batch
+    are planned in a prefix tree, so a walk that is the prefix of
+    another one is answered without being submitted, and the remaining
+    ones are resolved together (in parallel with a :class:`PooledMAT`).
+
+    A batch is checked before the next one is generated, so the walks
+    submitted after a counter-example are bounded by the batch size. By
+    default, a batch holds one walk per target of the knowledge base (a
+    single walk for a :class:`GenericMAT`).
+
+    >>> import random
+    >>> from pylstar.LSTAR import LSTAR
+    >>> from pylstar.automata.State import State
+    >>> from pylstar.automata.Transition import Transition
+    >>> from pylstar.automata.Automata import Automata
+    >>> from pylstar.Letter import Letter
+    >>> from pylstar.FakeActiveKnowledgeBase import FakeActiveKnowledgeBase
+    >>> from pylstar.eqtests.RandomWalkMethod import RandomWalkMethod
+    >>> from netzob.Inference.Grammar.BatchRandomWalkMethod import BatchRandomWalkMethod
+    >>> l_a = Letter("a")
+    >>> l_b = Letter("b")
+    >>> l_c = Letter("c")
+    >>> l_1 = Letter(1)
+    >>> l_2 = Letter(2)
+    >>> l_3 = Letter(3)
+    >>> s0 = State("S0")
+    >>> s1 = State("S1")
+    >>> s2 = State("S2")
+    >>> t1 = Transition("t1", output_state=s0, input_letter=l_a, output_letter=l_1)
+    >>> t2 = Transition("t2", output_state=s1, input_letter=l_b, output_letter=l_2)
+    >>> t3 = Transition("t3", output_state=s2, input_letter=l_c, output_letter=l_3)
+    >>> s0.transitions = [t1, t2, t3]
+    >>> t4 = Transition("t4", output_state=s1, input_letter=l_a, output_letter=l_2)
+    >>> t5 = Transition("t5", output_state=s1, input_letter=l_b, output_letter=l_3)
+    >>> t6 = Transition("t6", output_state=s0, input_letter=l_c, output_letter=l_1)
+    >>> s1.transitions = [t4, t5, t6]
+    >>> t7 = Transition("t7", output_state=s2, input_letter=l_a, output_letter=l_2)
+    >>> t8 = Transition("t8", output_state=s2, input_letter=l_b, output_letter=l_3)
+    >>> t9 = Transition("t9", output_state=s1, input_letter=l_c, output_letter=l_1)
+    >>> s2.transitions = [t7, t8, t9]
+    >>> automata = Automata(s0)
+    >>> input_vocabulary = ["a", "b", "c"]
+    >>> input_letters = [Letter(s) for s in input_vocabulary]
+
+    >>> random.seed(0)
+    >>> kbase = FakeActiveKnowledgeBase(automata)
+    >>> eqTests = BatchRandomWalkMethod(kbase, input_letters, 10000, 0.75)
+    >>> eqTests.batch_size
+    1
+    >>> lstar = LSTAR(input_vocabulary, kbase, max_states=5, eqtests=eqTests)
+    >>> infered_automata = lstar.learn()
+    >>> print(len(infered_automata.get_states()))
+    3
+
+    Fewer words are submitted than with the original method
+
+    >>> random.seed(0)
+    >>> kbase_ref = FakeActiveKnowledgeBase(automata)
+    >>> eqTests = RandomWalkMethod(kbase_ref, input_letters, 10000, 0.75)
+    >>> lstar = LSTAR(input_vocabulary, kbase_ref, max_states=5, eqtests=eqTests)
+    >>> infered_automata_ref = lstar.learn()
+    >>> infered_automata.build_dot_code() == infered_automata_ref.build_dot_code()
+    True
+    >>> kbase.stats.nb_submited_query < kbase_ref.stats.nb_submited_query
+    True
+    """
+
+    def __init__(self,
+                 knowledge_base,
+                 input_letters,
+                 max_steps,
+                 restart_probability,
+                 batch_size=None):
+        super(BatchRandomWalkMethod, self).__init__(
+            knowledge_base=knowledge_base,
+            input_letters=input_letters,
+            max_steps=max_steps,
+            restart_probability=restart_probability)
+        if batch_size is None:
+            # one walk per target, so a batch is resolved in a single round
+            batch_size = len(getattr(knowledge_base, "targets", [None]))
+        if batch_size < 1:
+            raise ValueError("The batch size must be strictly positive")
+        self.batch_size = batch_size
+
+    def find_counterexample(self, hypothesis):
+        if hypothesis is None:
+            raise Exception("Hypothesis cannot be None")
+
+        self._logger.info(
+            "Starting the BatchRandomWalk Algorithm to search for a counter-example")
+
+        i_step = 0
+        while i_step < self.max_steps:
+            walks = []
+            while len(walks) < self.batch_size and i_step < self.max_steps:
+                (input_word, hypothesis_output_word,
+                 nb_steps) = self.__walk(hypothesis, self.max_steps - i_step)
+                i_step += nb_steps
+                if len(input_word.letters) > 0:
+                    walks.append((input_word, hypothesis_output_word))
+
+            counterexample_query = self.__check_equivalence(walks)
+            if counterexample_query is not None:
+                return counterexample_query
+
+        return None
+
+    def __walk(self, hypothesis, max_steps):
+        """Walks randomly from the initial state of the hypothesis until a
+        restart occurs and returns the input and output words with the
+        number of steps"""
+
+        current_state = hypothesis.initial_state
+        input_letters = []
+        output_letters = []
+
+        nb_steps = 0
+        while nb_steps < max_steps:
+            nb_steps += 1
+            if len(current_state.transitions) == 0:
+                self._logger.warn(
+                    "Found a state that accepts no more transition")
+                break
+
+            picked_transition = random.choice(current_state.transitions)
+            (output_letter, current_state) = current_state.visit(
+                picked_transition.input_letter)
+            input_letters.append(picked_transition.input_letter)
+            output_letters.append(output_letter)
+
+            if random.random() < self.restart_probability:
+                break
+
+        return (Word(input_letters), Word(output_letters), nb_steps)
+
+    def __check_equivalence(self, walks):
+        """Submits the walks and returns the first query whose output
+        differs from the one of the hypothesis"""
+
+        planner = QueryPlanner()
+        for (input_word, hypothesis_output_word) in walks:
+            planner.add_word(input_word)
+
+        queries = [OutputQuery(word) for word in planner.get_words()]
+        if hasattr(self.knowledge_base, "resolve_queries"):
+            self.knowledge_base.resolve_queries(queries)
+        else:
+            for query in queries:
+                self.knowledge_base.resolve_query(query)
+
+        for (input_word, hypothesis_output_word) in walks:
+            query = OutputQuery(input_word)
+            self.knowledge_base.resolve_query(query)
+            if query.output_word != hypothesis_output_word:
+                self._logger.info(
+                    "Found a counter-example : input: '{}', expected: '{}', observed: '{}'".
+                    format(input_word, hypothesis_output_word,
+                           query.output_word))
+                return query
+        return None
@@ -49,6 +49,7 @@ from pylstar.Word import Word
 from netzob.Common.Utils.Decorators import NetzobLogger
 from netzob.Simulator.Channels.AbstractChannel import ChannelDownException
 from netzob.Model.Vocabulary.EmptySymbol import EmptySymbol
+from netzob.Inference.Grammar.QueryPlanner import QueryPlanner
 
 
 @NetzobLogger
@@ -86,30 +87,92 @@ class GenericMAT(ActiveKnowledgeBase):
                  cache_file_path=None,
                  submitted_word_cb=None):
         super(GenericMAT, self).__init__(cache_file_path=cache_file_path)
+        self.cache_file_path = cache_file_path
         self.abstraction_layer = abstraction_layer
         self.process_wrapper = process_wrapper
         self.submitted_word_cb = submitted_word_cb
 
+    def resolve_queries(self, queries):
+        """This method resolves the specified queries. The queries unknown
+        to the knowledge base are planned in a prefix tree so that only
+        the words that are not a prefix of another one are submitted to
+        the target."""
+
+        if queries is None:
+            raise Exception("Queries cannot be None")
+
+        planner = QueryPlanner()
+        for query in queries:
+            if not self._is_known(query.input_word):
+                planner.add_word(query.input_word)
+
+        words = planner.get_words()
+        if len(words) > 0:
+            self._logger.debug(
+                "Submit {} words to answer {} unknown queries".format(
+                    len(words), len(planner)))
+            self._execute_words(words)
+
+        for query in queries:
+            self.resolve_query(query)
+
+    def _is_known(self, word):
+        """Returns True if the output of the specified word can be found in
+        the knowledge base"""
+        try:
+            self.knowledge_tree.get_output_word(word)
+            return True
+        except Exception:
+            return False
+
+    def _execute_words(self, words):
+        """Executes the specified words and stores their outputs in the
+        knowledge base"""
+
+        for input_word in words:
+            self._store_output(input_word, self._execute_word(input_word))
+
+    def _store_output(self, input_word, output_word):
+        """Stores in the knowledge base the output of a submitted word"""
+
+        self.stats.nb_submited_query += 1
+        self.stats.nb_submited_letter += len(input_word.letters)
+        if output_word is None:
+            return
+        try:
+            self.knowledge_tree.add_word(
+                input_word=input_word, output_word=output_word)
+        except Exception as e:
+            self._logger.warning(
+                "Output of word '{}' cannot be stored: {}".format(
+                    input_word, e))
+
     def start_target(self):
         """This method opens the channel"""
+        self._start_target(self.abstraction_layer, self.process_wrapper)
+
+    def _start_target(self, abstraction_layer, process_wrapper):
+        """This method starts the specified process wrapper and opens the
+        channel of the specified abstraction layer"""
 
         try:
-            self.stop_target()
+            self._stop_target(abstraction_layer, process_wrapper)
         except Exception:
             pass
 
-        self.process_wrapper.start()
+        if process_wrapper is not None:
+            process_wrapper.start()
 
-        for nb_attempt in range(10):
-            if self.process_wrapper.is_ready():
-                break
-            time.sleep(1)
+            for nb_attempt in range(10):
+                if process_wrapper.is_ready():
+                    break
+                time.sleep(1)
 
         # we also try multiple times to open the channel with the target
         channel_is_open = False
         for nb_attemp in range(10):
             try:
-                self.abstraction_layer.openChannel()
+                abstraction_layer.openChannel()
                 channel_is_open = True
                 break
             except Exception as e:
@@ -123,14 +186,24 @@ class GenericMAT(ActiveKnowledgeBase):
 
     def stop_target(self):
         """This method stops the channel"""
-        self.abstraction_layer.closeChannel()
-        self.abstraction_layer.reset()
+        self._stop_target(self.abstraction_layer, self.process_wrapper)
+
+    def _stop_target(self, abstraction_layer, process_wrapper):
+        """This method closes the channel of the specified abstraction
+        layer and stops the specified process wrapper"""
+        abstraction_layer.closeChannel()
+        abstraction_layer.reset()
 
-        if self.process_wrapper is not None:
-            self.process_wrapper.stop()
+        if process_wrapper is not None:
+            process_wrapper.stop()
 
     def submit_word(self, word):
         """This method return the Word produced by the target while submited the specified word"""
+        return self._submit_word(self.abstraction_layer, word)
+
+    def _submit_word(self, abstraction_layer, word):
+        """This method return the Word produced by the target behind the
+        specified abstraction layer while submited the specified word"""
         output_letters = []
 
         for letter in word.letters:
@@ -139,11 +212,11 @@ class GenericMAT(ActiveKnowledgeBase):
                 output_symbols = []
                 for symbol in symbols:
                     try:
-                        self.abstraction_layer.writeSymbol(symbol)
+                        abstraction_layer.writeSymbol(symbol)
                     except ChannelDownException as e:
                         self._logger.debug("Channel is Down")
                     (curr_output_symbols,
-                     data) = self.abstraction_layer.readSymbols()
+                     data) = abstraction_layer.readSymbols()
                     output_symbols.extend(curr_output_symbols)
                 output_letters.append(Letter(symbols=output_symbols))
             except Exception as e:
@@ -165,7 +238,8 @@ class GenericMAT(ActiveKnowledgeBase):
             self._logger.debug(">>> {}".format(input_str))
             self._logger.debug("<<< {}".format(output_str))
 
-        self.write_cache()
+        if self.cache_file_path is not None:
+            self.write_cache()
 
         if self.submitted_word_cb is not None:
             try:
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <gbossert (a) miskin.fr>                          |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import RLock
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from pylstar.Word import Word
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Inference.Grammar.GenericMAT import GenericMAT
+
+
+@NetzobLogger
+class PooledMAT(GenericMAT):
+    """Minimal Adequat Teacher that submits words to a pool of target
+    instances. Each target is made of an abstraction layer and of an
+    optional process wrapper (e.g. the same implementation listening
+    on distinct ports). Words are submitted to free targets in
+    parallel and their outputs are merged in the shared knowledge base.
+
+    Independent queries can be resolved in parallel with
+    `resolve_queries`, which only submits the words that are not a
+    prefix of another query. Besides, if input letters are specified, a word
+    unknown to the knowledge base is not submitted alone: its
+    extensions by each input letter are submitted in parallel instead,
+    which also answers the queries L* asks next on these extensions.
+
+    >>> import socketserver
+    >>> import threading
+    >>> from netzob.all import *
+    >>> from pylstar.Letter import Letter
+    >>> from pylstar.Word import Word
+    >>> from pylstar.OutputQuery import OutputQuery
+    >>> from netzob.Inference.Grammar.PooledMAT import PooledMAT
+    >>> class UpperHandler(socketserver.StreamRequestHandler):
+    ...     def handle(self):
+    ...         for line in self.rfile:
+    ...             self.wfile.write(line.upper())
+    >>> class UpperServer(socketserver.ThreadingTCPServer):
+    ...     allow_reuse_address = True
+    ...     daemon_threads = True
+    >>> servers = [UpperServer(("127.0.0.1", port), UpperHandler) for port in (8890, 8891)]
+    >>> for server in servers:
+    ...     threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    >>> s_a = Symbol([Field("a\\n")], name="a")
+    >>> s_b = Symbol([Field("b\\n")], name="b")
+    >>> s_A = Symbol([Field("A\\n")], name="A")
+    >>> s_B = Symbol([Field("B\\n")], name="B")
+    >>> layers = []
+    >>> for port in (8890, 8891):
+    ...     channel = TCPClient(remoteIP="127.0.0.1", remotePort=port, framer=DelimiterFramer(b"\\n"))
+    ...     layers.append(AbstractionLayer(channel, [s_a, s_b, s_A, s_B]))
+    >>> mat = PooledMAT(layers, input_letters=[Letter(s_a), Letter(s_b)])
+
+    >>> query = OutputQuery(Word([Letter(s_a)]))
+    >>> mat.resolve_query(query)
+    >>> print(query.output_word)
+    [Letter(A)]
+    >>> print(mat.stats.nb_submited_query)
+    2
+    >>> query = OutputQuery(Word([Letter(s_a), Letter(s_b)]))
+    >>> mat.resolve_query(query)
+    >>> print(query.output_word)
+    [Letter(A), Letter(B)]
+    >>> print(mat.stats.nb_submited_query)
+    2
+
+    >>> words = [[s_b], [s_b, s_a], [s_b, s_b]]
+    >>> queries = [OutputQuery(Word([Letter(s) for s in word])) for word in words]
+    >>> mat.resolve_queries(queries)
+    >>> print(', '.join([str(query.output_word) for query in queries]))
+    [Letter(B)], [Letter(B), Letter(A)], [Letter(B), Letter(B)]
+    >>> print(mat.stats.nb_submited_query)
+    4
+
+    >>> for server in servers:
+    ...     server.shutdown()
+    ...     server.server_close()
+    """
+
+    def __init__(self,
+                 abstraction_layers,
+                 process_wrappers=None,
+                 cache_file_path=None,
+                 submitted_word_cb=None,
+                 input_letters=None):
+        if abstraction_layers is None or len(abstraction_layers) == 0:
+            raise Exception("At least one abstraction layer is required")
+        if process_wrappers is None:
+            process_wrappers = [None] * len(abstraction_layers)
+        if len(process_wrappers) != len(abstraction_layers):
+            raise Exception(
+                "Each abstraction layer must be associated with a process wrapper")
+
+        super(PooledMAT, self).__init__(
+            abstraction_layer=abstraction_layers[0],
+            process_wrapper=process_wrappers[0],
+            cache_file_path=cache_file_path,
+            submitted_word_cb=submitted_word_cb)
+
+        self.targets = list(zip(abstraction_layers, process_wrappers))
+        self.input_letters = input_letters
+
+        self.__free_targets = Queue()
+        for target in self.targets:
+            self.__free_targets.put(target)
+
+        # protects the knowledge base shared by the targets
+        self.__lock = RLock()
+
+    def start_target(self):
+        """This method starts all the targets"""
+        for (abstraction_layer, process_wrapper) in self.targets:
+            self._start_target(abstraction_layer, process_wrapper)
+
+    def stop_target(self):
+        """This method stops all the targets"""
+        for (abstraction_layer, process_wrapper) in self.targets:
+            self._stop_target(abstraction_layer, process_wrapper)
+
+    def write_cache(self):
+        with self.__lock:
+            super(PooledMAT, self).write_cache()
+
+    def _is_known(self, word):
+        with self.__lock:
+            return super(PooledMAT, self)._is_known(word)
+
+    def _resolve_word(self, word):
+        if word is None:
+            raise Exception("Word cannot be None")
+
+        with self.__lock:
+            self.stats.nb_query += 1
+            self.stats.nb_letter += len(word.letters)
+            try:
+                return self.knowledge_tree.get_output_word(word)
+            except Exception:
+                self._logger.debug(
+                    "Knowledge base has no previous knowledge for '{}'".format(
+                        word))
+
+        if self.input_letters is not None and len(self.input_letters) > 0:
+            words = [word + Word([letter]) for letter in self.input_letters]
+            self._execute_words(words)
+
+        with self.__lock:
+            try:
+                return self.knowledge_tree.get_output_word(word)
+            except Exception:
+                pass
+
+        # the word is not a prefix of the submitted words
+        self._execute_words([word])
+        with self.__lock:
+            try:
+                return self.knowledge_tree.get_output_word(word)
+            except Exception:
+                return None
+
+    def _execute_word(self, word):
+        """Executes the specified word on the first free target."""
+
+        if word is None:
+            raise Exception("Word cannot be None")
+
+        target = self.__free_targets.get()
+        try:
+            (abstraction_layer, process_wrapper) = target
+            self._logger.debug("Execute word '{}'".format(word))
+            self._start_target(abstraction_layer, process_wrapper)
+            try:
+                return self._submit_word(abstraction_layer, word)
+            finally:
+                self._stop_target(abstraction_layer, process_wrapper)
+        finally:
+            self.__free_targets.put(target)
+
+    def _execute_words(self, words):
+        """Executes the specified words in parallel and stores their outputs
+        in the knowledge base."""
+
+        if len(words) == 1:
+            outputs = [self._execute_word(words[0])]
+        else:
+            with ThreadPoolExecutor(
+                    max_workers=len(self.targets)) as executor:
+                outputs = list(executor.map(self._execute_word, words))
+
+        with self.__lock:
+            for (input_word, output_word) in zip(words, outputs):
+                self._store_output(input_word, output_word)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <gbossert (a) miskin.fr>                          |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from pylstar.Word import Word
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+
+
+@NetzobLogger
+class QueryPlanner(object):
+    """The query planner gathers pending membership queries in a prefix
+    tree. As the output of a word is the prefix of the output of any of
+    its extensions, only the words that are not prefixes of other words
+    have to be submitted: each shared prefix is replayed once per
+    target session and its output answers all the shorter queries.
+
+    >>> from pylstar.Letter import Letter
+    >>> from pylstar.Word import Word
+    >>> from netzob.Inference.Grammar.QueryPlanner import QueryPlanner
+    >>> l_a = Letter("a")
+    >>> l_b = Letter("b")
+    >>> planner = QueryPlanner()
+    >>> planner.add_word(Word([l_a]))
+    >>> planner.add_word(Word([l_a, l_b]))
+    >>> planner.add_word(Word([l_a, l_b]))
+    >>> planner.add_word(Word([l_b, l_a]))
+    >>> planner.add_word(Word([l_a, l_a, l_b]))
+    >>> print(len(planner))
+    4
+    >>> for word in planner.get_words():
+    ...     print(word)
+    [Letter('a'), Letter('b')]
+    [Letter('a'), Letter('a'), Letter('b')]
+    [Letter('b'), Letter('a')]
+    """
+
+    def __init__(self):
+        # each node maps a letter to its children and its number of
+        # words ending on it
+        self.__root = dict()
+        self.__nb_words = 0
+
+    def __len__(self):
+        """Returns the number of distinct words added to the planner"""
+        return self.__nb_words
+
+    def add_word(self, word):
+        """Adds the specified word to the pending queries"""
+        if word is None:
+            raise Exception("Word cannot be None")
+        if len(word.letters) == 0:
+            return
+
+        children = self.__root
+        for i_letter, letter in enumerate(word.letters):
+            if letter not in children:
+                children[letter] = [dict(), False]
+            node = children[letter]
+            if i_letter == len(word.letters) - 1 and not node[1]:
+                node[1] = True
+                self.__nb_words += 1
+            children = node[0]
+
+    def get_words(self):
+        """Returns the words to submit so that all the pending queries
+        are answered, i.e. the words that are not a prefix of another
+        one, following the order in which their letters were added."""
+
+        words = []
+        self.__collect_words(self.__root, [], words)
+        return words
+
+    def __collect_words(self, children, letters, words):
+        for letter, (grand_children, is_word) in children.items():
+            if len(grand_children) == 0:
+                words.append(Word(letters + [letter]))
+            else:
+                self.__collect_words(grand_children, letters + [letter], words)
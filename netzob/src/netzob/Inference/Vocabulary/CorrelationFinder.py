@@ -29,6 +29,8 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 import errno
+import multiprocessing
+import random
 import uuid
 import zlib
 
@@ -52,6 +54,26 @@ from netzob.Model.Vocabulary.Types.Integer import Integer
 from netzob.Inference.Vocabulary.RelationFinder import RelationFinder
 
 
+def _computeMine(values_x, values_y):
+    mine = MINE(alpha=0.6, c=15)
+    mine.compute_score(values_x, values_y)
+    return mine
+
+
+# Attribute columns of the worker processes (see _initMicWorker)
+_micColumns = None
+
+
+def _initMicWorker(columns):
+    global _micColumns
+    _micColumns = columns
+
+
+def _computeMic(pair):
+    (i, j) = pair
+    return _computeMine(_micColumns[i], _micColumns[j]).mic()
+
+
 @NetzobLogger
 class CorrelationFinder(object):
     """Correlation identification based on MINE (Maximal
@@ -65,7 +87,19 @@ class CorrelationFinder(object):
     >>> Format.splitStatic(symbol)
     >>> rels = CorrelationFinder.find(symbol)
     >>> print(len(rels))
-    64
+    65
+
+    On larger symbols, messages can be sampled, pairs of attributes can
+    be prefiltered with a cheap score and MIC computations can be spread
+    over several processes
+
+    >>> import random
+    >>> payloads = [bytes(random.randint(0, 255) for _ in range(random.randint(1, 40))) for _ in range(300)]
+    >>> messages = [RawMessage(bytes([len(p)]) + b"\\x00" + p) for p in payloads]
+    >>> symbol = Symbol([Field(Raw(nbBytes=1), name="len"), Field(b"\\x00", name="sep"), Field(Raw(nbBytes=(1, 40)), name="payload")], messages=messages)
+    >>> rels = CorrelationFinder.find(symbol, sampleSize=200, minPrefilterScore=0.5, nbProcesses=2)
+    >>> [(rel["x_fields"][0].name, rel["x_attribute"], rel["y_fields"][0].name, rel["y_attribute"]) for rel in rels if rel["mic"] == 1 and len(rel["x_fields"]) == len(rel["y_fields"]) == 1]
+    [('len', 'value', 'payload', 'size')]
     """
 
     # Field's attributes
@@ -78,8 +112,12 @@ class CorrelationFinder(object):
     REL_DATA = "DataRelation"
 
     @staticmethod
-    @typeCheck(AbstractField, float)
-    def find(symbol, minMic=0.7):
+    @typeCheck(AbstractField, float, int, float, int)
+    def find(symbol,
+             minMic=0.7,
+             sampleSize=None,
+             minPrefilterScore=None,
+             nbProcesses=1):
         """Find correlations between fields in the provided symbol,
         according to a minimum threshold. The underlying work is as
         follow: we compute the combination of each field's attribute
@@ -90,10 +128,17 @@ class CorrelationFinder(object):
         :type symbol: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
         :param minMic: the minimum correlation score 
         :type minMic: :class:`float`
+        :param sampleSize: if set, the maximum number of messages considered, randomly sampled
+        :type sampleSize: :class:`int`
+        :param minPrefilterScore: if set, the minimum mutual information (normalized, between 0 and 1) of the binned attribute values for their MIC to be computed
+        :type minPrefilterScore: :class:`float`
+        :param nbProcesses: the number of processes computing MIC scores
+        :type nbProcesses: :class:`int`
         """
 
         try:
             import numpy
+            from minepy import MINE
         except:
             # Fall back to classical relations
             import logging
@@ -102,11 +147,20 @@ class CorrelationFinder(object):
             )
             return RelationFinder.findOnSymbol(symbol)
 
-        cf = CorrelationFinder(minMic)
+        cf = CorrelationFinder(minMic, sampleSize=sampleSize,
+                               minPrefilterScore=minPrefilterScore,
+                               nbProcesses=nbProcesses)
         return cf.execute(symbol)
 
-    def __init__(self, minMic=0.7):
+    def __init__(self,
+                 minMic=0.7,
+                 sampleSize=None,
+                 minPrefilterScore=None,
+                 nbProcesses=1):
         self.minMic = minMic
+        self.sampleSize = sampleSize
+        self.minPrefilterScore = minPrefilterScore
+        self.nbProcesses = nbProcesses
 
     @typeCheck(AbstractField)
     def execute(self, symbol):
@@ -119,45 +173,146 @@ class CorrelationFinder(object):
          attributeValues) = self._generateAttributeValuesForSymbol(symbol)
         symbolResults = []
 
-        # MINE computation of each field's combination
-        for i, values_x in enumerate(attributeValues[:-1]):
-            for j, values_y in enumerate(attributeValues[i + 1:]):
-                mine = MINE(alpha=0.6, c=15)
-                mine.compute_score(
-                    numpy.array(values_x), numpy.array(values_y))
-                mic = round(mine.mic(), 2)
-                if mic > float(self.minMic):
-                    # We add the relation to the results
-                    (x_fields, x_attribute) = attributeValues_headers[i]
-                    (y_fields, y_attribute) = attributeValues_headers[j]
-                    # The relation should not apply on the same field
-                    if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[
-                            0].id == y_fields[0].id:
-                        continue
-                    pearson = numpy.corrcoef(values_x, values_y)[0, 1]
-                    if not numpy.isnan(pearson):
-                        pearson = round(pearson, 2)
-                    relation_type = self._findRelationType(x_attribute,
-                                                           y_attribute)
-                    self._debug_mine_stats(mine)
-                    self._logger.debug("Correlation found between '" + str(
-                        x_fields) + ":" + x_attribute + "' and '" + str(
-                            y_fields) + ":" + y_attribute + "'")
-                    self._logger.debug("  MIC score: " + str(mic))
-                    self._logger.debug("  Pearson score: " + str(pearson))
-                    id_relation = str(uuid.uuid4())
-                    symbolResults.append({
-                        'id': id_relation,
-                        "relation_type": relation_type,
-                        'x_fields': x_fields,
-                        'x_attribute': x_attribute,
-                        'y_fields': y_fields,
-                        'y_attribute': y_attribute,
-                        'mic': mic,
-                        'pearson': pearson
-                    })
+        # MINE computation of each field's combination which may
+        # reach the minimum score
+        pairs = self._findCandidatePairs(attributeValues)
+        mics = self._computeMics(attributeValues, pairs)
+
+        for (i, j), mic in zip(pairs, mics):
+            mic = round(mic, 2)
+            if mic > float(self.minMic):
+                # We add the relation to the results
+                (x_fields, x_attribute) = attributeValues_headers[i]
+                (y_fields, y_attribute) = attributeValues_headers[j]
+                # The relation should not apply on the same field
+                if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[
+                        0].id == y_fields[0].id:
+                    continue
+                values_x = attributeValues[i]
+                values_y = attributeValues[j]
+                pearson = numpy.corrcoef(values_x, values_y)[0, 1]
+                if not numpy.isnan(pearson):
+                    pearson = round(pearson, 2)
+                relation_type = self._findRelationType(x_attribute,
+                                                       y_attribute)
+                self._logger.debug("Correlation found between '" + str(
+                    x_fields) + ":" + x_attribute + "' and '" + str(
+                        y_fields) + ":" + y_attribute + "'")
+                self._logger.debug("  MIC score: " + str(mic))
+                self._logger.debug("  Pearson score: " + str(pearson))
+                id_relation = str(uuid.uuid4())
+                symbolResults.append({
+                    'id': id_relation,
+                    "relation_type": relation_type,
+                    'x_fields': x_fields,
+                    'x_attribute': x_attribute,
+                    'y_fields': y_fields,
+                    'y_attribute': y_attribute,
+                    'mic': mic,
+                    'pearson': pearson
+                })
         return symbolResults
 
+    def _findCandidatePairs(self, attributeValues):
+        """Returns the pairs of attributes whose MIC may exceed the minimum
+        score.
+
+        The MIC of a pair is bounded by the mutual information (in bits) of
+        its exact values, as a grid can only merge values and has at least
+        two rows and two columns. Pairs below this bound are skipped without
+        changing the results. If a minimum prefilter score is set, pairs
+        whose binned values share less normalized mutual information are
+        also skipped.
+        """
+
+        codes = []
+        entropies = []
+        binnedCodes = []
+        binnedEntropies = []
+        for values in attributeValues:
+            (_, inverse) = numpy.unique(values, return_inverse=True)
+            codes.append(inverse)
+            entropies.append(self._entropy(inverse))
+            if self.minPrefilterScore is not None:
+                # equal frequency bins computed on the ranks of the values
+                nbBins = max(2, int(len(values) ** 0.3))
+                nbDistinct = int(inverse.max()) + 1 if len(inverse) > 0 else 1
+                binned = inverse * nbBins // nbDistinct
+                binnedCodes.append(binned)
+                binnedEntropies.append(self._entropy(binned))
+
+        # rounded scores are compared with the minimum score
+        minInformation = float(self.minMic) - 0.005
+
+        pairs = []
+        for i in range(len(attributeValues) - 1):
+            if entropies[i] <= minInformation:
+                continue
+            for j in range(i + 1, len(attributeValues)):
+                if entropies[j] <= minInformation:
+                    continue
+                information = entropies[i] + entropies[j] - self._entropy(
+                    codes[i] * (int(codes[j].max()) + 1) + codes[j])
+                if information <= minInformation:
+                    continue
+                if self.minPrefilterScore is not None:
+                    minEntropy = min(binnedEntropies[i], binnedEntropies[j])
+                    if minEntropy == 0:
+                        continue
+                    binnedInformation = binnedEntropies[i] + binnedEntropies[
+                        j] - self._entropy(binnedCodes[i] * (
+                            int(binnedCodes[j].max()) + 1) + binnedCodes[j])
+                    if binnedInformation / minEntropy < float(
+                            self.minPrefilterScore):
+                        continue
+                pairs.append((i, j))
+
+        self._logger.debug("{0} pairs of attributes kept out of {1}".format(
+            len(pairs), len(attributeValues) * (len(attributeValues) - 1) // 2))
+        return pairs
+
+    def _entropy(self, codes):
+        """Returns the entropy (in bits) of the provided integer codes.
+
+        >>> import numpy
+        >>> cf = CorrelationFinder()
+        >>> print(cf._entropy(numpy.array([0, 1, 2, 3])))
+        2.0
+        >>> print(cf._entropy(numpy.array([5, 5, 5])))
+        0.0
+        """
+
+        if len(codes) == 0:
+            return 0.0
+        (_, counts) = numpy.unique(codes, return_counts=True)
+        probabilities = counts / len(codes)
+        return float((probabilities * numpy.log2(1 / probabilities)).sum())
+
+    def _computeMics(self, attributeValues, pairs):
+        """Returns the MIC score of each pair of attributes, computed over
+        a pool of processes if requested."""
+
+        if self.nbProcesses is None or self.nbProcesses <= 1 or len(pairs) < 2:
+            mics = []
+            for (i, j) in pairs:
+                mine = _computeMine(attributeValues[i], attributeValues[j])
+                self._debug_mine_stats(mine)
+                mics.append(mine.mic())
+            return mics
+
+        pool = multiprocessing.Pool(
+            self.nbProcesses,
+            initializer=_initMicWorker,
+            initargs=(attributeValues, ))
+        try:
+            return pool.map(
+                _computeMic,
+                pairs,
+                chunksize=max(1, len(pairs) // (4 * self.nbProcesses)))
+        finally:
+            pool.close()
+            pool.join()
+
     def _debug_mine_stats(self, mine):
         self._logger.debug("MIC: " + str(mine.mic()))
         self._logger.debug("MAS: " + str(mine.mas()))
@@ -176,86 +331,30 @@ class CorrelationFinder(object):
         return typeRelation
 
     def _generateAttributeValuesForSymbol(self, symbol):
-        # First we compute the possible list of payloads
-        lines_data = []
-        line_header = []
+        """Returns the header and the values of each attribute of each
+        concatenation of consecutive fields. Messages are aligned once and
+        sampled if a sample size is set."""
 
-        # Compute the table of values
-        valuesTable = []
+        relationFinder = RelationFinder()
         fields = symbol.fields
-        for field in fields:
-            valuesTable.append(field.getValues(encoded=False, styled=False))
-
-        # Compute the table of concatenation of values
-        for i in range(len(fields[:])):
-            for j in range(i + 1, len(fields) + 1):
-                # We generate the data
-                concatCellsData = self._generateConcatData(valuesTable[i:j])
-
-                # We generate lines and header for fields values
-                line_header.append((fields[i:j], self.ATTR_VALUE))
-                lines_data.append(self._generateDataValues(concatCellsData))
-
-                # We generate lines and header for fields values
-                line_header.append((fields[i:j], self.ATTR_SIZE))
-                lines_data.append(self._generateSizeValues(concatCellsData))
-
-        # # # Now we generate values for fields sizes
-        # # (multipleSize_Header, multipleSize_lines) = self._generateSizeFieldFromBeginingOfField(symbol)
-        # # line_header.extend(multipleSize_Header)
-        # # for i_line in range(0, len(lines)):
-        # #     lines[i_line] = lines[i_line] + "," + multipleSize_lines[i_line]
-
-        # # # Now we generate values for CRC32
-        # # (crc32Header, crc32Lines) = self._generateCRC32(symbol)
-        # # line_header.extend(crc32Header)
-        # # for i_line in range(0, len(lines)):
-        # #     line = lines[i_line]
-        # #     lines[i_line] = line + "," + crc32Lines[i_line]
+        fieldsValues = relationFinder._getFieldsValues(fields)
 
-        return (line_header, lines_data)
+        indexes = None
+        nbMessages = len(fieldsValues[0]) if len(fieldsValues) > 0 else 0
+        if self.sampleSize is not None and nbMessages > self.sampleSize:
+            indexes = numpy.array(
+                sorted(random.sample(range(nbMessages), self.sampleSize)))
 
-    def _generateConcatData(self, cellsDataList):
-        """Generates the concatenation of each cell of each field.
-        Example:
-          cellsData_1 = ["a", "aa", "aaa"]
-          cellsData_2 = ["b", "bb", "bbb"]
-          res = ["ab", "aabb", "aaabbb"]
-        """
+        line_header = []
+        lines_data = []
+        for (header, values) in relationFinder._generateAttributeValuesForSymbol(
+                fields, fieldsValues):
+            if indexes is not None:
+                values = values[indexes]
+            line_header.append(header)
+            lines_data.append(values.astype(numpy.float64))
 
-        if len(cellsDataList) < 1:
-            return []
-        result = [b"" for cell in cellsDataList[0]]
-        for cellsData in cellsDataList:
-            for i, data in enumerate(cellsData):
-                result[i] += data
-        return result
-
-    def _generateDataValues(self, cellsData):
-        result = []
-        for data in cellsData:
-            if len(data) > 0:
-                # Integer only may be 1, 2, 4, or 8 bytes long, so for conversion
-                # we need to add 0 padding at the front of the raw numbers
-                if len(data) == 3:
-                    data = b'\x00' + data
-                elif len(data) in (5,6,7):
-                    padding_length = 8 - len(data)
-                    data = padding_length *  b'\x00' + data
-                result.append(TypeConverter.convert(
-                    data[:8], Raw, Integer))  # We take only the first 8 octets
-            else:
-                result.append(0)
-        return result
-
-    def _generateSizeValues(self, cellsData):
-        result = []
-        for data in cellsData:
-            if len(data) > 0:
-                result.append(len(data))  # Size in octets
-            else:
-                result.append(0)
-        return result
+        return (line_header, lines_data)
 
     def _generateCRC32(self, symbol):
         header = []
@@ -66,7 +66,13 @@ class Format(object):
 
     @staticmethod
     @typeCheck(AbstractField)
-    def splitAligned(field, useSemantic=True, doInternalSlick=False):
+    def splitAligned(field,
+                     useSemantic=True,
+                     doInternalSlick=False,
+                     bandWidth=None,
+                     guideTree=False,
+                     nbThreads=None,
+                     sampleSize=None):
         """Split the specified field according to the variations of message bytes.
         Relies on a sequence alignment algorithm.
 
@@ -82,11 +88,40 @@ class Format(object):
         >>> print(len(symbol.getCells()))
         2
 
+        Long messages can be aligned with a banded Needleman-Wunsch, only the
+        cells of the matrix close to its diagonals are computed:
+
+        >>> symbol = Symbol(messages=messages)
+        >>> Format.splitAligned(symbol, doInternalSlick=True, bandWidth=32)
+        >>> print(len(symbol.getCells()))
+        2
+
+        The messages can also be aligned progressively following a guide
+        tree, independent subtrees being aligned by `nbThreads` native threads:
+
+        >>> symbol = Symbol(messages=messages)
+        >>> Format.splitAligned(symbol, doInternalSlick=True, guideTree=True, nbThreads=2)
+        >>> print(len(symbol.getCells()))
+        2
+
+        Only a sample of at most `sampleSize` distinct values can be aligned,
+        the other values being projected on the resulting fields:
+
+        >>> symbol = Symbol(messages=messages * 100)
+        >>> Format.splitAligned(symbol, doInternalSlick=True, sampleSize=1)
+        >>> print(len(symbol.getCells()))
+        200
+
         """
         if field is None:
             raise TypeError("Field cannot be None")
 
-        fs = FieldSplitAligned(doInternalSlick=doInternalSlick)
+        fs = FieldSplitAligned(
+            doInternalSlick=doInternalSlick,
+            bandWidth=bandWidth,
+            guideTree=guideTree,
+            nbThreads=nbThreads,
+            sampleSize=sampleSize)
         fs.execute(field, useSemantic)
 
     @staticmethod
@@ -358,15 +393,30 @@ class Format(object):
 
     @staticmethod
     @typeCheck(list)
-    def clusterByAlignment(messages, minEquivalence=50, internalSlick=True):
+    def clusterByAlignment(messages,
+                           minEquivalence=50,
+                           internalSlick=True,
+                           nbThreads=None,
+                           bandWidth=None,
+                           scoreBound=None):
         """This clustering process regroups messages in groups that maximes
         their alignement. It provides the required methods to compute clustering
         between multiple symbols/messages using UPGMA algorithms (see U{http://en.wikipedia.org/wiki/UPGMA}).
         When processing, the matrix of scores is computed by the C extensions (L{_libScoreComputation}
         and used to regroup messages and symbols into equivalent cluster.
+
+        The matrix of scores is computed by `nbThreads` native threads
+        (by default, one per available cpu). Long messages can be compared
+        with a banded Needleman-Wunsch (`bandWidth`) and the comparison of
+        messages whose alignment score cannot reach `scoreBound` can be
+        abandoned (see :class:`ClusterByAlignment`).
         """
         clustering = ClusterByAlignment(
-            minEquivalence=minEquivalence, internalSlick=internalSlick)
+            minEquivalence=minEquivalence,
+            internalSlick=internalSlick,
+            nbThreads=nbThreads,
+            bandWidth=bandWidth,
+            scoreBound=scoreBound)
         return clustering.cluster(messages)
 
     @staticmethod
@@ -34,11 +34,12 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
-from collections import OrderedDict
+import multiprocessing
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
 # +---------------------------------------------------------------------------+
+import numpy
 
 # +---------------------------------------------------------------------------+
 # | Local application imports                                                 |
@@ -105,15 +106,36 @@ class ClusterByAlignment(object):
     'hello ' | 'zoby'    | ", what's up in " | 'Barcelone' | ' ?'   
     -------- | --------- | ----------------- | ----------- | -------
 
+    The scores are computed by several native threads (one per cpu by default),
+    the result does not depend on the number of threads.
+
+    >>> clustering = ClusterByAlignment(nbThreads=3)
+    >>> len(clustering.cluster(messages))
+    3
+
+    Long messages can be compared with a banded Needleman-Wunsch (see
+    `bandWidth`) and the alignment of couples of messages whose alignment
+    score cannot reach `scoreBound` can be abandoned.
+
+    >>> clustering = ClusterByAlignment(bandWidth=8, scoreBound=50)
+    >>> len(clustering.cluster(messages))
+    3
+
     """
 
     def __init__(self,
                  minEquivalence=50,
                  internalSlick=True,
-                 recomputeMatrixThreshold=None):
+                 recomputeMatrixThreshold=None,
+                 nbThreads=None,
+                 bandWidth=None,
+                 scoreBound=None):
         self.minEquivalence = minEquivalence
         self.internalSlick = internalSlick
         self.recomputeMatrixThreshold = recomputeMatrixThreshold
+        self.nbThreads = nbThreads
+        self.bandWidth = bandWidth
+        self.scoreBound = scoreBound
 
     @typeCheck(list)
     def cluster(self, messages):
@@ -191,106 +213,133 @@ class ClusterByAlignment(object):
 
         (listScores) = _libScoreComputation.computeSimilarityMatrix(
             self.internalSlick, self._cb_executionStatus, self._isFinish,
-            debug, wrapper)
-        # Retrieve the scores for each association of symbols
-        scores = OrderedDict()
-        for (iuid, juid, score) in listScores:
-            if iuid not in list(scores.keys()):
-                scores[iuid] = OrderedDict()
-            if juid not in list(scores.keys()):
-                scores[juid] = OrderedDict()
-            scores[iuid][juid] = score
-            if iuid not in list(scores[juid].keys()):
-                scores[juid][iuid] = score
+            debug, wrapper, self.nbThreads, self.bandWidth or 0,
+            float(self.scoreBound or 0))
+
+        # Scores are returned for each couple of symbols (i, j) with i < j
+        # following the order of the symbols, which is the order of a
+        # condensed matrix
+        scores = numpy.array(
+            [score for (iuid, juid, score) in listScores], dtype=numpy.float64)
+        if len(scores) != len(symbols) * (len(symbols) - 1) // 2:
+            raise Exception(
+                "The similarity matrix does not cover all the symbols")
         return scores
 
     def _computePhylogenicTree(self, symbols, recomputeMatrixThreshold):
-        """Compute the phylogenic tree
-        @var max_i: uid of i_maximum
-        @var max_j: uid of j_maximum
-        @var maxScore: the highest global score"""
-        maxScore = 0
-        (float(100) - float(self.minEquivalence)) / float(100)
+        """Compute the phylogenic tree following the UPGMA algorithm.
+
+        Similarities are stored in a condensed matrix (self.scores) indexed
+        by slots. A merged cluster reuses the slot of one of its members.
+        Each slot caches its most similar slot, so that only the rows
+        that referenced a merged cluster are scanned again. Ties are
+        broken following the creation order of the clusters (their rank),
+        as they appear in the returned list of symbols."""
+
         self.lastScore = None
 
-        if len(self.scores) > 1:
-            max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-            max_j = max(self.scores[max_i],
-                        key=lambda y: self.scores[max_i][y])
-            maxScore = self.scores[max_i][max_j]
-        while len(self.scores) > 1 and maxScore >= self.minEquivalence:
+        self.__initializeSlots(symbols)
+
+        while numpy.count_nonzero(self.__active) > 1:
+            candidateScores = numpy.where(self.__active, self.__bestScores,
+                                          -numpy.inf)
+            maxScore = candidateScores.max()
+            if maxScore < self.minEquivalence:
+                break
 
-            symbols_uid = [str(s.id)
-                           for s in symbols]  # List of the UID in of symbols
-            (i_maximum, j_maximum) = (symbols_uid.index(max_i),
-                                      symbols_uid.index(max_j))
-            size_i = len(symbols[i_maximum].messages)
-            size_j = len(symbols[j_maximum].messages)
+            # the cluster of lowest rank and its most similar cluster
+            candidates = numpy.flatnonzero(candidateScores == maxScore)
+            i_maximum = candidates[numpy.argmin(self.__ranks[candidates])]
+            j_maximum = self.__bestPartners[i_maximum]
 
             self._logger.debug("Clustering {0} with {1} (score = {2})".format(
                 str(i_maximum), str(j_maximum), str(maxScore)))
 
-            newuid = self._mergeEffectiveRowCol(symbols, i_maximum, j_maximum)
-            self._updateScore(symbols, max_i, max_j, newuid, size_i, size_j,
-                              recomputeMatrixThreshold)
-            #            self.log.debug("Score après: {0}".format(str(self.scores)))
-            if len(self.scores) > 1:
-                max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-                max_j = max(self.scores[max_i],
-                            key=lambda y: self.scores[max_i][y])
-                maxScore = self.scores[max_i][max_j]
-        return symbols
+            self._mergeClusters(i_maximum, j_maximum, recomputeMatrixThreshold)
+
+        return self.__getSymbols()
+
+    def __initializeSlots(self, symbols):
+        """Creates one slot for each symbol, following their order in the
+        similarity matrix (self.scores)."""
+        nbSlots = len(symbols)
+        self.__clusters = list(symbols)
+        self.__nbSlots = nbSlots
+        self.__ranks = numpy.arange(nbSlots)
+        self.__nextRank = nbSlots
+        self.__active = numpy.ones(nbSlots, dtype=bool)
+        self.__sizes = [len(symbol.messages) for symbol in symbols]
+        self.__bestScores = numpy.full(nbSlots, -numpy.inf)
+        self.__bestPartners = numpy.zeros(nbSlots, dtype=numpy.int64)
+        for slot in range(nbSlots):
+            self.__updateBestPartner(slot)
+
+    def __getSymbols(self):
+        """Returns the symbols of the active clusters following their rank"""
+        slots = numpy.flatnonzero(self.__active)
+        slots = slots[numpy.argsort(self.__ranks[slots])]
+        return [self.__clusters[slot] for slot in slots]
+
+    def __rowIndexes(self, slot):
+        """Returns the indexes in the condensed matrix of the scores between
+        the specified slot and every slot (the index returned for the slot
+        itself is meaningless)."""
+        others = numpy.arange(self.__nbSlots)
+        low = numpy.minimum(others, slot)
+        high = numpy.maximum(others, slot)
+        indexes = low * self.__nbSlots - low * (low + 1) // 2 + high - low - 1
+        indexes[slot] = 0
+        return indexes
+
+    def __updateBestPartner(self, slot):
+        """Computes the most similar active cluster of the specified slot,
+        the cluster of lowest rank is prefered in case of tie."""
+        mask = self.__active.copy()
+        mask[slot] = False
+        if not mask.any():
+            self.__bestScores[slot] = -numpy.inf
+            return
+        row = numpy.where(mask, self.scores[self.__rowIndexes(slot)],
+                          -numpy.inf)
+        bestScore = row.max()
+        partners = numpy.flatnonzero(row == bestScore)
+        self.__bestScores[slot] = bestScore
+        self.__bestPartners[slot] = partners[numpy.argmin(
+            self.__ranks[partners])]
+
+    def _mergeClusters(self, i_maximum, j_maximum,
+                       recomputeMatrixThreshold=None):
+        """Merges the clusters of slots i_maximum and j_maximum in a new
+        cluster (stored in slot i_maximum) and updates the scores.
+        @param i_maximum: slot of the first cluster to merge
+        @param j_maximum: slot of the second cluster to merge"""
 
-    def _mergeEffectiveRowCol(self, symbols, i_maximum, j_maximum):
-        """Merge the symbols i and j in the "symbols" structure
-        @param i_maximum: id of the first symbol to merge
-        @param j_maximum: id of the second symbol to merge
-        @return the newly created symbol result of the merged process"""
-        # Extract symbols i and j
-        if i_maximum > j_maximum:
-            symbol1 = symbols.pop(i_maximum)
-            symbol2 = symbols.pop(j_maximum)
-        else:
-            symbol1 = symbols.pop(j_maximum)
-            symbol2 = symbols.pop(i_maximum)
+        self._logger.debug("Update score (recompte matrix : {0})".format(
+            recomputeMatrixThreshold))
+
+        rowIndexes_i = self.__rowIndexes(i_maximum)
+        rowIndexes_j = self.__rowIndexes(j_maximum)
+        currentScore = self.scores[rowIndexes_i[j_maximum]]
+        size_i = self.__sizes[i_maximum]
+        size_j = self.__sizes[j_maximum]
 
-        # Merge the symbols i and j
+        # Merge the symbols, messages of the most recent cluster come first
+        if self.__ranks[i_maximum] > self.__ranks[j_maximum]:
+            (symbol1, symbol2) = (self.__clusters[i_maximum],
+                                  self.__clusters[j_maximum])
+        else:
+            (symbol1, symbol2) = (self.__clusters[j_maximum],
+                                  self.__clusters[i_maximum])
         messages = []
         messages.extend(symbol1.messages)
         messages.extend(symbol2.messages)
 
-        newSymbol = Symbol(messages=messages)
-
-        # Append th new symbol to the "symbols" structure
-        symbols.append(newSymbol)
-
-        return str(newSymbol.id)
-
-    def _updateScore(self,
-                     symbols,
-                     iuid,
-                     juid,
-                     newuid,
-                     size_i,
-                     size_j,
-                     recomputeMatrixThreshold=None):
-        """Update the score of two merged clusters.
-        @param iuid: id of the first cluster merged
-        @param juid: id of the second cluster merged
-        @param newuid: new id of the merged cluster
-        @param size_i: size of the first cluster
-        @param size_j: size of the second cluster"""
-
-        self._logger.debug("Update score (recompte matrix : {0})".format(
-            recomputeMatrixThreshold))
-
-        currentScore = self.scores[iuid][juid]
-
-        # Delete row and col
-        del self.scores[iuid]
-        del self.scores[juid]
-        # Create a new col
-        self.scores[newuid] = OrderedDict()
+        self.__clusters[i_maximum] = Symbol(messages=messages)
+        self.__clusters[j_maximum] = None
+        self.__sizes[i_maximum] = size_i + size_j
+        self.__ranks[i_maximum] = self.__nextRank
+        self.__nextRank += 1
+        self.__active[j_maximum] = False
 
         # Should we recompute
         if self.lastScore is None:
@@ -302,18 +351,27 @@ class ClusterByAlignment(object):
 
             total_size = size_i + size_j
 
-            for k in list(self.scores.keys()):
-                if k != newuid:
-                    self.scores[k][newuid] = (
-                        size_i * self.scores[k][iuid] + size_j *
-                        self.scores[k][juid]) * 1.0 / total_size
-                    del self.scores[k][iuid]
-                    del self.scores[k][juid]
-                    self.scores[newuid][k] = self.scores[k][newuid]
+            others = self.__active.copy()
+            others[i_maximum] = False
+            newRow = (size_i * self.scores[rowIndexes_i] + size_j *
+                      self.scores[rowIndexes_j]) * 1.0 / total_size
+            self.scores[rowIndexes_i[others]] = newRow[others]
+
+            # Only the clusters that were the most similar to one of the
+            # merged clusters must scan their row again
+            self.__updateBestPartner(i_maximum)
+            for slot in numpy.flatnonzero(others):
+                if self.__bestPartners[slot] in (i_maximum, j_maximum):
+                    self.__updateBestPartner(slot)
+                elif newRow[slot] > self.__bestScores[slot]:
+                    self.__bestScores[slot] = newRow[slot]
+                    self.__bestPartners[slot] = i_maximum
         else:
             self._logger.debug(
                 "Merge and recompute matrix similarity threshold")
-            self.scores = self.computeSimilarityMatrix(symbols)
+            symbols = self.__getSymbols()
+            self.scores = self._computeSimilarityMatrix(symbols)
+            self.__initializeSlots(symbols)
 
         self.lastScore = currentScore
 
@@ -367,3 +425,60 @@ class ClusterByAlignment(object):
     @recomputeMatrixThreshold.setter
     def recomputeMatrixThreshold(self, recomputeMatrixThreshold):
         self.__recomputeMatrixThreshold = recomputeMatrixThreshold
+
+    @property
+    def nbThreads(self):
+        """The number of native threads used by the C extension to compute
+        the matrix of scores. The GIL is released while computing.
+
+        If set to None, the number of threads is the number of available cpu.
+
+        :type: :class:`int`
+        """
+        return self.__nbThreads
+
+    @nbThreads.setter
+    @typeCheck(int)
+    def nbThreads(self, nbThreads):
+        if nbThreads is None:
+            nbThreads = multiprocessing.cpu_count()
+
+        if nbThreads < 1:
+            raise ValueError(
+                "NbThreads cannot be <1, use None to specify you don't know.")
+
+        self.__nbThreads = nbThreads
+
+    @property
+    def bandWidth(self):
+        """The width of the band of the Needleman-Wunsch matrix computed when
+        comparing two messages, None to compute the full matrix.
+
+        :type: :class:`int`
+        """
+        return self.__bandWidth
+
+    @bandWidth.setter
+    @typeCheck(int)
+    def bandWidth(self, bandWidth):
+        if bandWidth is not None and bandWidth < 1:
+            raise ValueError("BandWidth must be >0 (or None).")
+        self.__bandWidth = bandWidth
+
+    @property
+    def scoreBound(self):
+        """Early-abandon bound: the alignment of two messages is abandoned
+        as soon as their alignment score (the percentage of the score of
+        two equal messages) cannot reach this bound. Their similarity is
+        then considered as null. None to align all the messages.
+
+        :type: :class:`int`
+        """
+        return self.__scoreBound
+
+    @scoreBound.setter
+    @typeCheck(int)
+    def scoreBound(self, scoreBound):
+        if scoreBound is not None and (scoreBound < 0 or scoreBound > 100):
+            raise ValueError("ScoreBound must be between 0 and 100.")
+        self.__scoreBound = scoreBound
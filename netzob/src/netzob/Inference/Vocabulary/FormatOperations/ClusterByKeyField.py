@@ -52,7 +52,6 @@ from netzob.Model.Vocabulary.Types.HexaString import HexaString
 from netzob.Model.Vocabulary.Types.ASCII import ASCII
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
-from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
 
 
 @NetzobLogger
@@ -110,13 +109,15 @@ class ClusterByKeyField(object):
 
         newSymbols = collections.OrderedDict()
 
-        keyFieldMessageValues = keyField.getMessageValues(
-            encoded=False, styled=False)
-        newSymbolsSplittedMessages = {}
+        # the field is aligned once, each message is a line of the cells
+        messages = field.messages
+        cells = field.getCells(encoded=False, styled=False, transposed=False)
+        keyFieldGroups = self.groupBy(field, [keyField], cells)[0]
+        i_keyField = field.fields.index(keyField)
 
         # we identify what would be the best type of the key field
         keyFieldType = ASCII
-        for message, keyFieldValue in list(keyFieldMessageValues.items()):
+        for keyFieldValue in keyFieldGroups.keys():
             # If the value cannot be parsed as ASCII, we convert it to HexaString
             if not ASCII().canParse(
                     TypeConverter.convert(keyFieldValue, Raw, BitArray)):
@@ -132,70 +133,90 @@ class ClusterByKeyField(object):
                 break
 
         # we create a symbol for each of these uniq values
-        for message, keyFieldValue in list(keyFieldMessageValues.items()):
-            keyFieldValue = TypeConverter.convert(keyFieldValue, Raw,
-                                                  keyFieldType)
-            if keyFieldValue not in list(newSymbols.keys()):
-                if type(keyFieldValue) is str:
-                    symbolName = "Symbol_{0}".format(keyFieldValue)
-                else:
-                    symbolName = "Symbol_{0}".format(
-                        keyFieldValue.decode("utf-8"))
-                newSymbols[keyFieldValue] = Symbol(
-                    name=symbolName, messages=[message])
-                splittedMessages = DataAlignment.align(
-                    [message.data], field, encoded=False)
-                newSymbolsSplittedMessages[
-                    keyFieldValue] = [splittedMessages[0]]
+        for keyFieldValue, lines in keyFieldGroups.items():
+            newSymbolKeyValue = TypeConverter.convert(keyFieldValue, Raw,
+                                                      keyFieldType)
+            if type(newSymbolKeyValue) is str:
+                symbolName = "Symbol_{0}".format(newSymbolKeyValue)
             else:
-                newSymbols[keyFieldValue].messages.append(message)
-                splittedMessages = DataAlignment.align(
-                    [message.data], field, encoded=False)
-                newSymbolsSplittedMessages[keyFieldValue].append(
-                    splittedMessages[0])
-
-        for newSymbolKeyValue, newSymbol in list(newSymbols.items()):
-            # we recreate the same fields in this new symbol as the fields that exist in the original symbol
-            newSymbol.clearFields()
-            for i, f in enumerate(field.fields):
-                if f == keyField:
-                    newFieldDomain = TypeConverter.convert(newSymbolKeyValue,
-                                                           keyFieldType, Raw)
-                else:
-                    newFieldDomain = set()
-                    for j in range(
-                            len(newSymbolsSplittedMessages[
-                                newSymbolKeyValue])):
-                        newFieldDomain.add(newSymbolsSplittedMessages[
-                            newSymbolKeyValue][j][i])
-                    newFieldDomain = list(newFieldDomain)
-                newF = Field(name=f.name, domain=newFieldDomain)
-                newF.parent = newSymbol
-                newSymbol.fields.append(newF)
+                symbolName = "Symbol_{0}".format(
+                    newSymbolKeyValue.decode("utf-8"))
+            newSymbol = Symbol(
+                name=symbolName, messages=[messages[i] for i in lines])
 
             # we remove endless fields that accepts no values
-            cells = newSymbol.getCells(
-                encoded=False, styled=False, transposed=False)
-            max_i_cell_with_value = 0
-            for line in cells:
-                for i_cell, cell in enumerate(line):
-                    if cell != '' and max_i_cell_with_value < i_cell:
+            max_i_cell_with_value = i_keyField
+            for i_line in lines:
+                for i_cell, cell in enumerate(cells[i_line]):
+                    if cell != b'' and max_i_cell_with_value < i_cell:
                         max_i_cell_with_value = i_cell
+
+            # we recreate the same fields in this new symbol as the fields that exist in the original symbol
             newSymbol.clearFields()
             for i, f in enumerate(field.fields[:max_i_cell_with_value + 1]):
-                if f == keyField:
-                    newFieldDomain = TypeConverter.convert(newSymbolKeyValue,
-                                                           keyFieldType, Raw)
+                if i == i_keyField:
+                    newFieldDomain = keyFieldValue
                 else:
-                    newFieldDomain = set()
-                    for j in range(
-                            len(newSymbolsSplittedMessages[
-                                newSymbolKeyValue])):
-                        newFieldDomain.add(newSymbolsSplittedMessages[
-                            newSymbolKeyValue][j][i])
-                    newFieldDomain = list(newFieldDomain)
+                    newFieldDomain = list(
+                        set(cells[i_line][i] for i_line in lines))
                 newF = Field(name=f.name, domain=newFieldDomain)
                 newF.parent = newSymbol
                 newSymbol.fields.append(newF)
 
+            newSymbols[newSymbolKeyValue] = newSymbol
+
         return newSymbols
+
+    @typeCheck(AbstractField, list, list)
+    def groupBy(self, field, keyFields, cells=None):
+        """Group the messages belonging to the specified field following
+        their values in each of the specified key fields.
+
+        The field is aligned only once (unless its cells are provided) and
+        the columns of all the key fields are hashed in a single pass over
+        the messages.
+
+        >>> import binascii
+        >>> from netzob.all import *
+        >>> samples = [b"00ff2f000011", b"000010000000", b"00ff2f000000"]
+        >>> messages = [RawMessage(data=binascii.unhexlify(sample)) for sample in samples]
+        >>> f1 = Field(Raw(nbBytes=1))
+        >>> f2 = Field(Raw(nbBytes=2))
+        >>> f3 = Field(Raw(nbBytes=3))
+        >>> symbol = Symbol([f1, f2, f3], messages=messages)
+        >>> groups = ClusterByKeyField().groupBy(symbol, [f2, f3])
+        >>> for keyFieldGroups in groups:
+        ...     print(list(keyFieldGroups.items()))
+        [(b'\\xff/', [0, 2]), (b'\\x00\\x10', [1])]
+        [(b'\\x00\\x00\\x11', [0]), (b'\\x00\\x00\\x00', [1, 2])]
+
+        :param field: the field which messages are grouped
+        :type field: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :param keyFields: the fields used as keys
+        :type keyFields: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :keyword cells: the cells of the field if they are already computed
+        :type cells: :class:`list`
+        :return: for each key field, an ordered dict that associates each of its values (in order of appearance) to the indexes of the messages that hold it
+        :rtype: a :class:`list` of :class:`collections.OrderedDict`
+        :raise TypeError if a key field is not a child of the field
+        """
+
+        # Safe checks
+        if field is None:
+            raise TypeError("'field' should not be None")
+        for keyField in keyFields:
+            if keyField not in field.fields:
+                raise TypeError("'keyField' is not a child of 'field'")
+
+        if cells is None:
+            cells = field.getCells(
+                encoded=False, styled=False, transposed=False)
+
+        keyFieldIndexes = [field.fields.index(keyField)
+                           for keyField in keyFields]
+        groups = [collections.OrderedDict() for keyField in keyFields]
+        for i_line, line in enumerate(cells):
+            for keyFieldGroups, i_keyField in zip(groups, keyFieldIndexes):
+                keyFieldGroups.setdefault(line[i_keyField], []).append(i_line)
+
+        return groups
@@ -35,7 +35,16 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports
 #+---------------------------------------------------------------------------+
+from array import array
 from collections import OrderedDict
+import binascii
+import itertools
+import multiprocessing
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+import numpy
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
@@ -48,9 +57,9 @@ from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.HexaString import HexaString
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Field import Field
-from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
 from netzob.Inference.Vocabulary.Search.SearchEngine import SearchEngine
 from netzob import _libNeedleman
+from netzob import _libScoreComputation
 
 
 @NetzobLogger
@@ -111,6 +120,82 @@ class FieldSplitAligned(object):
     'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?'   
     -------- | -------- | ----------------- | --------- | -------
 
+    Long messages can be aligned with a banded Needleman-Wunsch: only the cells
+    of the matrix that are at most `bandWidth` diagonals away from the
+    diagonals joining its corners are computed.
+
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(bandWidth=4)
+    >>> fs.execute(symbol, useSemantic = False)
+    >>> print(symbol)
+    Field00  | Field01  | Field02           | Field03   | Field04
+    -------- | -------- | ----------------- | --------- | -------
+    'hello ' | 'toto'   | ", what's up in " | 'France'  | ' ?'   
+    'hello ' | 'netzob' | ", what's up in " | 'UK'      | ' ?'   
+    'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?'   
+    -------- | -------- | ----------------- | --------- | -------
+
+    By default, the values are folded one by one into a running alignment,
+    so the result depends on their order. With `guideTree`, the distinct
+    values are aligned progressively following a guide tree computed (UPGMA)
+    from their similarity scores: the most similar values are aligned first
+    and the alignments of independent subtrees are computed in parallel by
+    `nbThreads` native threads (one per cpu by default).
+
+    >>> symbol = Symbol(messages=list(reversed(messages)))
+    >>> fs = FieldSplitAligned(guideTree=True, nbThreads=2)
+    >>> fs.execute(symbol, useSemantic = False)
+    >>> print(symbol)
+    Field00  | Field01  | Field02           | Field03   | Field04
+    -------- | -------- | ----------------- | --------- | -------
+    'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?'   
+    'hello ' | 'netzob' | ", what's up in " | 'UK'      | ' ?'   
+    'hello ' | 'toto'   | ", what's up in " | 'France'  | ' ?'   
+    -------- | -------- | ----------------- | --------- | -------
+
+    The result of the guide tree does not depend on the order of the
+    messages. Each merge aligns two profiles (the alignments of two
+    subtrees), so the final alignment is refined: the gap columns inserted
+    by the merges are dropped when no value needs them, and the alignment
+    is never wider than the one obtained by folding the same values one by
+    one. Below, the longest value has 6 bytes (48 bits)
+
+    >>> words = ["bafhbh", "egghca", "gb", "efgfad", "gbaafb", "daffca", "de", "eae"]
+    >>> messages = [RawMessage("CMD {0} ;".format(word).encode('utf-8')) for word in words]
+    >>> symbol = Symbol(messages=messages)
+    >>> FieldSplitAligned().execute(symbol, useSemantic = False)
+    >>> for field in symbol.fields:
+    ...     print(field.domain)
+    Data (Raw=b'CMD ' ((0, 32)))
+    Data (Raw=None ((0, 48)))
+    Data (Raw=b' ;' ((0, 16)))
+    >>> symbol = Symbol(messages=messages)
+    >>> FieldSplitAligned(guideTree=True, nbThreads=2).execute(symbol, useSemantic = False)
+    >>> for field in symbol.fields:
+    ...     print(field.domain)
+    Data (Raw=b'CMD ' ((0, 32)))
+    Data (Raw=None ((0, 48)))
+    Data (Raw=b' ;' ((0, 16)))
+
+    Highly redundant fields can be split by aligning only a sample of their
+    distinct values (at most `sampleSize` values, stratified by length).
+    The other values are projected on the computed fields, whose dynamic
+    sizes are extended to cover them.
+
+    >>> pseudos = ["zoby", "ditrich", "toto", "carlito", "netzob", "sygus"]
+    >>> cities = ["Paris", "Munich", "Barcelone", "Vienne", "UK", "Berlin"]
+    >>> messages = [RawMessage("hello {0}, what's up in {1} ?".format(pseudo, city).encode('utf-8')) for pseudo in pseudos for city in cities] * 10
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(sampleSize=4)
+    >>> fs.execute(symbol, useSemantic = False)
+    >>> for field in symbol.fields:
+    ...     print(field.domain)
+    Data (Raw=b'hello ' ((0, 48)))
+    Data (Raw=None ((0, 56)))
+    Data (Raw=b", what's up in " ((0, 120)))
+    Data (Raw=None ((0, 72)))
+    Data (Raw=b' ?' ((0, 16)))
+
     # Let's illustrate the use of semantic constrained sequence alignment with a simple example
 
     >>> samples = [b"John-0108030405--john.doe@gmail.com", b"Mathieu-0908070605-31 rue de Paris, 75000 Paris, France-mat@yahoo.fr", b"Olivia-0348234556-7 allee des peupliers, 13000 Marseille, France-olivia.tortue@hotmail.fr"]
@@ -165,12 +250,22 @@ class FieldSplitAligned(object):
     """
 
     def __init__(self, unitSize=AbstractType.UNITSIZE_8,
-                 doInternalSlick=False):
+                 doInternalSlick=False,
+                 bandWidth=None,
+                 guideTree=False,
+                 nbThreads=None,
+                 sampleSize=None):
         """Constructor.
 
         """
         self.doInternalSlick = doInternalSlick
         self.unitSize = unitSize
+        self.bandWidth = bandWidth
+        self.guideTree = guideTree
+        self.nbThreads = nbThreads
+        if sampleSize is not None and sampleSize < 1:
+            raise ValueError("SampleSize cannot be <1")
+        self.sampleSize = sampleSize
 
     @typeCheck(AbstractField, bool)
     def execute(self, field, useSemantic=True):
@@ -195,17 +290,19 @@ class FieldSplitAligned(object):
         # Semantic tags (a.k.a applicative data)
         semanticTags = None
         if useSemantic:
-            semanticTags = [
-                self.__searchApplicativeDataInMessage(message)
-                for message, values in list(messageValues.items())
-            ]
+            semanticTags = self.__searchApplicativeDataInMessages(
+                list(messageValues.keys()))
 
         if len(list(messageValues.values())) == 0:
             return
 
         # Execute the alignement
-        (alignment, semanticTags, score) = self._alignData(
-            list(messageValues.values()), semanticTags)
+        if self.sampleSize is not None:
+            (alignment, semanticTags, score) = self._alignSampledData(
+                list(messageValues.values()), semanticTags)
+        else:
+            (alignment, semanticTags, score) = self._alignData(
+                list(messageValues.values()), semanticTags)
 
         # Check the results
         if alignment is None:
@@ -391,13 +488,48 @@ class FieldSplitAligned(object):
         toSend = [(values[iValue], semanticTags[iValue])
                   for iValue in range(len(values))]
 
+        guideTree = None
+        if self.guideTree:
+            # identical values (and tags) do not change the alignment, they
+            # are sorted so that the guide tree does not depend on their order
+            distinctValues = dict(
+                ((data, tuple(sorted(tags.items()))), (data, tags))
+                for (data, tags) in toSend)
+            toSend = [distinctValues[key] for key in sorted(distinctValues)]
+
         wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
         wrapper.typeList[wrapper.function](toSend)
 
+        if self.guideTree and len(toSend) > 1:
+            guideTree = self._computeGuideTree(wrapper, len(toSend))
+
+        (alignment, semanticTags, scores) = self.__alignPackedValues(
+            wrapper, guideTree)
+
+        if guideTree is not None and self.unitSize == AbstractType.UNITSIZE_8:
+            # Refinement: the gap columns added by the merges of profiles
+            # are dropped (each dynamic segment is shrunk to the values it
+            # covers), and the sequential fold of the same values is kept
+            # if it is narrower
+            values = [data for (data, tags) in toSend]
+            alignment = self._fitDynamicSegments(alignment, values)
+            (foldAlignment, foldSemanticTags,
+             foldScores) = self.__alignPackedValues(wrapper, None)
+            foldAlignment = self._fitDynamicSegments(foldAlignment, values)
+            if len(foldAlignment) < len(alignment):
+                (alignment, semanticTags,
+                 scores) = (foldAlignment, foldSemanticTags, foldScores)
+
+        return (alignment, semanticTags, scores)
+
+    def __alignPackedValues(self, wrapper, guideTree):
+        """Aligns the values packed in the wrapper, following the guide tree
+        if not None, and deserializes the result."""
         debug = False
         (score1, score2, score3, regex, mask,
          semanticTags) = _libNeedleman.alignMessages(
-             self.doInternalSlick, self._cb_executionStatus, debug, wrapper)
+             self.doInternalSlick, self._cb_executionStatus, debug, wrapper,
+             self.bandWidth or 0, guideTree, self.__getNbThreads())
         scores = (score1, score2, score3)
 
         # Deserialize returned info
@@ -406,44 +538,369 @@ class FieldSplitAligned(object):
                                                      self.unitSize)
         return (alignment, semanticTags, scores)
 
-    @typeCheck(AbstractMessage)
-    def __searchApplicativeDataInMessage(self, message):
-        """This internal method search any applicative data that could be identified
-        in the specified message and returns results in a dict that shows the position
-        of the applicative data identified.
+    @typeCheck(list, list)
+    def _alignSampledData(self, values, semanticTags=None):
+        """Align a sample of the distinct values and project the other
+        values on the computed alignment.
+
+        A value is projected if the static segments of the alignment appear
+        in it (in the same order), the dynamic segments of the alignment are
+        widened to cover its other bytes. The values that cannot be projected
+        are aligned once on the profile of the sample alignment, and the
+        projection is done on the resulting alignment.
+
+        >>> values = [b"hello john, bye", b"hello kurt, bye", b"hello bob, bye", b"hello kurt, bye", b"hi there kurt, bye"]
+        >>> fs = FieldSplitAligned(sampleSize=2)
+        >>> [value for (value, tags, count) in fs._sampleValues([(v, {}, values.count(v)) for v in sorted(set(values))], 2)]
+        [b'hello bob, bye', b'hello kurt, bye']
+        >>> fs._alignSampledData(values)[0]
+        b'68--------65------20--------2c20627965'
+        >>> FieldSplitAligned()._alignData(values)[0]
+        b'68--------65------20--------2c20627965'
 
-        :parameter message: the message in which we search any applicative data
-        :type message: :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
-        :return: a dict that describes the position of identified applicative data
-        :rtype: :class:`dict`
+        :parameter values: values to align
+        :type values: a list of bytes.
+        :keyword semanticTags: semantic tags to consider when aligning
+        :type semanticTags: a list of dict
+        :return: the alignment, its score and the semantic tags
+        :rtype: a tupple (alignement, semanticTags, score)
         """
-        if message is None:
-            raise TypeError("Message cannot be None")
+        if values is None or len(values) == 0:
+            raise TypeError("At least one value must be provided.")
 
-        self._logger.debug("Search app data in {0}".format(message.data))
+        if semanticTags is None:
+            semanticTags = [OrderedDict() for v in values]
 
-        results = OrderedDict()
+        if len(semanticTags) != len(values):
+            raise TypeError(
+                "There should be a list of semantic tags for each value")
 
-        appValues = OrderedDict()
-        if message.session is not None:
-            for applicativeD in message.session.applicativeData:
-                appValues[applicativeD.value] = applicativeD.name
-        else:
+        # distinct values (and tags) with their number of occurrences
+        distinctValues = OrderedDict()
+        for (value, tags) in zip(values, semanticTags):
+            key = (value, tuple(sorted(tags.items())))
+            if key not in distinctValues:
+                distinctValues[key] = [value, tags, 0]
+            distinctValues[key][2] += 1
+
+        sample = self._sampleValues(
+            list(distinctValues.values()), self.sampleSize)
+        self._logger.debug("Align a sample of {0}/{1} distinct values".format(
+            len(sample), len(distinctValues)))
+        (alignment, alignedTags, score) = self._alignData(
+            [value for (value, tags, count) in sample],
+            [tags for (value, tags, count) in sample])
+
+        sampledKeys = set((value, tuple(sorted(tags.items())))
+                          for (value, tags, count) in sample)
+        remaining = [
+            entry for key, entry in distinctValues.items()
+            if key not in sampledKeys
+        ]
+        if len(remaining) == 0:
+            return (alignment, alignedTags, score)
+
+        # the values that do not fit in the alignment are aligned on its
+        # profile, the resulting alignment generalizes the previous one
+        segments = self._mergeAlign(*self._splitAlignment(alignment))
+        unprojected = [
+            entry for entry in remaining
+            if self._projectValue(segments, entry[0]) is None
+        ]
+        if len(unprojected) > 0:
             self._logger.debug(
-                "Message is not attached to a session, so no applicative data will be considered while computing the alignment."
-            )
+                "Align {0} values on the profile of the sample".format(
+                    len(unprojected)))
+            (alignment, alignedTags, score) = self._alignOnProfile(
+                alignment, alignedTags, unprojected)
+            segments = self._mergeAlign(*self._splitAlignment(alignment))
+
+        # the dynamic segments cover the projected values
+        dynamicSizes = [
+            len(segment) // 2 if isDynamic else 0
+            for (segment, isDynamic) in segments
+        ]
+        alignment = self._fitDynamicSegments(
+            alignment, [value for (value, tags, count) in remaining],
+            dynamicSizes)
+        return (alignment, alignedTags, score)
+
+    def _fitDynamicSegments(self, alignment, values, dynamicSizes=None):
+        """Returns the alignment where the size of each dynamic segment is
+        the number of bytes it covers in the values (projected with
+        :meth:`_projectValue`), or its size in `dynamicSizes` if larger.
+
+        >>> fs = FieldSplitAligned()
+        >>> fs._fitDynamicSegments(b"6865------------2c--", [b"hello, world", b"hey,"])
+        b'6865------2c------------'
+
+        :raise ValueError if a value cannot be projected on the alignment
+        """
+        segments = self._mergeAlign(*self._splitAlignment(alignment))
+        if dynamicSizes is None:
+            dynamicSizes = [0] * len(segments)
+        dynamicSizes = list(dynamicSizes)
+        for value in values:
+            sizes = self._projectValue(segments, value)
+            if sizes is None:
+                raise ValueError(
+                    "The value {0} cannot be projected on the alignment".
+                    format(repr(value)))
+            for i_segment, size in sizes:
+                dynamicSizes[i_segment] = max(dynamicSizes[i_segment], size)
+
+        return b"".join(
+            segment.encode('utf-8') if not isDynamic else
+            b"-" * (2 * dynamicSizes[i_segment])
+            for i_segment, (segment, isDynamic) in enumerate(segments))
+
+    def _alignOnProfile(self, alignment, alignedTags, entries):
+        """Aligns the values of the entries (value, tags, count) one by one
+        on the profile of the specified alignment, in a single call to the
+        C extension: the dynamic bytes of the alignment are masked.
+
+        :return: the alignment, its score and the semantic tags
+        :rtype: a tupple (alignement, semanticTags, score)
+        """
+        if self.unitSize != AbstractType.UNITSIZE_8:
+            raise ValueError("Unsupported unitsize.")
+
+        profile = bytearray()
+        mask = bytearray()
+        for i in range(0, len(alignment), 2):
+            if alignment[i:i + 2] == b"--":
+                profile.append(0)
+                mask.append(1)
+            else:
+                profile.extend(binascii.unhexlify(alignment[i:i + 2]))
+                mask.append(0)
+        profileTags = OrderedDict(
+            (position, tag) for (position, tag) in alignedTags.items()
+            if position % 2 == 0 and position < 2 * len(profile) and
+            tag not in ("", "None"))
+
+        toSend = [(bytes(profile), profileTags)]
+        toSend.extend((value, tags) for (value, tags, count) in entries)
+        wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
+        wrapper.typeList[wrapper.function](
+            toSend, [bytes(mask)] + [None] * len(entries))
+
+        debug = False
+        (score1, score2, score3, regex, mask,
+         semanticTags) = _libNeedleman.alignMessages(
+             self.doInternalSlick, self._cb_executionStatus, debug, wrapper,
+             self.bandWidth or 0, None, self.__getNbThreads())
+        scores = (score1, score2, score3)
+
+        alignment = self._deserializeAlignment(regex, mask, self.unitSize)
+        semanticTags = self._deserializeSemanticTags(semanticTags,
+                                                     self.unitSize)
+        return (alignment, semanticTags, scores)
+
+    def _sampleValues(self, entries, sampleSize):
+        """Returns a sample of the entries (value, tags, count) stratified
+        by the length of their value: one entry of each length is picked in
+        turn, the most frequent first. If a turn cannot be completed, the
+        lengths are picked evenly.
+
+        >>> fs = FieldSplitAligned()
+        >>> entries = [(b"a", {}, 1), (b"b", {}, 3), (b"cc", {}, 1), (b"ddd", {}, 1), (b"eeee", {}, 1)]
+        >>> [value for (value, tags, count) in fs._sampleValues(entries, 3)]
+        [b'b', b'cc', b'ddd']
+        >>> [value for (value, tags, count) in fs._sampleValues(entries, 2)]
+        [b'b', b'ddd']
+        >>> [value for (value, tags, count) in fs._sampleValues(entries, 5)]
+        [b'b', b'cc', b'ddd', b'eeee', b'a']
+        """
+
+        buckets = OrderedDict()
+        for entry in sorted(entries, key=lambda e: (len(e[0]), -e[2], e[0])):
+            buckets.setdefault(len(entry[0]), []).append(entry)
+
+        sample = []
+        for entries in itertools.zip_longest(*buckets.values()):
+            entries = [entry for entry in entries if entry is not None]
+            nbMissing = sampleSize - len(sample)
+            if len(entries) >= nbMissing:
+                sample.extend(entries[i * len(entries) // nbMissing]
+                              for i in range(nbMissing))
+                break
+            sample.extend(entries)
+        return sample
+
+    def _projectValue(self, segments, value):
+        """Projects the value on the segments of an alignment: each static
+        segment is searched (in order) after the previous one, the first and
+        the last segments are anchored. Returns the size of the bytes covered
+        by each dynamic segment (with its index), or None if the value cannot
+        be projected.
+
+        >>> fs = FieldSplitAligned()
+        >>> segments = [['6865', False], ['----', True], ['2c', False], ['--', True]]
+        >>> fs._projectValue(segments, b"he,llo")
+        [(1, 0), (3, 3)]
+        >>> fs._projectValue(segments, b"hello, world")
+        [(1, 3), (3, 6)]
+        >>> print(fs._projectValue(segments, b"hello world"))
+        None
+        """
+
+        sizes = []
+        position = 0
+        dynamicStart = None
+        for i_segment, (segment, isDynamic) in enumerate(segments):
+            if isDynamic:
+                dynamicStart = (i_segment, position)
+                continue
+            staticValue = binascii.unhexlify(segment)
+            if dynamicStart is None:
+                found = position if value.startswith(staticValue,
+                                                     position) else -1
+            elif i_segment == len(segments) - 1:
+                found = len(value) - len(staticValue)
+                if found < position or not value.endswith(staticValue):
+                    found = -1
+            else:
+                found = value.find(staticValue, position)
+            if found < 0:
+                return None
+            if dynamicStart is not None:
+                sizes.append((dynamicStart[0], found - dynamicStart[1]))
+                dynamicStart = None
+            position = found + len(staticValue)
+
+        if dynamicStart is not None:
+            sizes.append((dynamicStart[0], len(value) - dynamicStart[1]))
+        elif position != len(value):
+            return None
+        return sizes
+
+    def _computeGuideTree(self, wrapper, nbValues):
+        """Computes the guide tree of the progressive alignment of the
+        values packed in the wrapper following the UPGMA algorithm.
+
+        The similarity scores of the values are computed by the C extension
+        (L{_libScoreComputation}). Nodes 0 to nbValues-1 are the values and
+        the node nbValues+k is the cluster created by the k-th merge.
+
+        Each merge aligns the profiles of two clusters: the gap columns it
+        adds are kept up to the root, they are dropped by the refinement
+        done in :meth:`_alignData`.
+
+        :return: the two nodes merged by each merge
+        :rtype: :class:`array.array` of unsigned int
+        """
+        debug = False
+        listScores = _libScoreComputation.computeSimilarityMatrix(
+            self.doInternalSlick, self._cb_executionStatus, self._isFinish,
+            debug, wrapper, self.__getNbThreads(), self.bandWidth or 0, 0.0)
+        if len(listScores) != nbValues * (nbValues - 1) // 2:
+            raise Exception(
+                "The similarity matrix does not cover all the values")
+
+        # Scores are returned following the order of a condensed matrix
+        similarities = numpy.full((nbValues, nbValues), -numpy.inf)
+        (rows, columns) = numpy.triu_indices(nbValues, 1)
+        scores = numpy.array(
+            [score for (iuid, juid, score) in listScores], dtype=numpy.float64)
+        similarities[rows, columns] = scores
+        similarities[columns, rows] = scores
+
+        # A merged cluster takes the slot of its first member, each slot
+        # caches its most similar slot
+        nodes = list(range(nbValues))
+        sizes = numpy.ones(nbValues)
+        active = numpy.ones(nbValues, dtype=bool)
+        bestPartners = similarities.argmax(axis=1)
+        bestScores = similarities[numpy.arange(nbValues), bestPartners]
+
+        guideTree = array('I')
+        for merge in range(nbValues - 1):
+            i = int(numpy.where(active, bestScores, -numpy.inf).argmax())
+            j = int(bestPartners[i])
+            guideTree.extend((nodes[i], nodes[j]))
+
+            row = (sizes[i] * similarities[i] + sizes[j] * similarities[j]
+                   ) / (sizes[i] + sizes[j])
+            row[[i, j]] = -numpy.inf
+            similarities[i, :] = row
+            similarities[:, i] = row
+            similarities[j, :] = -numpy.inf
+            similarities[:, j] = -numpy.inf
+            active[j] = False
+            sizes[i] += sizes[j]
+            nodes[i] = nbValues + merge
+
+            # Only the slots that were the most similar to one of the
+            # merged clusters must scan their row again
+            stale = active & ((bestPartners == i) | (bestPartners == j))
+            improved = active & ~stale & (row > bestScores)
+            bestPartners[improved] = i
+            bestScores[improved] = row[improved]
+            stale = numpy.flatnonzero(stale)
+            bestPartners[stale] = similarities[stale].argmax(axis=1)
+            bestScores[stale] = similarities[stale, bestPartners[stale]]
+
+        return guideTree
+
+    def __getNbThreads(self):
+        """Returns the number of native threads used by the C extensions
+        (the number of available cpu if not specified)"""
+        if self.nbThreads is None:
+            return multiprocessing.cpu_count()
+        return self.nbThreads
+
+    @typeCheck(list)
+    def __searchApplicativeDataInMessages(self, messages):
+        """This internal method search any applicative data that could be identified
+        in the specified messages and returns results in a dict per message that shows the position
+        of the applicative data identified.
 
-        if len(appValues) > 0:
-            searchResults = SearchEngine.searchInMessage(
-                list(appValues.keys()), message, addTags=False)
+        The messages of a session are all searched at once for the applicative data of this session.
+
+        :parameter messages: the messages in which we search any applicative data
+        :type messages: a :class:`list` of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
+        :return: a dict per message that describes the position of identified applicative data
+        :rtype: a :class:`list` of :class:`dict`
+        """
+        if messages is None:
+            raise TypeError("Messages cannot be None")
+
+        results = [OrderedDict() for message in messages]
+        positions = dict()
+        sessions = OrderedDict()
+        for i_message, message in enumerate(messages):
+            positions[id(message)] = i_message
+            if message.session is not None:
+                sessions.setdefault(id(message.session),
+                                    (message.session, []))[1].append(message)
+            else:
+                self._logger.debug(
+                    "Message is not attached to a session, so no applicative data will be considered while computing the alignment."
+                )
+
+        for (session, sessionMessages) in sessions.values():
+            appValues = OrderedDict()
+            for applicativeD in session.applicativeData:
+                appValues[AbstractType.normalize(
+                    applicativeD.value)] = applicativeD.name
+            if len(appValues) == 0:
+                continue
+
+            searchResults = SearchEngine().searchDataInMessages(
+                list(appValues.keys()),
+                sessionMessages,
+                addTags=False,
+                inParallel=False)
             for searchResult in searchResults:
+                message = searchResult.searchTask.properties["message"]
+                appDataName = appValues[searchResult.searchTask.properties[
+                    "data"]]
                 for (startResultRange, endResultRange) in searchResult.ranges:
-                    appDataName = appValues[searchResult.searchTask.properties[
-                        "data"]]
                     for pos in range(
                             int(startResultRange / 4), int(endResultRange /
                                                            4)):
-                        results[pos] = appDataName
+                        results[positions[id(message)]][pos] = appDataName
 
         return results
 
@@ -647,6 +1104,12 @@ class FieldSplitAligned(object):
         info on the current status.
         """
 
+    def _isFinish(self):
+        """Callback function called by the C extension to know if the
+        current operation should be stopped.
+        """
+        return False
+
     def _deserializeSemanticTags(self, tags, unitSize=AbstractType.UNITSIZE_8):
         """Deserialize the information returned from the C library
         and build the semantic tags definitions from it.
@@ -716,6 +1179,25 @@ class FieldSplitAligned(object):
             raise TypeError("doInternalSlick cannot be None")
         self.__doInternalSlick = doInternalSlick
 
+    @property
+    def bandWidth(self):
+        """The width of the band of the Needleman-Wunsch matrix computed when
+        aligning messages, None to compute the full matrix.
+
+        The memory and the time required to align two messages are then
+        linear with their length (if their lengths are close).
+
+        :type: :class:`int`
+        """
+        return self.__bandWidth
+
+    @bandWidth.setter
+    @typeCheck(int)
+    def bandWidth(self, bandWidth):
+        if bandWidth is not None and bandWidth < 1:
+            raise ValueError("BandWidth must be >0 (or None).")
+        self.__bandWidth = bandWidth
+
     @property
     def unitSize(self):
         return self.__unitSize
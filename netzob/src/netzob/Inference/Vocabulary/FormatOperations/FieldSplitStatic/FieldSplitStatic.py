@@ -34,6 +34,12 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports
 #+---------------------------------------------------------------------------+
+import binascii
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+import numpy
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
@@ -232,86 +238,67 @@ class FieldSplitStatic(object):
 
         if field is None:
             raise TypeError("The field cannot be None")
-        fieldValues = [
-            TypeConverter.convert(data, Raw, HexaString)
-            for data in field.getValues(encoded=False)
-        ]
+        fieldValues = field.getValues(encoded=False)
 
         if len(fieldValues) == 0:
             raise Exception("No value found in the field.")
 
-        # Retrieve longuest field value
-        maxLengthFieldValue = len(max(fieldValues, key=len))
-
-        # definies the step following specified unitsize
+        # definies the step (in bytes) following specified unitsize
         stepUnitsize = self.__computeStepForUnitsize()
 
-        # Vertical identification of variation
-        indexedValues = []
-        for i in range(0, maxLengthFieldValue, stepUnitsize):
-            currentIndexValue = []
-            for fieldValue in fieldValues:
-                if i < len(fieldValue):
-                    currentIndexValue.append(
-                        fieldValue[i:min(len(fieldValue), i + stepUnitsize)])
-                else:
-                    currentIndexValue.append(b'')
-            indexedValues.append(currentIndexValue)
-
-        # If requested, merges the adjacent static fields
-        if self.mergeAdjacentStaticFields:
-            result = []
-            staticSequences = []
-            for values in indexedValues:
-                if len(set(values)) == 1:
-                    # static
-                    staticSequences.append(values[0])
-                else:
-                    # dynamic
-                    if len(staticSequences) > 0:
-                        result.append([b''.join(staticSequences)])
-                        staticSequences = []
-                    result.append(values)
-            if len(staticSequences) > 0:
-                result.append([b''.join(staticSequences)])
-            indexedValues = result
-
-        # If requested, merges the adjacent dynamic fields
-        if self.mergeAdjacentDynamicFields:
-            result = []
-            dynamicSequences = []
-            for values in indexedValues:
-                if len(set(values)) > 1:
-                    # dynamic
-                    dynamicSequences.append(values)
-                else:
-                    # static
-                    if len(dynamicSequences) > 0:
-                        dynValues = zip(*dynamicSequences)
-                        tmp_result = []
-                        for d in dynValues:
-                            tmp_result.append(b''.join(
-                                [x if x is not None else b'' for x in d]))
-                        result.append(tmp_result)
-                        dynamicSequences = []
-                    result.append(values)
-            if len(dynamicSequences) > 0:
-                dynValues = zip(*dynamicSequences)
-                tmp_result = []
-                for d in dynValues:
-                    tmp_result.append(
-                        b''.join([x if x is not None else b'' for x in d]))
-                result.append(tmp_result)
-
-            indexedValues = result
+        # Vertical identification of variation, values are packed in a
+        # matrix of bytes (one line per value, padded with zeros) which
+        # is split in columns of stepUnitsize bytes
+        nbValues = len(fieldValues)
+        lengths = numpy.array([len(v) for v in fieldValues], dtype=numpy.int64)
+        nbColumns = int((lengths.max() + stepUnitsize - 1) // stepUnitsize)
+
+        matrix = numpy.zeros((nbValues, nbColumns * stepUnitsize), dtype=numpy.uint8)
+        rows = numpy.repeat(numpy.arange(nbValues), lengths)
+        columns = numpy.arange(int(lengths.sum())) - numpy.repeat(
+            numpy.cumsum(lengths) - lengths, lengths)
+        matrix[rows, columns] = numpy.frombuffer(
+            b''.join(fieldValues), dtype=numpy.uint8)
+        matrix = matrix.reshape((nbValues, nbColumns, stepUnitsize))
+
+        # a column is static if all the values have the same number of
+        # bytes and the same bytes in it
+        columnLengths = numpy.clip(
+            lengths[:, numpy.newaxis] - numpy.arange(nbColumns) * stepUnitsize,
+            0, stepUnitsize)
+        staticColumns = numpy.logical_and(
+            (matrix == matrix[0]).all(axis=(0, 2)),
+            (columnLengths == columnLengths[0]).all(axis=0))
+
+        # Each entry is a range of columns (start, end, isStatic)
+        indexedColumns = [(i, i + 1, bool(isStatic))
+                          for (i, isStatic) in enumerate(staticColumns)]
+
+        # If requested, merges the adjacent static fields and the
+        # adjacent dynamic fields
+        result = []
+        for (start, end, isStatic) in indexedColumns:
+            if len(result) > 0 and result[-1][2] == isStatic and (
+                    (isStatic and self.mergeAdjacentStaticFields) or
+                    (not isStatic and self.mergeAdjacentDynamicFields)):
+                result[-1] = (result[-1][0], end, isStatic)
+            else:
+                result.append((start, end, isStatic))
+        indexedColumns = result
 
         # Create a field for each entry
         newFields = []
-        for (i, val) in enumerate(indexedValues):
+        for (i, (start, end, isStatic)) in enumerate(indexedColumns):
             fName = "Field-{0}".format(i)
+            startByte = start * stepUnitsize
+            endByte = end * stepUnitsize
+            if isStatic:
+                val = [fieldValues[0][startByte:endByte]]
+            else:
+                val = [v[startByte:endByte] for v in fieldValues]
             fDomain = DomainFactory.normalizeDomain([
                 Raw(TypeConverter.convert(v, HexaString, BitArray))
-                for v in set(val)
+                for v in set(binascii.hexlify(v) for v in val)
             ])
             newFields.append(Field(domain=fDomain, name=fName))
 
@@ -322,22 +309,20 @@ class FieldSplitStatic(object):
         field.fields = newFields
 
     def __computeStepForUnitsize(self):
-        """Computes the step following the specified unitsize.
+        """Computes the step (in bytes) following the specified unitsize.
 
         :return: the step
         :rtype: :class:`int`
         :raise: Exception if unitsize not supported
         """
-        if self.unitSize == AbstractType.UNITSIZE_4:
+        if self.unitSize == AbstractType.UNITSIZE_8:
             return 1
-        elif self.unitSize == AbstractType.UNITSIZE_8:
-            return 2
         elif self.unitSize == AbstractType.UNITSIZE_16:
-            return 4
+            return 2
         elif self.unitSize == AbstractType.UNITSIZE_32:
-            return 8
+            return 4
         elif self.unitSize == AbstractType.UNITSIZE_64:
-            return 16
+            return 8
 
         else:
             raise Exception("Unitsize not supported, can't compute the step")
@@ -44,6 +44,7 @@
 # +---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Model.Vocabulary.AbstractField import AbstractField
+from netzob.Inference.Vocabulary.FormatOperations.ClusterByKeyField import ClusterByKeyField
 
 
 @NetzobLogger
@@ -112,14 +113,14 @@ class FindKeyFields(object):
             if isCandidate:
                 results.append({"keyField": f})
 
-        # Compute clusters according to each key field found
-        from netzob.Inference.Vocabulary.Format import Format
-        for result in results:
-            tmpClusters = Format.clusterByKeyField(field, result["keyField"])
-            result["nbClusters"] = len(tmpClusters)
-            distrib = []  # Compute clusters distribution
-            for cluster in list(tmpClusters.values()):
-                distrib.append(len(cluster.messages))
-            result["distribution"] = distrib
+        # Compute clusters according to all the key fields found at once
+        groups = ClusterByKeyField().groupBy(
+            field, [result["keyField"] for result in results], cells)
+        for result, keyFieldGroups in zip(results, groups):
+            result["nbClusters"] = len(keyFieldGroups)
+            # Compute clusters distribution
+            result["distribution"] = [
+                len(lines) for lines in keyFieldGroups.values()
+            ]
 
         return results
@@ -29,17 +29,17 @@
 #| Global Imports
 #+----------------------------------------------
 import uuid
-import math
+
+#+----------------------------------------------
+#| Related third party imports
+#+----------------------------------------------
+import numpy
 
 #+----------------------------------------------
 #| Local Imports
 #+----------------------------------------------
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
-from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
-from netzob.Model.Vocabulary.Types.AbstractType import AbstractType
-from netzob.Model.Vocabulary.Types.Raw import Raw
-from netzob.Model.Vocabulary.Types.Integer import Integer
-from netzob.Model.Vocabulary.AbstractField import AbstractField
+from netzob.Model.Vocabulary.AbstractField import AbstractField, NoSymbolException
 
 
 @NetzobLogger
@@ -158,68 +158,93 @@ class RelationFinder(object):
     @typeCheck(AbstractField)
     def executeOnSymbol(self, symbol):
         """Find exact relations between fields of the provided symbol.
+
+        Messages are aligned once and each attribute of each concatenation
+        of fields is computed as a column of integers. Columns are then
+        grouped by content, so only identical columns are considered as
+        candidate relations.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage(bytes([len(p)]) + b"-" + p) for p in [b"a", b"bb", b"ccc", b"dddd"]]
+        >>> symbol = Symbol([Field(Raw(nbBytes=1), name="len"), Field(b"-", name="sep"), Field(Raw(nbBytes=(1, 4)), name="payload")], messages=messages)
+        >>> for rel in RelationFinder.findOnSymbol(symbol):
+        ...     print(rel["relation_type"], [f.name for f in rel["x_fields"]], rel["x_attribute"], [f.name for f in rel["y_fields"]], rel["y_attribute"])
+        SizeRelation ['len'] value ['payload'] size
+
         """
 
-        (attributeValues_headers,
-         attributeValues) = self._generateAttributeValuesForSymbol(symbol)
-        results = []
+        (fields, fieldsValues) = self._getAllFieldsValues(symbol)
+        fieldsValuesById = dict(
+            (field.id, values) for field, values in zip(fields, fieldsValues))
+
+        # Group identical attribute columns
+        attributeValues_headers = []
+        attributeValues_constant = []
+        columnsGroups = dict()
+        for (header, values) in self._generateAttributeValuesForSymbol(
+                fields, fieldsValues):
+            columnsGroups.setdefault(values.tobytes(), []).append(
+                len(attributeValues_headers))
+            attributeValues_headers.append(header)
+            attributeValues_constant.append(
+                len(values) > 0 and bool((values == values[0]).all()))
+
+        candidates = []
+        for indexes in columnsGroups.values():
+            for i_index, i in enumerate(indexes):
+                for j in indexes[i_index + 1:]:
+                    candidates.append((i, j))
+        candidates.sort()
 
-        for i, x_values in enumerate(attributeValues[:-1]):
-            for j, y_values in enumerate(attributeValues[:]):
-                if j <= i:
-                    continue
-                isRelation = True
-                for k in range(len(x_values)):
-                    if not (x_values[k] == y_values[k]):
-                        isRelation = False
-                        break
-                if isRelation:
-                    # Do no keep relations where a field's values does not change
-                    if len(set(x_values)) == 1 or len(set(y_values)) == 1:
+        results = []
+        for (i, j) in candidates:
+            # Do no keep relations where a field's values does not change
+            if attributeValues_constant[i] or attributeValues_constant[j]:
+                continue
+            (x_fields, x_attribute) = attributeValues_headers[i]
+            (y_fields, y_attribute) = attributeValues_headers[j]
+            # The relation should not apply on the same field
+            if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[
+                    0].id == y_fields[0].id:
+                continue
+            relation_type = self._findRelationType(
+                x_attribute, y_attribute, x_fields, y_fields,
+                fieldsValues=fieldsValuesById)
+            # We do not consider unqualified relation (for example, the size of a field is linked to the size of another field)
+            if relation_type == self.REL_UNKNOWN:
+                continue
+            # DataRelation should produce an empty intersection between related fields
+            if relation_type == self.REL_DATA and len(
+                    set(x_fields).intersection(set(y_fields))) > 0:
+                continue
+            # SizeRelation should a size field composed of multiple fields
+            if relation_type == self.REL_SIZE:
+                if x_attribute == self.ATTR_VALUE:
+                    if len(x_fields) > 1:
                         continue
-                    (x_fields, x_attribute) = attributeValues_headers[i]
-                    (y_fields, y_attribute) = attributeValues_headers[j]
-                    # The relation should not apply on the same field
-                    if len(x_fields) == 1 and len(y_fields) == 1 and x_fields[
-                            0].id == y_fields[0].id:
+                elif y_attribute == self.ATTR_VALUE:
+                    if len(y_fields) > 1:
                         continue
-                    relation_type = self._findRelationType(x_attribute,
-                                                           y_attribute,x_fields,y_fields)
-                    # We do not consider unqualified relation (for example, the size of a field is linked to the size of another field)
-                    if relation_type == self.REL_UNKNOWN:
+            # EqualityRelation should a field be equal to another field composed of multiple fields
+            if relation_type == self.REL_EQUALITY:
+                if x_attribute == self.ATTR_VALUE:
+                    if len(x_fields) > 1:
                         continue
-                    # DataRelation should produce an empty intersection between related fields
-                    if relation_type == self.REL_DATA and len(
-                            set(x_fields).intersection(set(y_fields))) > 0:
+                elif y_attribute == self.ATTR_VALUE:
+                    if len(y_fields) > 1:
                         continue
-                    # SizeRelation should a size field composed of multiple fields
-                    if relation_type == self.REL_SIZE:
-                        if x_attribute == self.ATTR_VALUE:
-                            if len(x_fields) > 1:
-                                continue
-                        elif y_attribute == self.ATTR_VALUE:
-                            if len(y_fields) > 1:
-                                continue
-                    # EqualityRelation should a field be equal to another field composed of multiple fields
-                    if relation_type == self.REL_EQUALITY:
-                        if x_attribute == self.ATTR_VALUE:
-                            if len(x_fields) > 1:
-                                continue
-                        elif y_attribute == self.ATTR_VALUE:
-                            if len(y_fields) > 1:
-                                continue
-                    self._logger.debug("Relation found between '" + str(
-                        x_fields) + ":" + x_attribute + "' and '" + str(
-                            y_fields) + ":" + y_attribute + "'")
-                    id_relation = str(uuid.uuid4())
-                    results.append({
-                        'id': id_relation,
-                        "relation_type": relation_type,
-                        'x_fields': x_fields,
-                        'x_attribute': x_attribute,
-                        'y_fields': y_fields,
-                        'y_attribute': y_attribute
-                    })
+            self._logger.debug("Relation found between '" + str(
+                x_fields) + ":" + x_attribute + "' and '" + str(
+                    y_fields) + ":" + y_attribute + "'")
+            id_relation = str(uuid.uuid4())
+            results.append({
+                'id': id_relation,
+                "relation_type": relation_type,
+                'x_fields': x_fields,
+                'x_attribute': x_attribute,
+                'y_fields': y_fields,
+                'y_attribute': y_attribute
+            })
         return results
 
     @typeCheck(AbstractField, AbstractField, str, str)
@@ -230,14 +255,16 @@ class RelationFinder(object):
                         y_attribute=None):
         """Find exact relations between fields according to their
         optional selected attributes.
+
+        Both fields are aligned together when they belong to the same
+        symbol, and their attributes are compared as columns.
         """
 
         results = []
         # Convert cells according to their interesting attribute (data, size or offset)
         if x_attribute == self.ATTR_SIZE and y_attribute == self.ATTR_SIZE:  # A relation between two size field is uncertain...
             return results
-        x_values = x_field.getValues(encoded=False, styled=False)
-        y_values = y_field.getValues(encoded=False, styled=False)
+        (x_values, y_values) = self._getFieldsValues([x_field, y_field])
 
         # Select attributes for fields comparison
         if x_attribute is None:
@@ -250,21 +277,20 @@ class RelationFinder(object):
         else:
             y_attributes = [y_attribute]
 
-        # Try to find a relation that matches each cell
-        relation_fcts = {}
-        #relation_fcts[self.REL_SIZE] = self._sizeRelation(x_attribute,y_attribute)
-        #TODO Pass correct parameters to equalRelation
-        relation_fcts[self.REL_SIZE] = self._sizeRelation
-        relation_fcts[self.REL_EQUALITY] = self._equalRelation
+        # Each attribute column is computed once, whatever the number of
+        # attributes it is compared with
+        x_columns = self._generateAttributeColumns(x_values)
+        y_columns = self._generateAttributeColumns(y_values)
+        isEqual = x_values == y_values
 
         for x_attribute in x_attributes:
             for y_attribute in y_attributes:
-                for (relation_name, relation_fct) in list(relation_fcts.items()):
-                    isRelation = True
-                    for i in range(len(x_values)):
-                        if not relation_fct(x_values[i], x_attribute, y_values[i], y_attribute):
-                            isRelation = False
-                            break
+                relations = [
+                    (self.REL_SIZE, self._sizeRelation(
+                        x_columns, x_attribute, y_columns, y_attribute)),
+                    (self.REL_EQUALITY, isEqual)
+                ]
+                for (relation_name, isRelation) in relations:
                     if isRelation:
                         self._logger.debug("Relation found between '" + x_attribute + ":" + str(x_field.name) + "' and '" + y_attribute + ":" + str(y_field.name) + "'")
                         self._logger.debug("  Relation: " + relation_name)
@@ -277,156 +303,143 @@ class RelationFinder(object):
                                         'y_attribute': y_attribute})
         return results
 
-    def _findRelationType(self, x_attribute, y_attribute,x_fields,y_fields):
+    def _findRelationType(self, x_attribute, y_attribute, x_fields, y_fields, fieldsValues=None):
         typeRelation = self.REL_UNKNOWN
         if (x_attribute == self.ATTR_VALUE and y_attribute == self.ATTR_SIZE) or (x_attribute == self.ATTR_SIZE and y_attribute == self.ATTR_VALUE):
             typeRelation = self.REL_SIZE
         elif x_attribute == y_attribute == self.ATTR_VALUE:
             typeRelation = self.REL_DATA
-        elif self._checkEqualityRelation(x_fields,y_fields):
+        elif self._checkEqualityRelation(x_fields, y_fields, fieldsValues=fieldsValues):
             typeRelation = self.REL_EQUALITY
         return typeRelation
 
-    def _checkEqualityRelation(self,x_fields,y_fields):
-        x_values = []
-        for x_field in x_fields:
-            x_values += x_field.getValues(encoded=False, styled=False)
-        y_values = []
-        for y_field in y_fields:
-                y_values += y_field.getValues(encoded=False, styled=False)
-        if set(x_values) == set(y_values):
-            return True
-        else:
-            return False
+    def _checkEqualityRelation(self, x_fields, y_fields, fieldsValues=None):
+        """Returns True if the provided fields take the same set of values.
+        Values already computed can be provided as a dict indexed by field
+        id to avoid a new alignment."""
 
-    def _equalRelation(self, x, x_attribute, y, y_attribute):
-        if x == y:
-            return True
-        else:
-            return False
+        if fieldsValues is None:
+            fieldsValues = dict()
 
-    def _sizeRelation(self, x, x_attribute, y, y_attribute):
-        if x_attribute == self.ATTR_SIZE:
-            if len(x) > 0:
-                x = len(x)
-        else:
-            if len(x) > 0:
-                x = TypeConverter.convert(x[:8], Raw, Integer)
-            else:
-                x = 0
-        if y_attribute == self.ATTR_SIZE:
-            if len(y) > 0:
-                y = len(y)
-        else:
-            if len(y) > 0:
-                # Integer only may be 1, 2, 4, or 8 bytes long, so for conversion
-                # we need to add 0 padding at the front of the raw numbers
-                if len(y) == 3:
-                    padded_y = b'\x00' + y
-                elif len(y) in (5,6,7):
-                    padding_length = 8 - len(y)
-                    padded_y = padding_length *  b'\x00' + y
-                else:
-                    padded_y = y
-                y = TypeConverter.convert(padded_y[:8], Raw, Integer)
-            else:
-                y = 0
-
-        if x == y:
-            return True
-        else:
-            return False
+        def getValues(field):
+            if field.id not in fieldsValues:
+                fieldsValues[field.id] = field.getValues(encoded=False, styled=False)
+            return fieldsValues[field.id]
 
-    def _generateAttributeValuesForSymbol(self, symbol):
-        # First we compute the possible list of payloads
-        lines_data = []
-        line_header = []
+        x_values = set()
+        for x_field in x_fields:
+            x_values.update(getValues(x_field))
+        y_values = set()
+        for y_field in y_fields:
+            y_values.update(getValues(y_field))
+        return x_values == y_values
+
+    def _sizeRelation(self, x_columns, x_attribute, y_columns, y_attribute):
+        """Returns True if the selected attribute columns are equal. The size
+        of an empty cell only equals the size of another empty cell."""
+
+        (x_heads, x_sizes) = x_columns
+        (y_heads, y_sizes) = y_columns
+        if x_attribute == self.ATTR_SIZE and y_attribute == self.ATTR_SIZE:
+            return bool((x_sizes == y_sizes).all())
+        elif x_attribute == self.ATTR_SIZE:
+            return bool(((x_sizes == y_heads) & (x_sizes > 0)).all())
+        elif y_attribute == self.ATTR_SIZE:
+            return bool(((x_heads == y_sizes) & (y_sizes > 0)).all())
+        else:
+            return bool((x_heads == y_heads).all())
 
-        # Compute the list of values for each field
-        (fields, fieldsValues) = self._getAllFieldsValues(symbol)
+    def _generateAttributeValuesForSymbol(self, fields, fieldsValues):
+        """Yields the header and the column of values of each attribute of
+        each concatenation of consecutive fields."""
 
-        # Compute the table of concatenation of values
-        for i in range(len(fieldsValues[:])):
-            for j in range(i + 1, len(fieldsValues) + 1):
-                # We generate the data
-                concatCellsData = self._generateConcatData(fieldsValues[i:j])
+        columns = [self._generateAttributeColumns(values) for values in fieldsValues]
 
-                # We generate lines and header for fields values
-                line_header.append((fields[i:j], self.ATTR_VALUE))
-                lines_data.append(self._generateDataValues(concatCellsData))
+        for i in range(len(columns)):
+            (heads, sizes) = columns[i]
+            for j in range(i + 1, len(columns) + 1):
+                if j > i + 1:
+                    (heads, sizes) = self._concatAttributeColumns(
+                        (heads, sizes), columns[j - 1])
 
                 # We generate lines and header for fields values
-                line_header.append((fields[i:j], self.ATTR_SIZE))
-                lines_data.append(self._generateSizeValues(concatCellsData))
+                yield ((fields[i:j], self.ATTR_VALUE), heads)
 
-        # # # Now we generate values for fields sizes
-        # # (multipleSize_Header, multipleSize_lines) = self._generateSizeFieldFromBeginingOfField(symbol)
-        # # line_header.extend(multipleSize_Header)
-        # # for i_line in range(0, len(lines)):
-        # #     lines[i_line] = lines[i_line] + "," + multipleSize_lines[i_line]
-
-        # # # Now we generate values for CRC32
-        # # (crc32Header, crc32Lines) = self._generateCRC32(symbol)
-        # # line_header.extend(crc32Header)
-        # # for i_line in range(0, len(lines)):
-        # #     line = lines[i_line]
-        # #     lines[i_line] = line + "," + crc32Lines[i_line]
-
-        return (line_header, lines_data)
+                # We generate lines and header for fields sizes
+                yield ((fields[i:j], self.ATTR_SIZE), sizes)
 
     def _getAllFieldsValues(self, field):
-        # This recursive function returns a tuple containing
-        # (array of all fields, array of values of each field)
-        if len(field.fields) > 0:
-            fields = []
-            values = []
-            for f in field.fields:
-                (retFields, retValues) = self._getAllFieldsValues(f)
-                fields.extend(retFields)
-                values.extend(retValues)
-            return (fields, values)
-        else:
-            return ([field], [field.getValues(encoded=False, styled=False)])
-
-    def _generateConcatData(self, cellsDataList):
-        """Generates the concatenation of each cell of each field.
-        Example:
-          cellsData_1 = ["a", "aa", "aaa"]
-          cellsData_2 = ["b", "bb", "bbb"]
-          res = ["ab", "aabb", "aaabbb"]
-        """
-
-        if len(cellsDataList) < 1:
-            return []
-        result = [b"" for cell in cellsDataList[0]]
-        for cellsData in cellsDataList:
-            for i, data in enumerate(cellsData):
-                result[i] += data
-        return result
-
-    def _generateDataValues(self, cellsData):
+        """Returns the leaf fields of the provided field and their values.
+        All the values are computed from a single alignment."""
+
+        fields = field.getLeafFields(includePseudoFields=True)
+        return (fields, self._getFieldsValues(fields))
+
+    def _getFieldsValues(self, fields):
+        """Returns the values of each provided field. If they all belong to
+        the same symbol, its messages are aligned only once."""
+
+        try:
+            symbols = set(field.getSymbol() for field in fields)
+        except NoSymbolException:
+            symbols = set()
+        if len(symbols) != 1:
+            return [field.getValues(encoded=False, styled=False) for field in fields]
+
+        symbol = symbols.pop()
+        leafFields = symbol.getLeafFields()
+        cells = symbol.getCells(encoded=False, styled=False)
         result = []
-        for data in cellsData:
-            if len(data) > 0:
-                data = data[:8]  # We take at most 8 bytes
-                unitSize = int(AbstractType.UNITSIZE_8) * len(data)
-                unitSize = int(pow(2, math.ceil(math.log(
-                    unitSize, 2))))  # Round to the nearest upper power of 2
-                result.append(
-                    Integer.encode(
-                        data,
-                        endianness=AbstractType.ENDIAN_BIG,
-                        unitSize=str(unitSize)))
-            else:
-                result.append(0)
+        for field in fields:
+            fieldLeafFields = field.getLeafFields()
+            columns = [i for i, leafField in enumerate(leafFields) if leafField in fieldLeafFields]
+            result.append([b''.join(line[i] for i in columns) for line in cells])
         return result
 
-    def _generateSizeValues(self, cellsData):
-        result = []
-        for data in cellsData:
-            if len(data) > 0:
-                result.append(len(data))  # Size in octets
-            else:
-                result.append(0)
-        return result
+    def _generateAttributeColumns(self, values):
+        """Returns the value and size columns of the provided cells. The value
+        of a cell is its first 8 bytes read as a big endian unsigned integer,
+        its size is its length in bytes.
+
+        >>> rf = RelationFinder()
+        >>> (heads, sizes) = rf._generateAttributeColumns([b"", b"\\x01\\x02", b"\\xff" * 9])
+        >>> [int(x) for x in heads]
+        [0, 258, 18446744073709551615]
+        >>> [int(x) for x in sizes]
+        [0, 2, 9]
+        """
+
+        heads = numpy.fromiter(
+            (int.from_bytes(value[:8], 'big') for value in values),
+            dtype=numpy.uint64, count=len(values))
+        sizes = numpy.fromiter(
+            (len(value) for value in values),
+            dtype=numpy.uint64, count=len(values))
+        return (heads, sizes)
+
+    def _concatAttributeColumns(self, columns, nextColumns):
+        """Returns the value and size columns of the concatenation of cells
+        from their own columns: the value takes the leading bytes of the
+        next cell that are still missing from its first 8 bytes.
+
+        >>> rf = RelationFinder()
+        >>> left = rf._generateAttributeColumns([b"", b"\\x01", b"\\x01" * 8])
+        >>> right = rf._generateAttributeColumns([b"\\x02\\x03", b"\\x02" * 9, b"\\x02"])
+        >>> (heads, sizes) = rf._concatAttributeColumns(left, right)
+        >>> [hex(int(x)) for x in heads]
+        ['0x203', '0x102020202020202', '0x101010101010101']
+        >>> [int(x) for x in sizes]
+        [2, 10, 9]
+        """
 
+        (heads, sizes) = columns
+        (nextHeads, nextSizes) = nextColumns
+        eight = numpy.uint64(8)
+        nextHeadSizes = numpy.minimum(nextSizes, eight)
+        missing = numpy.minimum(eight - numpy.minimum(sizes, eight), nextHeadSizes)
+        # shifts of 64 bits are undefined, they are only computed where
+        # nothing is appended or on empty heads and are then discarded
+        appended = (heads << (eight * missing)) | (
+            nextHeads >> (eight * (nextHeadSizes - missing)))
+        heads = numpy.where(missing > 0, appended, heads)
+        return (heads, sizes + nextSizes)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import collections
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+
+
+@NetzobLogger
+class SearchAutomaton(object):
+    """A search automaton looks for several patterns (bitarrays) in a
+    target at once. It is compiled once and can then search any number of
+    targets.
+
+    The patterns are compiled in an Aho-Corasick automaton over bytes, so
+    each target is scanned in a single pass whatever the number of
+    patterns. A pattern made of at least two bytes can still be found at
+    any bit offset: the bytes it fully covers at each of the 7 unaligned
+    offsets are also compiled in the automaton, and each candidate is
+    verified bit per bit. Only the other patterns (shorter or not made of
+    bytes) are searched on the bit level.
+
+    >>> from bitarray import bitarray
+    >>> from netzob.all import *
+    >>> from netzob.Inference.Vocabulary.Search.SearchAutomaton import SearchAutomaton
+    >>> patterns = [TypeConverter.convert(b"zob", Raw, BitArray), TypeConverter.convert(b"ob", Raw, BitArray), bitarray('0110111')]
+    >>> automaton = SearchAutomaton(patterns)
+    >>> target = TypeConverter.convert(b"netzob", Raw, BitArray)
+    >>> matches = automaton.search(target)
+    >>> for i_pattern in sorted(matches.keys()):
+    ...     print(i_pattern, matches[i_pattern])
+    0 [(24, 48)]
+    1 [(32, 48)]
+    2 [(0, 7), (32, 39)]
+
+    Patterns are also found at unaligned positions
+
+    >>> matches = automaton.search(bitarray('101') + target)
+    >>> for i_pattern in sorted(matches.keys()):
+    ...     print(i_pattern, matches[i_pattern])
+    0 [(27, 51)]
+    1 [(35, 51)]
+    2 [(3, 10), (35, 42)]
+
+    """
+
+    # number of bits in a byte
+    BYTE = 8
+
+    @typeCheck(list)
+    def __init__(self, patterns):
+        """Compile the specified patterns.
+
+        :parameter patterns: the patterns to search after
+        :type patterns: a :class:`list` of :class:`bitarray.bitarray`
+        :raise TypeError: if a pattern is not a non-empty bitarray
+        """
+        if patterns is None:
+            raise TypeError("Patterns cannot be None")
+
+        # identical patterns are searched only once
+        self.__patterns = []
+        self.__patternIndexes = []
+        uniqPatterns = dict()
+        for i_pattern, pattern in enumerate(patterns):
+            if not isinstance(pattern, bitarray) or len(pattern) == 0:
+                raise TypeError("Each pattern must be a non-empty bitarray")
+            key = pattern.to01()
+            if key not in uniqPatterns:
+                uniqPatterns[key] = len(self.__patterns)
+                self.__patterns.append(pattern)
+                self.__patternIndexes.append([])
+            self.__patternIndexes[uniqPatterns[key]].append(i_pattern)
+
+        # (bytes to find, id of the pattern, bit offset of the pattern)
+        keywords = []
+        self.__bitPatterns = []
+        for i_uniq, pattern in enumerate(self.__patterns):
+            size = len(pattern)
+            if size % self.BYTE != 0 or size < 2 * self.BYTE:
+                self.__bitPatterns.append(i_uniq)
+                continue
+            # the value of the bytes does not depend on the endianness of
+            # the pattern, only its bits do
+            bigEndianPattern = bitarray(pattern.to01())
+            keywords.append((bigEndianPattern.tobytes(), i_uniq, 0))
+            for offset in range(1, self.BYTE):
+                keywords.append((bigEndianPattern[self.BYTE - offset:
+                                                  size - offset].tobytes(),
+                                 i_uniq, offset))
+
+        self.__compile(keywords)
+
+    def __compile(self, keywords):
+        """Build the goto, failure and output functions of the
+        Aho-Corasick automaton that recognizes the specified keywords."""
+
+        self.__goto = [dict()]
+        self.__outputs = [[]]
+        for (keyword, i_uniq, offset) in keywords:
+            state = 0
+            for byte in keyword:
+                nextState = self.__goto[state].get(byte)
+                if nextState is None:
+                    nextState = len(self.__goto)
+                    self.__goto[state][byte] = nextState
+                    self.__goto.append(dict())
+                    self.__outputs.append([])
+                state = nextState
+            self.__outputs[state].append((len(keyword), i_uniq, offset))
+
+        # the states are visited in breadth-first order so the failure of
+        # a state is known before the ones of its children
+        self.__fail = [0] * len(self.__goto)
+        states = collections.deque(self.__goto[0].values())
+        while len(states) > 0:
+            state = states.popleft()
+            for byte, nextState in self.__goto[state].items():
+                states.append(nextState)
+                fail = self.__fail[state]
+                while fail != 0 and byte not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(byte, 0)
+                if fail == nextState:
+                    fail = 0
+                self.__fail[nextState] = fail
+                self.__outputs[nextState] = self.__outputs[
+                    nextState] + self.__outputs[fail]
+
+    @typeCheck(bitarray)
+    def search(self, target):
+        """Search all the occurrences of the compiled patterns in the
+        specified target.
+
+        :parameter target: the data in which the patterns are searched
+        :type target: :class:`bitarray.bitarray`
+        :return: the ranges (in bits) of the occurrences of each found
+                 pattern indexed by the position of the pattern
+        :rtype: a :class:`dict` of :class:`list` of :class:`tuple`
+        """
+        if target is None:
+            raise TypeError("Target cannot be None")
+
+        if target.endian() != "big":
+            target = bitarray(target.to01())
+        data = target.tobytes()
+        targetSize = len(target)
+
+        found = collections.defaultdict(list)
+        goto = self.__goto
+        fail = self.__fail
+        outputs = self.__outputs
+        state = 0
+        for end, byte in enumerate(data, 1):
+            while state != 0 and byte not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(byte, 0)
+            for (keywordSize, i_uniq, offset) in outputs[state]:
+                patternSize = len(self.__patterns[i_uniq])
+                if offset == 0:
+                    startIndex = (end - keywordSize) * self.BYTE
+                else:
+                    # the keyword follows the first bits of the pattern
+                    startIndex = (end - keywordSize - 1) * self.BYTE + offset
+                    if startIndex < 0:
+                        continue
+                endIndex = startIndex + patternSize
+                if endIndex > targetSize:
+                    continue
+                if offset != 0 and target[startIndex:
+                                          endIndex] != self.__patterns[i_uniq]:
+                    continue
+                found[i_uniq].append((startIndex, endIndex))
+
+        for i_uniq in self.__bitPatterns:
+            pattern = self.__patterns[i_uniq]
+            for startIndex in target.search(pattern):
+                found[i_uniq].append((startIndex, startIndex + len(pattern)))
+
+        results = dict()
+        for i_uniq, ranges in found.items():
+            for i_pattern in self.__patternIndexes[i_uniq]:
+                results[i_pattern] = list(ranges)
+        return results
@@ -34,13 +34,12 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports                                                  |
 #+---------------------------------------------------------------------------+
-import itertools
+import collections
 import multiprocessing
 
 #+---------------------------------------------------------------------------+
 #| Related third party imports                                               |
 #+---------------------------------------------------------------------------+
-from bitarray import bitarray
 
 #+---------------------------------------------------------------------------+
 #| Local application imports                                                 |
@@ -52,23 +51,25 @@ from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Inference.Vocabulary.Search.SearchTask import SearchTask
+from netzob.Inference.Vocabulary.Search.SearchAutomaton import SearchAutomaton
 from netzob.Inference.Vocabulary.Search.SearchResult import SearchResult, SearchResults
 from netzob.Model.Vocabulary.Functions.VisualizationFunctions.HighlightFunction import HighlightFunction
 
 
 def _executeSearch(arg, **kwargs):
     """Wrapper used to parallelize the search engine using
-    a pool of threads.
+    a pool of threads. Each thread searches a slice of the messages.
     """
 
     data = arg[0]
-    message = arg[1]
+    messages = arg[1]
     addTags = arg[2]
     dataLabels = arg[3]
 
     se = SearchEngine()
-    c = se.searchDataInMessage(
-        data, message, addTags=addTags, dataLabels=dataLabels)
+    c = se.searchDataInMessages(
+        data, messages, addTags=addTags, inParallel=False,
+        dataLabels=dataLabels)
     return c
 
 
@@ -148,6 +149,10 @@ class SearchEngine(object):
                              dataLabels=None):
         """Search all the data specified in the given messages. Per default, this operation is executed in parallel.
 
+        All the mutations of all the data are compiled once in a
+        :class:`netzob.Inference.Vocabulary.Search.SearchAutomaton.SearchAutomaton`
+        which then scans each message in a single pass.
+
         Example of a search operation executed in sequential
 
 
@@ -207,17 +212,16 @@ class SearchEngine(object):
                     "At least one specified message is not An AbstractMessage.")
 
         # Remove any duplicate data
-        noDuplicateDatas = list(set(datas))
+        noDuplicateDatas = list(collections.OrderedDict.fromkeys(datas))
 
         results = SearchResults()
         if not inParallel:
             # Measure start time
             # start = time.time()
 
-            for message in messages:
-                results.extend(
-                    self.searchDataInMessage(noDuplicateDatas, message,
-                                             addTags, dataLabels))
+            results.extend(
+                self.__searchInMessages(noDuplicateDatas, messages,
+                                        dataLabels))
             # Measure end time
             # end = time.time()
 
@@ -233,13 +237,19 @@ class SearchEngine(object):
             # Create a pool of 'nbThead' threads (process)
             pool = multiprocessing.Pool(nbThread)
 
+            # Each thread searches a slice of the messages so the data are
+            # only compiled once per thread
+            sliceSize = max(1, -(-len(messages) // nbThread))
+            slices = [
+                messages[i:i + sliceSize]
+                for i in range(0, len(messages), sliceSize)
+            ]
+
             # Execute search operations
             pool.map_async(
                 _executeSearch,
-                list(
-                    zip([noDuplicateDatas] * len(messages), messages, [
-                        addTags
-                    ] * len(messages), [dataLabels] * len(messages))),
+                [(noDuplicateDatas, messagesSlice, addTags, dataLabels)
+                 for messagesSlice in slices],
                 callback=self.__collectResults_cb)
 
             # Waits all alignment tasks finish
@@ -294,27 +304,7 @@ class SearchEngine(object):
         if message is None:
             raise TypeError("Message cannot be None")
 
-        searchTasks = []
-        for d in data:
-            # normalize the given data
-            normedData = AbstractType.normalize(d)
-
-            # build search tasks
-            props = dict()
-            props['message'] = message
-            props['data'] = d
-            if dataLabels is not None and d in list(dataLabels.keys()):
-                props['label'] = dataLabels[d]
-
-            searchTasks.extend(self.__buildSearchTasks(normedData, props))
-
-        # fetch the content of the message and convert it to bitarray
-        target = TypeConverter.convert(message.data, Raw, BitArray)
-
-        # Generate search cases
-        searchCases = itertools.product([target], searchTasks)
-
-        searchResults = self.__search(searchCases)
+        searchResults = self.__searchInMessages(data, [message], dataLabels)
 
         # If requested, we tag the results in the message using visualization functions
         # if addTags:
@@ -324,55 +314,67 @@ class SearchEngine(object):
         #             message.visualizationFunctions.append(HighlightFunction(startPos, endPos))
         return searchResults
 
-    def __search(self, searchCases):
-        """Execute the different search cases and build
-        search results that will be returned.
+    def __searchInMessages(self, data, messages, dataLabels=None):
+        """Search the specified data in each of the messages. The mutations
+        of all the data are compiled once in a search automaton.
 
-        :parameter searchCases: an iterable of tupple (bitarray, :class:`netzob.Inference.Vocabulary.Search.SearchTask.SearchTask`)
-        :type searchCases: a list
-        :return: the obtained results
+        :parameter data: the data to search after
+        :type data: a list of :class:`netzob.Model.Vocabulary.Types.AbstractType.AbstractType`
+        :parameter messages: the messages in which the search will take place
+        :type messages: a list of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        :keyword dataLabels: an optionnal dict to attach to each data a label
+        :type dataLabels: dict
+        :return: the obtained results, ordered by message then by data and mutation
         :rtype: a list of :class:`netzob.Inference.Vocabulary.Search.SearchResult.SearchResult`
-
         """
-        if searchCases is None:
-            raise TypeError("There should be at least one search case.")
 
-        results = SearchResults()
-        for (target, searchTask) in searchCases:
-            if target is None or not isinstance(
-                    target, bitarray) or searchTask is None or not isinstance(
-                        searchTask, SearchTask):
-                raise TypeError(
-                    "Each search case must a tupple made of a bitarray and a SearchTask instance"
-                )
+        mutations = []
+        for d in data:
+            # normalize the given data
+            normedData = AbstractType.normalize(d)
 
-            ranges = []
-            for startIndex in target.search(searchTask.data):
-                self._logger.debug("Search found {}: {}>{}".format(
-                    searchTask.data, startIndex, len(searchTask.data)))
-                ranges.append((startIndex, startIndex + len(searchTask.data)))
+            # properties of the search tasks
+            props = dict()
+            props['data'] = d
+            if dataLabels is not None and d in list(dataLabels.keys()):
+                props['label'] = dataLabels[d]
+
+            mutations.extend(self.__buildMutations(normedData, props))
 
-            if len(ranges) > 0:
+        automaton = SearchAutomaton(
+            [mutation for (mutation, mutationType, props) in mutations])
+
+        results = SearchResults()
+        for message in messages:
+            # fetch the content of the message and convert it to bitarray
+            target = TypeConverter.convert(message.data, Raw, BitArray)
+
+            matches = automaton.search(target)
+            for i_mutation in sorted(matches.keys()):
+                (mutation, mutationType, props) = mutations[i_mutation]
+                ranges = matches[i_mutation]
+                self._logger.debug("Search found {}: {}".format(mutation,
+                                                                 ranges))
+                searchTask = SearchTask(
+                    mutation, mutationType, properties=props)
+                searchTask.properties['message'] = message
                 results.append(SearchResult(target, searchTask, ranges))
 
         return results
 
     @typeCheck(AbstractType, dict)
-    def __buildSearchTasks(self, data, properties=None):
-        """Builds a search tasks for each possible encoding mutations of the
-        specified data.
+    def __buildMutations(self, data, properties=None):
+        """Builds the possible encoding mutations of the specified data.
 
-        :parameter data: the data from wich it must create search tasks
+        :parameter data: the data from wich it must build mutations
         :type data: :class:`netzob.Model.Vocabulary.Types.AbstractType.AbstractType`
-        :keyword properties: a dict of properties {name, value} to attach to each built searchTask
+        :keyword properties: a dict of properties {name, value} to attach to each search task of a mutation
         :type properties: a dict
-        :return: a list of search tasks
-        :rtype: a :class:`list` of :class:`netzob.Inference.Vocabulary.SearchEngine.SearchTask.SearchTask`
+        :return: a list of mutations (bitarray, mutation type, properties)
+        :rtype: a :class:`list` of :class:`tuple`
         """
         if data is None:
             raise TypeError("The data cannot be None")
 
-        return [
-            SearchTask(mutation, mutationType, properties=properties)
-            for mutationType, mutation in list(data.mutate().items())
-        ]
+        return [(mutation, mutationType, properties)
+                for mutationType, mutation in list(data.mutate().items())]
@@ -55,6 +55,7 @@ from netzob.Model.Vocabulary.Functions.TransformationFunction import Transformat
 from netzob.Common.Utils.TypedList import TypedList
 from netzob.Common.Utils.SortedTypedList import SortedTypedList
 from netzob.Common.Utils.MessageCells import MessageCells
+from netzob.Common.Utils.DataAlignment.AlignmentCache import AlignmentCache
 
 
 class InvalidVariableException(Exception):
@@ -85,6 +86,8 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
     """Represents all the different classes which participates in fields definitions of a message format."""
 
     def __init__(self, name=None, meta = False):
+        self.__structureVersion = 0
+        self.__alignmentCache = AlignmentCache()
         self.id = uuid.uuid4()
         self.name = name
         self.meta = meta
@@ -268,17 +271,9 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         # Fetch all the data to align
         data = [message.data for message in self.messages]
 
-        # [DEBUG] set to false for debug only. A sequential alignment is more simple to debug
-        useParallelAlignment = False
-
-        if useParallelAlignment:
-            # Execute a parallel alignment
-            from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
-            return ParallelDataAlignment.align(data, self, encoded=encoded)
-        else:
-            # Execute a sequential alignment
-            from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-            return DataAlignment.align(data, self, encoded=encoded)
+        # Only the data that were not aligned with the current structure
+        # are aligned (see AlignmentCache)
+        return self.__alignmentCache.align(self, data, encoded=encoded)
 
     @typeCheck(bool, bool)
     def getValues(self, encoded=True, styled=True):
@@ -565,7 +560,14 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         :raises: :class:`netzob.Model.Vocabulary.AbstractField.AbstractionException` if an error occurs while abstracting the data
         """
         from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-        for field in fields:
+        from netzob.Model.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
+
+        # only the fields/symbols that may abstract the data are tried
+        candidates = fields
+        if isinstance(data, bytes):
+            candidates = SymbolIndex.getIndex(fields).getCandidates(data)
+
+        for field in candidates:
             try:
                 # Try to align/parse the data with the current field
                 alignedData = DataAlignment.align([data], field, encoded=False)
@@ -665,6 +667,25 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
 
         return leafFields
 
+    def _updateStructureVersion(self):
+        """Increments the structure version of the current element and of
+        its parents. This method must be called everytime the structure
+        (fields, domain or encoding functions) of an element is modified,
+        as it invalidates the cached alignment of its messages.
+
+        >>> from netzob.all import *
+        >>> f1 = Field(ASCII("hello"))
+        >>> symbol = Symbol([f1])
+        >>> version = symbol.structureVersion
+        >>> f1.domain = ASCII("hi")
+        >>> symbol.structureVersion > version
+        True
+        """
+        field = self
+        while field is not None:
+            field.__structureVersion += 1
+            field = field.parent
+
     def hasParent(self):
         """Computes if the current element has a parent.
 
@@ -678,12 +699,14 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
 
         while (len(self.__fields) > 0):
             self.__fields.pop()
+        self._updateStructureVersion()
 
     def clearEncodingFunctions(self):
         """Remove all the encoding functions attached to the current element"""
         self.__encodingFunctions = SortedTypedList(EncodingFunction)
         for child in self.fields:
             child.clearEncodingFunctions()
+        self._updateStructureVersion()
 
     def clearVisualizationFunctions(self):
         """Remove all the visualization functions attached to the current element"""
@@ -784,6 +807,17 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
     def name(self, name):
         self.__name = name
 
+    @property
+    def structureVersion(self):
+        """Version of the structure of the current element, incremented
+        everytime its fields, its domain, its encoding functions or any of
+        its children are modified.
+
+        :type: :class:`int`
+        """
+
+        return self.__structureVersion
+
     @property
     def meta(self):
         """Meta boolean to print metadata,default is False
@@ -837,6 +871,7 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         self.encodingFunctions.add(encodingFunction)
         for child in self.fields:
             child.addEncodingFunction(encodingFunction)
+        self._updateStructureVersion()
 
     @property
     def visualizationFunctions(self):
@@ -894,6 +929,7 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
             for c in fields:
                 c.parent = self
                 self.__fields.append(c)
+        self._updateStructureVersion()
 
     @property
     def parent(self):
@@ -120,10 +120,25 @@ class DomainFactory(object):
             else:
                 for child in domain.children:
                     tmpResult.append(DomainFactory.normalizeDomain(child))
+            # Data are only equal if they share the same id, they can
+            # therefore be indexed by id instead of being compared one
+            # another. Other leafs define their own equality.
             uniqResult = []
+            uniqDataIds = set()
+            uniqOtherLeafs = []
             for elt in tmpResult:
                 if isinstance(elt, AbstractVariableNode):
                     uniqResult.append(elt)
+                elif type(elt) is Data:
+                    found = elt.id in uniqDataIds
+                    if found is False:
+                        for uElt in uniqOtherLeafs:
+                            if uElt == elt:
+                                found = True
+                                break
+                    if found is False:
+                        uniqDataIds.add(elt.id)
+                        uniqResult.append(elt)
                 else:
                     found = False
                     for uElt in uniqResult:
@@ -131,6 +146,7 @@ class DomainFactory(object):
                             found = True
                             break
                     if found is False:
+                        uniqOtherLeafs.append(elt)
                         uniqResult.append(elt)
             if len(uniqResult) == 1:
                 return uniqResult[0]
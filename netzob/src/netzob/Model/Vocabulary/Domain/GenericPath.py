@@ -64,8 +64,9 @@ class GenericPath(object):
                  dataAssignedToField=None,
                  dataAssignedToVariable=None,
                  fieldsCallbacks=None):
-        self.name = str(uuid.uuid4())
+        self.__name = None
         self.memory = memory
+        self._sharedAssignments = False
 
         if fieldsCallbacks is not None:
             self._fieldsCallbacks = fieldsCallbacks
@@ -162,6 +163,7 @@ class GenericPath(object):
         if field is None:
             raise Exception("Field cannot be None")
 
+        self.__ensureOwnAssignments()
         self._dataAssignedToField[field.id] = data
 
     def isDataAvailableForField(self, field):
@@ -191,6 +193,7 @@ class GenericPath(object):
 
         if field is None:
             raise Exception("Field cannot be None")
+        self.__ensureOwnAssignments()
         del self._dataAssignedToField[field.id]
 
     @typeCheck(AbstractVariable)
@@ -229,6 +232,7 @@ class GenericPath(object):
         if variable is None:
             raise Exception("Variable cannot be None")
 
+        self.__ensureOwnAssignments()
         self._dataAssignedToVariable[variable.id] = data
 
     @typeCheck(AbstractVariable)
@@ -236,6 +240,7 @@ class GenericPath(object):
         if variable is None:
             raise Exception("Variable cannot be None")
 
+        self.__ensureOwnAssignments()
         del self._dataAssignedToVariable[variable.id]
 
     def registerFieldCallBack(self, fields, variable, parsingCB=True):
@@ -248,10 +253,15 @@ class GenericPath(object):
             raise Exception(
                 "At least one field must be defined in the callback")
 
+        self.__ensureOwnAssignments()
         self._fieldsCallbacks.append((fields, variable, parsingCB))
 
     def _triggerFieldCallbacks(self, field):
 
+        if len(self._fieldsCallbacks) == 0:
+            return True
+
+        self.__ensureOwnAssignments()
         moreCallBackFound = True
 
         # Try n-times to trigger callbacks as there can have deadlocks
@@ -293,9 +303,48 @@ class GenericPath(object):
                 self._fieldsCallbacks.remove(callBackToExecute)
         return True
 
+    def _shareAssignmentsWith(self, path):
+        """Makes the specified path share the assignments and the
+        callbacks of the current path. Both paths copy them on their
+        first modification (copy-on-write), which makes duplicating a
+        path independent of the number of assignments it holds.
+
+        >>> from netzob.all import *
+        >>> path = GenericPath()
+        >>> f0 = Field(ASCII())
+        >>> f1 = Field(ASCII())
+        >>> path.assignDataToField(TypeConverter.convert("netzob", ASCII, BitArray), f0)
+        >>> forkedPath = GenericPath()
+        >>> path._shareAssignmentsWith(forkedPath)
+        >>> print(forkedPath.isDataAvailableForField(f0))
+        True
+        >>> forkedPath.assignDataToField(TypeConverter.convert("zoby", ASCII, BitArray), f1)
+        >>> print(forkedPath.isDataAvailableForField(f1))
+        True
+        >>> print(path.isDataAvailableForField(f1))
+        False
+        """
+        path._dataAssignedToField = self._dataAssignedToField
+        path._dataAssignedToVariable = self._dataAssignedToVariable
+        path._fieldsCallbacks = self._fieldsCallbacks
+        path._sharedAssignments = True
+        self._sharedAssignments = True
+
+    def __ensureOwnAssignments(self):
+        """Copies the assignments and the callbacks shared with
+        other paths before they get modified."""
+        if self._sharedAssignments:
+            self._dataAssignedToField = dict(self._dataAssignedToField)
+            self._dataAssignedToVariable = dict(self._dataAssignedToVariable)
+            self._fieldsCallbacks = list(self._fieldsCallbacks)
+            self._sharedAssignments = False
+
     @property
     def name(self):
-        """Returns the name of the path (mostly for debug purposes)"""
+        """Returns the name of the path (mostly for debug purposes).
+        It is only computed when first requested."""
+        if self.__name is None:
+            self.__name = str(uuid.uuid4())
         return self.__name
 
     @name.setter
@@ -46,11 +46,13 @@ from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser, I
 from netzob.Model.Vocabulary.Messages.RawMessage import RawMessage
 
 from netzob.Model.Vocabulary.Symbol import Symbol
+from netzob.Model.Vocabulary.UnknownSymbol import UnknownSymbol
 from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Domain.Parser.FieldParser import FieldParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
 
 
 @NetzobLogger
@@ -158,7 +160,36 @@ class FlowParser(object):
 
     
 
-    
+    Data received on a stream channel can be abstracted as it arrives:
+    symbols are returned as soon as they are complete, while a message
+    split over several reads waits in the receive buffer
+
+    >>> from netzob.all import *
+    >>> f0 = Field(Raw(b"\\x01"), name="type")
+    >>> f2 = Field(Raw(nbBytes=(0, 10)), name="payload")
+    >>> f1 = Field(Size(f2), name="length")
+    >>> s1 = Symbol(fields=[f0, f1, f2], name="s1")
+    >>> fp = FlowParser()
+    >>> print([s.name for (s, values) in fp.parseStream(b"\\x01\\x03abc\\x01\\x04ab", [s1])])
+    ['s1']
+    >>> print(fp.buffer)
+    b'\\x01\\x04ab'
+    >>> result = fp.parseStream(b"cd\\x01\\x01e", [s1])
+    >>> print([TypeConverter.convert(values[2], BitArray, Raw) for (s, values) in result])
+    [b'abcd', b'e']
+    >>> print(fp.buffer)
+    b''
+
+    Data that cannot be the beginning of a message is returned at once
+    in an unknown symbol, so the parser resynchronizes on the next
+    messages
+
+    >>> result = fp.parseStream(b"\\x00junk\\x01\\x02ab\\x01", [s1])
+    >>> print([(s.__class__.__name__, TypeConverter.convert(values[-1], BitArray, Raw)) for (s, values) in result])
+    [('UnknownSymbol', b'\\x00junk'), ('Symbol', b'ab')]
+    >>> print(fp.buffer)
+    b'\\x01'
+
     """
 
     def __init__(self, memory=None):
@@ -166,6 +197,9 @@ class FlowParser(object):
             self.memory = Memory()
         else:
             self.memory = memory
+        # data received with parseStream but not abstracted yet
+        self.buffer = b""
+        self.__symbolIndex = None
 
     @typeCheck(AbstractMessage, list)
     def parseFlow(self, message, symbols):
@@ -192,6 +226,131 @@ class FlowParser(object):
             "No parsing path returned while parsing {}".format(
                 repr(data_to_parse_raw)))
 
+    @typeCheck(bytes, list)
+    def parseStream(self, data, symbols):
+        """This method appends the specified data to the receive buffer and
+        abstracts the longest prefix of the buffer made of complete
+        consecutive symbols. It returns the same list of tuples as
+        parseFlow, for the symbols found in this prefix. These bytes are
+        removed from the buffer and are never parsed again, while the
+        remaining bytes (e.g. the beginning of a message split over several
+        reads) wait for the next data.
+
+        The whole buffer is abstracted whenever possible, following the same
+        order as parseFlow. Bytes which can neither be abstracted nor be the
+        beginning of an incomplete message are returned in an
+        :class:`UnknownSymbol`, up to the next byte from which a message
+        may start."""
+
+        if symbols is None or len(symbols) == 0:
+            raise Exception(
+                "Symbols cannot be None and must be a list of at least one symbol"
+            )
+
+        self.buffer += data
+        if len(self.buffer) == 0:
+            return []
+
+        if self.__symbolIndex is None or self.__symbolIndex.symbols is not symbols:
+            self.__symbolIndex = SymbolIndex(symbols)
+
+        data_to_parse_bitarray = TypeConverter.convert(self.buffer, Raw,
+                                                       BitArray)
+        bestFlows = dict()
+        result = []
+        offset = 0  # in bytes
+        while offset < len(self.buffer):
+            (flow, consumed) = self._parsePartialFlow(
+                data_to_parse_bitarray, offset * 8, symbols, self.memory,
+                bestFlows)
+            if consumed > 0:
+                result.extend(flow)
+                offset += consumed // 8
+                continue
+
+            # an incomplete message waits for the next data
+            if len(self.__symbolIndex.getPrefixCandidates(
+                    self.buffer[offset:], self.memory)) > 0:
+                break
+
+            # otherwise we resynchronize on the next byte from which a
+            # message may start
+            end = offset + 1
+            while end < len(self.buffer):
+                if len(self.__symbolIndex.getPrefixCandidates(
+                        self.buffer[end:], self.memory)) > 0:
+                    break
+                if self._parsePartialFlow(data_to_parse_bitarray, end * 8,
+                                          symbols, self.memory,
+                                          bestFlows)[1] > 0:
+                    break
+                end += 1
+            unknown = self.buffer[offset:end]
+            self._logger.debug("Cannot abstract {0}".format(repr(unknown)))
+            result.append((UnknownSymbol(message=RawMessage(unknown)),
+                           [TypeConverter.convert(unknown, Raw, BitArray)]))
+            offset = end
+
+        self.buffer = self.buffer[offset:]
+        return result
+
+    def flush(self):
+        """Empties the receive buffer and returns its content."""
+
+        data = self.buffer
+        self.buffer = b""
+        return data
+
+    def _parsePartialFlow(self, data_to_parse_bitarray, offset, symbols,
+                          memory, bestFlows):
+        """Returns the tuple (flow, consumed) where flow is the sequence of
+        symbols that abstracts the longest byte-aligned prefix of the data
+        starting at offset, and consumed the size (in bits) of this prefix.
+
+        The best flow from each offset is computed once and stored in
+        bestFlows, so the number of parsings remains linear with the
+        number of offsets."""
+
+        if offset in bestFlows:
+            return bestFlows[offset]
+
+        remaining = len(data_to_parse_bitarray) - offset
+        best = ([], 0)
+        for symbol in symbols:
+            try:
+                mp = MessageParser(memory=memory)
+                results = mp.parseBitarray(
+                    data_to_parse_bitarray[offset:],
+                    symbol.getLeafFields(),
+                    must_consume_everything=False)
+
+                for parse_result in results:
+                    parse_result_len = sum(
+                        [len(value) for value in parse_result])
+                    if parse_result_len == 0 or parse_result_len % 8 != 0:
+                        continue
+
+                    (child_flow, child_consumed) = ([], 0)
+                    if parse_result_len < remaining:
+                        (child_flow, child_consumed) = self._parsePartialFlow(
+                            data_to_parse_bitarray, offset + parse_result_len,
+                            symbols, memory.duplicate(), bestFlows)
+
+                    consumed = parse_result_len + child_consumed
+                    if consumed > best[1]:
+                        best = ([(symbol, parse_result)] + child_flow,
+                                consumed)
+                        if consumed == remaining:
+                            break
+            except InvalidParsingPathException:
+                pass
+
+            if best[1] == remaining:
+                break
+
+        bestFlows[offset] = best
+        return best
+
     def _parseFlow_internal(self, data_to_parse_bitarray, symbols, memory):
         """Parses the specified data"""
 
@@ -48,6 +48,7 @@ from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Domain.Parser.FieldParser import FieldParser
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
 
 
 class InvalidParsingPathException(Exception):
@@ -160,6 +161,15 @@ class MessageParser(object):
     >>> print(mp.parseMessage(msg3, s3))
     [bitarray('011011100110010101110100011110100110111101100010'), bitarray('0010000000111110001000000110100001100101011011000110110001101111')]
 
+    When many messages are parsed against the same fields, the fields can be
+    compiled once in a :class:`ParsingPlan` which is then provided instead of the fields.
+
+    >>> plan = ParsingPlan(s1.getLeafFields())
+    >>> for data in [b"my pseudo is: zoby!", b"my pseudo is: netzob!"]:
+    ...     print(next(mp.parseRaw(data, plan))[1])
+    bitarray('01111010011011110110001001111001')
+    bitarray('011011100110010101110100011110100110111101100010')
+
     """
 
     def __init__(self, memory=None):
@@ -186,7 +196,8 @@ class MessageParser(object):
 
     @typeCheck(object)
     def parseRaw(self, dataToParse, fields):
-        """This method parses the specified raw against the specification of the provided symbol."""
+        """This method parses the specified raw against the specification of the provided symbol.
+        The fields can be provided as a list of fields or as a :class:`ParsingPlan`."""
         if dataToParse is None or len(dataToParse) <= 0:
             raise Exception("Specified data to parse is empty (or None)")
         if fields is None:
@@ -203,7 +214,7 @@ class MessageParser(object):
                       fields,
                       must_consume_everything=True):
         """This method parses the specified bitarray according to the specification of
-        the specified fields.
+        the specified fields (a list of fields or a :class:`ParsingPlan`).
 
         It returns an iterator over all the valid parsing path that can be found.
         
@@ -212,9 +223,28 @@ class MessageParser(object):
         self._logger.debug(
             "New parsing method executed on {}".format(bitArrayToParse))
 
+        if isinstance(fields, ParsingPlan):
+            plan = fields
+        else:
+            plan = ParsingPlan(fields)
+        fields = plan.fields
+
+        if plan.canParseWith(self.memory):
+            parsingResults = plan.parse(
+                bitArrayToParse,
+                self.memory,
+                must_consume_everything=must_consume_everything)
+            for (result, memory) in parsingResults:
+                self.memory = memory
+                yield result
+
+            raise InvalidParsingPathException(
+                "No parsing path returned while parsing '{}'".format(
+                    TypeConverter.convert(bitArrayToParse, BitArray, Raw)))
+
         # building a new parsing path
         currentParsingPath = ParsingPath(bitArrayToParse.copy(),
-                                         self.memory.duplicate())
+                                         self.memory.fork())
         currentParsingPath.assignDataToField(bitArrayToParse.copy(), fields[0])
 
         # field iterator
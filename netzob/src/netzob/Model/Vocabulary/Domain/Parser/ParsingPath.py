@@ -64,7 +64,7 @@ class ParsingPath(GenericPath):
             dataAssignedToField=dataAssignedToField,
             dataAssignedToVariable=dataAssignedToVariable,
             fieldsCallbacks=fieldsCallbacks)
-        self.originalDataToParse = dataToParse.copy()
+        self.originalDataToParse = dataToParse
         if ok is None:
             self.__ok = True
         else:
@@ -90,25 +90,60 @@ class ParsingPath(GenericPath):
         return parsedMessage == bitArrayMessage
 
     def duplicate(self):
-        dField = {}
-        for key, value in list(self._dataAssignedToField.items()):
-            dField[key] = value.copy()
-
-        dVariable = {}
-        for key, value in list(self._dataAssignedToVariable.items()):
-            dVariable[key] = value.copy()
-
-        fCall = [x for x in self._fieldsCallbacks]
-
+        """Returns a new parsing path that shares the assignments and the
+        memory of the current one until any of them is modified.
+        Assigned bitarrays are shared and must not be modified in place.
+
+        >>> from netzob.all import *
+        >>> f0 = Field(ASCII())
+        >>> f1 = Field(ASCII())
+        >>> data = TypeConverter.convert("netzob", ASCII, BitArray)
+        >>> path = ParsingPath(data, Memory())
+        >>> path.assignDataToField(data, f0)
+        >>> newPath = path.duplicate()
+        >>> newPath.assignDataToField(data[:8], f1)
+        >>> print(newPath.getDataAssignedToField(f0) is path.getDataAssignedToField(f0))
+        True
+        >>> print(path.isDataAvailableForField(f1))
+        False
+        """
         result = ParsingPath(
-            self.originalDataToParse,
-            memory=self.memory.duplicate(),
-            dataAssignedToField=dField,
-            dataAssignedToVariable=dVariable,
-            fieldsCallbacks=fCall,
-            ok=self.ok())
-
+            self.originalDataToParse, memory=self.memory.fork(), ok=self.ok())
+        self._shareAssignmentsWith(result)
         return result
 
+    @typeCheck(AbstractVariable)
+    def getConstrainedSizes(self, variable):
+        """Returns the sizes (in bits) imposed on the specified variable by
+        the relations (such as Size fields) already parsed in this path and
+        waiting for it, or None if no relation constrains it.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+        >>> f0 = Field(Raw(nbBytes=1))
+        >>> f1 = Field(Raw(nbBytes=(0, 100)))
+        >>> f0.domain = Size(f1)
+        >>> data = TypeConverter.convert(b"\\x03abc", Raw, BitArray)
+        >>> path = ParsingPath(data, Memory())
+        >>> print(path.getConstrainedSizes(f1.domain))
+        None
+        >>> path.assignDataToVariable(data, f0.domain)
+        >>> results = f0.domain.domainCMP(path)
+        >>> print(path.getConstrainedSizes(f1.domain))
+        [24, 25, 26, 27, 28, 29, 30, 31]
+        """
+        sizes = None
+        for (fields, relation, parsingCB) in self._fieldsCallbacks:
+            if not parsingCB:
+                continue
+            relationSizes = relation.getDependencySizes(self, variable)
+            if relationSizes is None:
+                continue
+            if sizes is None:
+                sizes = relationSizes
+            else:
+                sizes = [size for size in sizes if size in relationSizes]
+        return sizes
+
     def ok(self):
         return self.__ok
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractRelationVariableLeaf import AbstractRelationVariableLeaf
+from netzob.Model.Vocabulary.Domain.Variables.Nodes.AbstractVariableNode import AbstractVariableNode
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+from netzob.Model.Vocabulary.Domain.Parser.FieldParser import FieldParser
+
+
+@NetzobLogger
+class ParsingPlan(object):
+    """A parsing plan is the compiled form of a list of leaf fields. It is
+    built once and can then be used to parse as many messages as needed
+    with a :class:`MessageParser`.
+
+    Each leaf field is lowered into a parsing step:
+
+    * a *literal* step for constant data (a simple prefix check),
+    * a *data* step for variable data, which enumerates the candidate
+      sizes computed by the data type in a single pass over the data (a
+      fixed-size field has a single candidate),
+    * a *persistent* step for persistent data, which depends on the memory,
+    * a *generic* step for any other domain (Alt, Agg, Repeat), which
+      delegates to a :class:`FieldParser`.
+
+    The minimum and maximum number of bits each suffix of the plan can
+    consume are also precomputed, so candidates that cannot lead to a
+    complete parsing are pruned before being explored.
+
+    Fields involved in relations (Size, Value, InternetChecksum, ...)
+    require the callbacks of the parsing paths: such field lists are not
+    compiled and the :class:`MessageParser` falls back to its
+    generic algorithm.
+
+    >>> from netzob.all import *
+    >>> f0 = Field(name="F0", domain=ASCII("hello "))
+    >>> f1 = Field(name="F1", domain=ASCII(nbChars=(1, 10)))
+    >>> f2 = Field(name="F2", domain=Raw(nbBytes=2))
+    >>> s = Symbol(fields=[f0, f1, f2])
+    >>> plan = ParsingPlan(s.getLeafFields())
+    >>> print(plan.compiled)
+    True
+    >>> print(plan.steps)
+    ['literal', 'data', 'data']
+    >>> mp = MessageParser()
+    >>> for data in [b"hello netzob\\x00\\x01", b"hello zoby\\xff\\xff"]:
+    ...     print([TypeConverter.convert(v, BitArray, Raw) for v in next(mp.parseRaw(data, plan))])
+    [b'hello ', b'netzob', b'\\x00\\x01']
+    [b'hello ', b'zoby', b'\\xff\\xff']
+
+    The memory is updated as with the generic parsing algorithm
+
+    >>> print(mp.memory)
+    Data (ASCII=None ((8, 80))): b'zoby'
+    Data (Raw=None ((16, 16))): b'\\xff\\xff'
+
+    Nodes are parsed through a generic step
+
+    >>> f3 = Field(name="F3", domain=Alt(["netzob", "zoby"]))
+    >>> plan = ParsingPlan([f0, f3])
+    >>> print(plan.steps)
+    ['literal', 'generic']
+    >>> print(next(MessageParser().parseRaw(b"hello zoby", plan)))
+    [bitarray('011010000110010101101100011011000110111100100000'), bitarray('01111010011011110110001001111001')]
+
+    While relations cannot be compiled
+
+    >>> f4 = Field(name="F4", domain=Size(f1))
+    >>> plan = ParsingPlan([f4, f1])
+    >>> print(plan.compiled)
+    False
+
+    """
+
+    STEP_LITERAL = "literal"
+    STEP_DATA = "data"
+    STEP_PERSISTENT = "persistent"
+    STEP_GENERIC = "generic"
+
+    def __init__(self, fields):
+        """Compiles the specified fields.
+
+        :param fields: the leaf fields to compile
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.Field.Field`
+        """
+        if fields is None:
+            raise Exception("Fields cannot be None")
+
+        self.fields = list(fields)
+        self.compiled = False
+        self.steps = []
+        self._steps = []
+        self._literalVariables = []
+        self._minSuffix = []
+        self._maxSuffix = []
+
+        self._compile()
+
+    def __len__(self):
+        return len(self.fields)
+
+    def _compile(self):
+        """Lowers each field into a parsing step and computes the bounds
+        of each suffix of the plan."""
+
+        for field in self.fields:
+            if self._hasRelation(field.domain):
+                self._logger.debug(
+                    "Field '{}' involves a relation, plan is not compiled".
+                    format(field.name))
+                return
+
+        for field in self.fields:
+            self._steps.append(self._compileField(field))
+        self.steps = [step[0] for step in self._steps]
+
+        # bounds of the number of bits consumed by fields[i:]
+        minSuffix = [0]
+        maxSuffix = [0]
+        for step in reversed(self._steps):
+            (minSize, maxSize) = step[3], step[4]
+            minSuffix.insert(0, minSuffix[0] + minSize)
+            if maxSize is None or maxSuffix[0] is None:
+                maxSuffix.insert(0, None)
+            else:
+                maxSuffix.insert(0, maxSuffix[0] + maxSize)
+        self._minSuffix = minSuffix
+        self._maxSuffix = maxSuffix
+        self.compiled = True
+
+    def _compileField(self, field):
+        """Returns the step (kind, field, variable, minSize, maxSize, value)
+        associated with the specified field."""
+
+        domain = field.domain
+        if isinstance(domain, Data):
+            currentValue = domain.currentValue
+            (minSize, maxSize) = domain.dataType.size
+            if domain.svas == SVAS.CONSTANT and currentValue is not None:
+                self._literalVariables.append(domain)
+                return (ParsingPlan.STEP_LITERAL, field, domain,
+                        len(currentValue), len(currentValue), currentValue)
+            elif domain.svas in (SVAS.EPHEMERAL, SVAS.VOLATILE):
+                return (ParsingPlan.STEP_DATA, field, domain, minSize,
+                        maxSize, None)
+            elif domain.svas == SVAS.PERSISTENT:
+                # the memory may hold a value of any size
+                return (ParsingPlan.STEP_PERSISTENT, field, domain, 0, None,
+                        currentValue)
+
+        return (ParsingPlan.STEP_GENERIC, field, domain, 0, None, None)
+
+    def _hasRelation(self, variable):
+        if isinstance(variable, AbstractRelationVariableLeaf):
+            return True
+        if isinstance(variable, AbstractVariableNode):
+            for child in variable.children:
+                if self._hasRelation(child):
+                    return True
+        return False
+
+    def canParseWith(self, memory):
+        """Returns True if the plan can be executed with the specified memory.
+
+        Constant data are compiled as literals, a memory holding a value for
+        one of them requires the generic parsing algorithm."""
+
+        if not self.compiled:
+            return False
+        if memory is not None:
+            for variable in self._literalVariables:
+                if variable in memory.memory:
+                    return False
+        return True
+
+    def parse(self, bitArrayToParse, memory, must_consume_everything=True):
+        """Executes the plan on the specified bitarray.
+
+        It returns an iterator over the valid parsings, following the same
+        order than the generic parsing algorithm. Each parsing is a tuple made of the
+        values assigned to each field and of the resulting memory.
+        The specified memory is never modified.
+        """
+
+        if not self.canParseWith(memory):
+            raise Exception("This plan cannot be executed with this memory")
+
+        nbSteps = len(self._steps)
+        values = [None] * nbSteps
+        stack = [
+            self._parseStep(0, bitArrayToParse, 0, memory, None,
+                            must_consume_everything)
+        ]
+
+        while len(stack) > 0:
+            i_step = len(stack) - 1
+            try:
+                (value, offset, stepMemory, writes) = next(stack[-1])
+            except StopIteration:
+                stack.pop()
+                continue
+
+            values[i_step] = value
+            if i_step == nbSteps - 1:
+                yield (list(values), self._materialize(stepMemory, writes))
+            else:
+                stack.append(
+                    self._parseStep(i_step + 1, bitArrayToParse, offset,
+                                    stepMemory, writes,
+                                    must_consume_everything))
+
+    def _parseStep(self, i_step, data, offset, memory, writes,
+                   must_consume_everything):
+        """Returns an iterator over the tuples (value, offset, memory, writes)
+        obtained by parsing the data (from the specified offset)
+        with the step i_step.
+
+        To avoid duplicating the memory on each candidate, the
+        values to memorize are stacked in the writes linked list."""
+
+        (kind, field, variable, minSize, maxSize, value) = self._steps[i_step]
+
+        remaining = len(data) - offset
+        # bounds on the number of bits left to the next steps
+        minLeft = self._minSuffix[i_step + 1]
+        maxLeft = self._maxSuffix[i_step + 1]
+        if not must_consume_everything:
+            maxLeft = None
+
+        if kind == ParsingPlan.STEP_PERSISTENT:
+            expectedValue = self._lookup(variable, memory, writes)
+            if expectedValue is None:
+                expectedValue = value
+            if expectedValue is None:
+                kind = ParsingPlan.STEP_DATA
+                (minSize, maxSize) = variable.dataType.size
+            else:
+                kind = ParsingPlan.STEP_LITERAL
+                value = expectedValue
+
+        if kind == ParsingPlan.STEP_LITERAL:
+            end = offset + len(value)
+            left = len(data) - end
+            if left >= minLeft and (maxLeft is None or left <= maxLeft) and data[offset:end] == value:
+                yield (data[offset:end], end, memory, writes)
+
+        elif kind == ParsingPlan.STEP_DATA:
+            if maxSize is None:
+                maxSize = remaining
+            upper = min(maxSize, remaining - minLeft)
+            lower = minSize
+            if maxLeft is not None:
+                lower = max(lower, remaining - maxLeft)
+            if upper < lower:
+                return
+            memorize = variable.svas != SVAS.VOLATILE
+            # the parsable sizes are computed in a single pass
+            sizes = variable.dataType.getParsableSizes(
+                data[offset:offset + upper], lower, upper)
+            # size == 0 : deals with 'optional' data
+            if lower == 0:
+                sizes.append(0)
+            for size in sizes:
+                candidate = data[offset:offset + size]
+                if memorize:
+                    yield (candidate, offset + size, memory,
+                           ((variable, candidate), writes))
+                else:
+                    yield (candidate, offset + size, memory, writes)
+
+        else:
+            carnivorous = (i_step == len(self._steps) - 1) and must_consume_everything
+            remainingData = data[offset:]
+            parsingPath = ParsingPath(remainingData,
+                                      self._materialize(memory, writes))
+            parsingPath.assignDataToField(remainingData, field)
+            for resultPath in FieldParser(field, carnivorous).parse(parsingPath):
+                result = resultPath.getDataAssignedToField(field)
+                left = remaining - len(result)
+                if left >= minLeft and (maxLeft is None or left <= maxLeft):
+                    yield (result, offset + len(result), resultPath.memory,
+                           None)
+
+    def _lookup(self, variable, memory, writes):
+        while writes is not None:
+            ((writtenVariable, writtenValue), writes) = writes
+            if writtenVariable is variable:
+                return writtenValue
+        if memory is not None and variable in memory.memory:
+            return memory.getValue(variable)
+        return None
+
+    def _materialize(self, memory, writes):
+        """Returns a new memory made of the specified one and the
+        pending writes."""
+
+        pending = []
+        while writes is not None:
+            (write, writes) = writes
+            pending.append(write)
+
+        if memory is None:
+            result = Memory()
+        else:
+            result = memory.fork()
+        for (variable, value) in reversed(pending):
+            result.memorize(variable, value.copy())
+        return result
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Size import Size
+from netzob.Model.Vocabulary.Domain.Variables.Nodes.Agg import Agg
+from netzob.Model.Vocabulary.Domain.Variables.Nodes.Alt import Alt
+
+
+@NetzobLogger
+class SymbolIndex(object):
+    """A symbol index returns, for a given data, the symbols that may
+    abstract it, so that only these symbols are parsed.
+
+    Each symbol is compiled into:
+
+    * the minimum and maximum size of the messages it can abstract,
+    * the constant data found at fixed offsets (i.e. after fields of
+      fixed size), compared with the data before any parsing.
+
+    The first constant of each symbol, when it is byte-aligned, is used
+    as a key in a hash table, so the symbols which do not match it are
+    not even considered. The candidates are returned in the order of
+    the indexed symbols and a symbol is only discarded if it cannot
+    abstract the data.
+
+    >>> from netzob.all import *
+    >>> symbols = [Symbol([Field("CMD{0} ".format(i)), Field(ASCII(nbChars=(1, 10)))], name="S{0}".format(i)) for i in range(50)]
+    >>> symbols.append(Symbol([Field(Raw(nbBytes=2)), Field(Raw(nbBytes=(0, 20)))], name="Binary"))
+    >>> index = SymbolIndex(symbols)
+    >>> print(index.getCandidates(b"CMD42 netzob"))
+    [S42, Binary]
+    >>> print(index.getCandidates(b"\\x00\\x01\\x02"))
+    [Binary]
+
+    The index is rebuilt when the list of symbols is modified
+
+    >>> symbols.insert(0, Symbol([Field("CMD42 "), Field("zoby")], name="Zoby"))
+    >>> print(index.getCandidates(b"CMD42 zoby"))
+    [Zoby, S42, Binary]
+
+    or when the structure of an indexed symbol is modified
+
+    >>> symbols[1].fields = [Field("HOLA"), Field(ASCII(nbChars=(1, 10)))]
+    >>> print(index.getCandidates(b"HOLAab"))
+    [S0, Binary]
+    >>> print(index.getCandidates(b"CMD0 netzob"))
+    [Binary]
+
+    Constant data which have a value in the memory are not considered
+
+    >>> memory = Memory()
+    >>> memory.memorize(symbols[43].fields[0].domain, TypeConverter.convert("CMD1 ", ASCII, BitArray))
+    >>> print(index.getCandidates(b"CMD1 netzob", memory))
+    [S1, S42, Binary]
+
+    The index also tells which symbols may still abstract the data once
+    more data is received
+
+    >>> print(index.getPrefixCandidates(b"CMD4"))
+    [Zoby, S4, S40, S41, S42, S43, S44, S45, S46, S47, S48, S49, Binary]
+    >>> print(index.getPrefixCandidates(b"\\x00\\x01" + b"a" * 20))
+    []
+
+    An index over a given sequence of symbols is also shared between
+    successive calls
+
+    >>> SymbolIndex.getIndex(symbols) is SymbolIndex.getIndex(list(symbols))
+    True
+
+    """
+
+    # the last index returned by getIndex()
+    __sharedIndex = None
+
+    def __init__(self, symbols):
+        """Creates an index over the specified list of symbols (or fields
+        without parent). The list is not copied: the index follows its
+        modifications.
+
+        :param symbols: the symbols to index
+        :type symbols: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        if symbols is None:
+            raise Exception("Symbols cannot be None")
+
+        self.symbols = symbols
+        self.reset()
+
+    @staticmethod
+    def getIndex(symbols):
+        """Returns an index over the specified symbols. The same index is
+        returned as long as the same symbols are specified in the same
+        order, so they are only compiled again when one of them is
+        modified.
+
+        :param symbols: the symbols to index
+        :type symbols: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :return: the index over these symbols
+        :rtype: :class:`netzob.Model.Vocabulary.Domain.Parser.SymbolIndex.SymbolIndex`
+        """
+        if symbols is None:
+            raise Exception("Symbols cannot be None")
+
+        index = SymbolIndex.__sharedIndex
+        if index is None or len(index.symbols) != len(symbols) or not all(
+                a is b for a, b in zip(index.symbols, symbols)):
+            index = SymbolIndex(list(symbols))
+            SymbolIndex.__sharedIndex = index
+        return index
+
+    def reset(self):
+        """Forgets the compiled symbols. The symbols are compiled again
+        the next time the index is used."""
+
+        self._indexedSymbols = None
+        self._structureVersions = None
+        self._entries = []
+        self._keys = dict()
+        self._unkeyed = []
+        self._constantOwners = dict()
+
+    def getCandidates(self, data, memory=None):
+        """Returns the symbols that may abstract the specified data.
+
+        :param data: the data to abstract
+        :type data: :class:`bytes`
+        :param memory: the memory used while parsing
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :return: the candidate symbols, in the order of the indexed list
+        :rtype: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+
+        self._update()
+        unconstrained = self._getUnconstrained(memory)
+
+        candidates = set(self._unkeyed)
+        candidates.update(unconstrained)
+        for (offset, length), symbolsByKey in self._keys.items():
+            candidates.update(
+                symbolsByKey.get(data[offset:offset + length], []))
+
+        size = len(data) * 8
+        result = []
+        for i_symbol in sorted(candidates):
+            if i_symbol in unconstrained or self._match(
+                    self._entries[i_symbol], data, size):
+                result.append(self._indexedSymbols[i_symbol])
+        return result
+
+    def getPrefixCandidates(self, data, memory=None):
+        """Returns the symbols of which the specified data may be the
+        beginning of an incomplete message, i.e. the symbols that may
+        abstract it once more data is received.
+
+        :param data: the beginning of the data to abstract
+        :type data: :class:`bytes`
+        :param memory: the memory used while parsing
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :return: the candidate symbols, in the order of the indexed list
+        :rtype: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+
+        self._update()
+        unconstrained = self._getUnconstrained(memory)
+
+        size = len(data) * 8
+        result = []
+        for i_symbol, entry in enumerate(self._entries):
+            if i_symbol in unconstrained or self._matchPrefix(entry, data,
+                                                              size):
+                result.append(self._indexedSymbols[i_symbol])
+        return result
+
+    def _getUnconstrained(self, memory):
+        """Returns the symbols whose constants have been memorized, as
+        they are not constrained by their definition."""
+
+        unconstrained = set()
+        if memory is not None:
+            for variable in memory.memory:
+                owners = self._constantOwners.get(variable)
+                if owners is not None:
+                    unconstrained.update(owners)
+        return unconstrained
+
+    def _matchPrefix(self, entry, data, size):
+        (minSize, maxSize, literals) = entry
+        if maxSize is not None and size >= maxSize:
+            return False
+        for (offset, value) in literals:
+            received = data[offset:offset + len(value)]
+            if received != value[:len(received)]:
+                return False
+        return True
+
+    def _match(self, entry, data, size):
+        (minSize, maxSize, literals) = entry
+        if size < minSize or (maxSize is not None and size > maxSize):
+            return False
+        for (offset, value) in literals:
+            if data[offset:offset + len(value)] != value:
+                return False
+        return True
+
+    def _update(self):
+        """Compiles the symbols if the list or the structure of one of its
+        symbols has changed since the last compilation."""
+
+        symbols = self.symbols
+        structureVersions = [symbol.structureVersion for symbol in symbols]
+        if self._indexedSymbols is not None and len(
+                self._indexedSymbols) == len(symbols) and all(
+                    a is b for a, b in zip(self._indexedSymbols, symbols)
+                ) and self._structureVersions == structureVersions:
+            return
+
+        self.reset()
+        self._indexedSymbols = list(symbols)
+        self._structureVersions = structureVersions
+        for i_symbol, symbol in enumerate(self._indexedSymbols):
+            (entry, constants) = self._compileSymbol(symbol)
+            self._entries.append(entry)
+            for variable in constants:
+                self._constantOwners.setdefault(variable, []).append(i_symbol)
+
+            literals = entry[2]
+            if len(literals) > 0 and literals[0][0] < 8:
+                # the first constant (or its first bytes) is the key
+                (offset, value) = literals[0]
+                key = value[:4]
+                self._keys.setdefault((offset, len(key)), dict()).setdefault(
+                    key, []).append(i_symbol)
+            else:
+                self._unkeyed.append(i_symbol)
+
+        self._logger.debug("{0} symbols indexed, {1} without key".format(
+            len(self._indexedSymbols), len(self._unkeyed)))
+
+    def _compileSymbol(self, symbol):
+        """Returns the entry (minSize, maxSize, literals) of the symbol and
+        the constant variables it relies on. Sizes are in bits, literals
+        are tuples (offset, value) in bytes."""
+
+        unconstrained = ((0, None, []), [])
+        if symbol.hasParent():
+            # the whole symbol of a field is parsed
+            return unconstrained
+        try:
+            leafFields = symbol.getLeafFields()
+            items = []
+            for field in leafFields:
+                self._flatten(field.domain, items)
+        except Exception:
+            return unconstrained
+
+        minSize = 0
+        maxSize = 0
+        offset = 0  # fixed offset in bits, None once unknown
+        literals = []
+        constants = []
+        for (variable, itemMinSize, itemMaxSize) in items:
+            self._collectConstants(variable, constants)
+            if self._isConstant(variable):
+                value = variable.currentValue
+                if offset is not None and offset % 8 == 0 and len(value) % 8 == 0 and len(value) > 0:
+                    literals.append((offset // 8, value.tobytes()))
+            minSize += itemMinSize
+            if maxSize is not None:
+                maxSize = None if itemMaxSize is None else maxSize + itemMaxSize
+            if offset is not None:
+                offset = offset + itemMinSize if itemMinSize == itemMaxSize else None
+
+        return ((minSize, maxSize, literals), constants)
+
+    def _flatten(self, variable, items):
+        """Appends the consecutive items (variable, minSize, maxSize) the
+        variable is made of."""
+
+        if isinstance(variable, Agg):
+            for child in variable.children:
+                self._flatten(child, items)
+        else:
+            (minSize, maxSize) = self._getSizeBounds(variable)
+            items.append((variable, minSize, maxSize))
+
+    def _getSizeBounds(self, variable):
+        """Returns the minimum and maximum number of bits the variable
+        can parse (maximum is None if unknown)."""
+
+        if self._isConstant(variable):
+            size = len(variable.currentValue)
+            return (size, size)
+        if isinstance(variable, Data) and variable.svas in (SVAS.EPHEMERAL,
+                                                            SVAS.VOLATILE):
+            (minSize, maxSize) = variable.dataType.size
+            return (minSize or 0, maxSize)
+        if isinstance(variable, Size):
+            # the parsing of a size field requires a fixed size
+            return variable.dataType.size
+        if isinstance(variable, Agg):
+            minSize = 0
+            maxSize = 0
+            for child in variable.children:
+                (childMinSize, childMaxSize) = self._getSizeBounds(child)
+                minSize += childMinSize
+                if maxSize is not None:
+                    maxSize = None if childMaxSize is None else maxSize + childMaxSize
+            return (minSize, maxSize)
+        if isinstance(variable, Alt) and len(variable.children) > 0:
+            bounds = [self._getSizeBounds(child) for child in variable.children]
+            maxSizes = [maxSize for (minSize, maxSize) in bounds]
+            return (min(minSize for (minSize, maxSize) in bounds),
+                    None if None in maxSizes else max(maxSizes))
+        # persistent data, other relations and repeats
+        return (0, None)
+
+    def _collectConstants(self, variable, constants):
+        """Appends the constant data the variable relies on, as a value
+        in the memory takes precedence over their definition."""
+
+        if self._isConstant(variable):
+            constants.append(variable)
+        elif isinstance(variable, (Agg, Alt)):
+            for child in variable.children:
+                self._collectConstants(child, constants)
+
+    def _isConstant(self, variable):
+        return isinstance(variable, Data) and variable.svas == SVAS.CONSTANT and variable.currentValue is not None
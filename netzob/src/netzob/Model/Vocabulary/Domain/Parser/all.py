@@ -32,4 +32,6 @@
 from netzob.Model.Vocabulary.Domain.Parser.FieldParser import FieldParser
 from netzob.Model.Vocabulary.Domain.Parser.VariableParser import VariableParser
 from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
 from netzob.Model.Vocabulary.Domain.Parser.FlowParser import FlowParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
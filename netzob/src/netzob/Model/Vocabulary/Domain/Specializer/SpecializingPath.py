@@ -62,23 +62,10 @@ class SpecializingPath(GenericPath):
             self.__ok = ok
 
     def duplicate(self):
-        dField = {}
-        for key, value in list(self._dataAssignedToField.items()):
-            dField[key] = value.copy()
-
-        dVariable = {}
-        for key, value in list(self._dataAssignedToVariable.items()):
-            dVariable[key] = value.copy()
-
-        fCall = [x for x in self._fieldsCallbacks]
-
-        result = SpecializingPath(
-            memory=self.memory.duplicate(),
-            dataAssignedToField=dField,
-            dataAssignedToVariable=dVariable,
-            fieldsCallbacks=fCall,
-            ok=self.ok())
-
+        """Returns a new specializing path that shares the assignments and
+        the memory of the current one until any of them is modified."""
+        result = SpecializingPath(memory=self.memory.fork(), ok=self.ok())
+        self._shareAssignmentsWith(result)
         return result
 
     def ok(self):
@@ -62,6 +62,12 @@ class AbstractRelationVariableLeaf(AbstractVariableLeaf):
             fieldDependencies = []
         self.fieldDependencies = fieldDependencies
 
+    def getDependencySizes(self, parsingPath, variable):
+        """Returns the sizes (in bits) the specified variable can have given
+        the data already parsed for this relation, or None if the relation
+        does not constrain it (the default)."""
+        return None
+
     @property
     def fieldDependencies(self):
         """A list of fields that are required before computing the value of this relation
@@ -81,3 +87,4 @@ class AbstractRelationVariableLeaf(AbstractVariableLeaf):
         self.__fieldDependencies = []
         for f in fields:
             self.__fieldDependencies.extend(f.getLeafFields())
+
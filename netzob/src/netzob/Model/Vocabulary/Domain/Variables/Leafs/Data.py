@@ -398,14 +398,13 @@ class Data(AbstractVariableLeaf):
             #         newParsingPath.addResult(self, content[:size].copy())
             #         yield newParsingPath
 
-            for size in range(min(maxSize, len(content)), minSize - 1, -1):
-                # size == 0 : deals with 'optional' data
-                if size == 0 or self.dataType.canParse(content[:size]):
-                    # we create a new parsing path and returns it
-                    newParsingPath = parsingPath.duplicate()
+            for size in self.__candidateSizes(parsingPath, content, minSize,
+                                              min(maxSize, len(content))):
+                # we create a new parsing path and returns it
+                newParsingPath = parsingPath.duplicate()
 
-                    newParsingPath.addResult(self, content[:size].copy())
-                    yield newParsingPath
+                newParsingPath.addResult(self, content[:size].copy())
+                yield newParsingPath
 
     @typeCheck(ParsingPath)
     def valueCMP(self, parsingPath, acceptCallBack=True, carnivorous=False):
@@ -466,14 +465,32 @@ class Data(AbstractVariableLeaf):
             #            minSize = len(content)
             #            maxSize = len(content)
 
-            for size in range(min(maxSize, len(content)), minSize - 1, -1):
-                # size == 0 : deals with 'optional' data
-                if size == 0 or self.dataType.canParse(content[:size]):
-                    # we create a new parsing path and returns it
-                    newParsingPath = parsingPath.duplicate()
-                    newParsingPath.addResult(self, content[:size].copy())
-                    newParsingPath.memory.memorize(self, content[:size].copy())
-                    yield newParsingPath
+            for size in self.__candidateSizes(parsingPath, content, minSize,
+                                              min(maxSize, len(content))):
+                # we create a new parsing path and returns it
+                newParsingPath = parsingPath.duplicate()
+                newParsingPath.addResult(self, content[:size].copy())
+                newParsingPath.memory.memorize(self, content[:size].copy())
+                yield newParsingPath
+
+    def __candidateSizes(self, parsingPath, content, minSize, maxSize):
+        """Returns the sizes of the prefixes of the content that can be
+        parsed by the data (from the longest). A relation already parsed
+        (such as a Size field) may impose the size of the data, only these
+        sizes are checked. Otherwise, the datatype computes every parsable
+        size in a single pass over the content.
+        A size of 0 deals with 'optional' data."""
+        constrainedSizes = parsingPath.getConstrainedSizes(self)
+        if constrainedSizes is None:
+            sizes = self.dataType.getParsableSizes(content, minSize, maxSize)
+            if minSize == 0:
+                sizes.append(0)
+            return sizes
+        return [
+            size for size in sorted(constrainedSizes, reverse=True)
+            if minSize <= size <= maxSize and (
+                size == 0 or self.dataType.canParse(content[:size]))
+        ]
 
     @typeCheck(SpecializingPath)
     def use(self, variableSpecializerPath, acceptCallBack=True):
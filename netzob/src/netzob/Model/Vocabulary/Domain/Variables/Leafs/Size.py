@@ -46,6 +46,7 @@ from bitarray import bitarray
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractRelationVariableLeaf import AbstractRelationVariableLeaf
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Model.Vocabulary.Types.ASCII import ASCII
 from netzob.Model.Vocabulary.Types.AbstractType import AbstractType
@@ -327,6 +328,11 @@ class Size(AbstractRelationVariableLeaf):
                 size += len(fieldValue)
 
         size = int(size * self.factor + self.offset)
+        return self.__encodeSize(size)
+
+    def __encodeSize(self, size):
+        """Returns the bitarray that encodes the specified size following
+        the datatype of the relation."""
         size_raw = TypeConverter.convert(size,
                                          Integer,
                                          Raw,
@@ -349,6 +355,93 @@ class Size(AbstractRelationVariableLeaf):
         self._logger.debug("computed value for Size field: '{}'".format(b))
         return b
 
+    @typeCheck(GenericPath, AbstractVariable)
+    def getDependencySizes(self, parsingPath, variable):
+        """Returns the sizes (in bits) the specified variable can have so
+        that the value of this relation, already parsed in the path, is
+        verified. It is only possible if the variable is the last dependency
+        whose size is unknown. The parser uses it to cut the variable at
+        the right length instead of trying every possible size.
+
+        >>> from netzob.all import *
+        >>> from bitarray import bitarray
+        >>> from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+        >>> f0 = Field(Raw(nbBytes=1), name="f0")
+        >>> f1 = Field(Raw(nbBytes=1), name="f1")
+        >>> f2 = Field(Raw(nbBytes=(0, 100)), name="f2")
+        >>> f0.domain = Size([f1, f2])
+        >>> path = ParsingPath(bitarray(), Memory())
+        >>> print(f0.domain.getDependencySizes(path, f2.domain))
+        None
+        >>> path.addResult(f0.domain, TypeConverter.convert(b"\\x07", Raw, BitArray))
+        >>> print(f0.domain.getDependencySizes(path, f2.domain))
+        [48, 49, 50, 51, 52, 53, 54, 55]
+        >>> print(f0.domain.getDependencySizes(path, f1.domain))
+        None
+
+        :return: the list of possible sizes or None if the relation does
+                 not constrain the size of the variable.
+        """
+        if parsingPath is None:
+            raise Exception("ParsingPath cannot be None")
+        if not parsingPath.isDataAvailableForVariable(self):
+            return None
+
+        # the value is decoded only if its encoding is injective (i.e.
+        # no bit is dropped to fit the size of the datatype)
+        (minSize, maxSize) = self.dataType.size
+        unitSize = int(self.dataType.unitSize)
+        if minSize != maxSize or minSize % 8 != 0 or unitSize > minSize or self.factor <= 0:
+            return None
+
+        # the variable (being parsed) must be the only dependency whose
+        # size is unknown, other ones have a fixed size or are parsed
+        knownSize = 0
+        isDependency = False
+        for field in self.fieldDependencies:
+            if field.domain is variable:
+                isDependency = True
+                continue
+            if field.domain == self:
+                knownSize += minSize
+                continue
+            if hasattr(field.domain, "dataType"):
+                (fieldMinSize, fieldMaxSize) = field.domain.dataType.size
+                if fieldMaxSize is not None and fieldMinSize == fieldMaxSize:
+                    knownSize += fieldMinSize
+                    continue
+            if not parsingPath.isDataAvailableForVariable(field.domain):
+                return None
+            knownSize += len(
+                parsingPath.getDataAssignedToVariable(field.domain))
+
+        if not isDependency:
+            return None
+
+        # retrieve the parsed size
+        value = parsingPath.getDataAssignedToVariable(self)
+        raw = value.tobytes()
+        signed = self.dataType.sign == AbstractType.SIGN_SIGNED
+        size = None
+        for endianness in ("big", "little"):
+            candidate = int.from_bytes(raw, endianness, signed=signed)
+            try:
+                if self.__encodeSize(candidate) == value:
+                    size = candidate
+                    break
+            except Exception:
+                continue
+        if size is None:
+            return None
+
+        # sizes verifying int((knownSize + s) * factor + offset) == size
+        lowerBound = int((size - self.offset) / self.factor) - knownSize - 1
+        upperBound = int((size + 1 - self.offset) / self.factor) - knownSize + 1
+        return [
+            s for s in range(max(0, lowerBound), upperBound + 1)
+            if int((knownSize + s) * self.factor + self.offset) == size
+        ]
+
     @typeCheck(SpecializingPath)
     def regenerate(self, variableSpecializerPath, moreCallBackAccepted=True):
         """This method participates in the specialization proces.
@@ -54,6 +54,7 @@ class Memory(object):
         """Constructor of Memory"""
         self.memory = dict()
         self.__memoryAccessCB = None
+        self.__shared = False
 
     @typeCheck(AbstractVariable, bitarray)
     def memorize(self, variable, value):
@@ -67,6 +68,7 @@ class Memory(object):
         Data (ASCII=None ((0, None))): b'hello'
         
         """
+        self.__ensureOwnMemory()
         self.memory[variable] = value
 
     @typeCheck(AbstractVariable)
@@ -115,6 +117,7 @@ class Memory(object):
         False
         """
         if variable in list(self.memory.keys()):
+            self.__ensureOwnMemory()
             self.memory.pop(variable, None)
 
     def duplicate(self):
@@ -145,6 +148,47 @@ class Memory(object):
             duplicatedMemory.memory[k] = self.memory[k].copy()
         return duplicatedMemory
 
+    def fork(self):
+        """Returns a new memory that shares its entries with the current
+        one until any of them is modified (copy-on-write). Contrary to
+        :meth:`duplicate`, memorized values are not copied: they must
+        not be modified in place.
+
+        >>> from netzob.all import *
+        >>> d1 = Data(Integer)
+        >>> d2 = Data(ASCII)
+        >>> m = Memory()
+        >>> m.memorize(d1, TypeConverter.convert(100, Integer, BitArray))
+        >>> m2 = m.fork()
+        >>> m2.getValue(d1)
+        bitarray('01100100')
+        >>> m2.memorize(d2, TypeConverter.convert("hello", ASCII, BitArray))
+        >>> m2.hasValue(d2)
+        True
+        >>> m.hasValue(d2)
+        False
+        >>> m.forget(d1)
+        >>> m.hasValue(d1)
+        False
+        >>> m2.hasValue(d1)
+        True
+
+        :return: a new memory sharing the entries of the current one
+        :rtype: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory`
+        """
+        forkedMemory = Memory()
+        forkedMemory.__memory = self.__memory
+        forkedMemory.__shared = True
+        self.__shared = True
+        return forkedMemory
+
+    def __ensureOwnMemory(self):
+        """Copies the entries shared with forked memories before
+        they get modified."""
+        if self.__shared:
+            self.__memory = dict(self.__memory)
+            self.__shared = False
+
     def __str__(self):
         result = []
         for var, value in list(self.memory.items()):
@@ -163,6 +207,7 @@ class Memory(object):
     @memory.setter
     def memory(self, memory):
         self.__memory = dict()
+        self.__shared = False
         for k, v in list(memory.items()):
             self.__memory[k] = v
 
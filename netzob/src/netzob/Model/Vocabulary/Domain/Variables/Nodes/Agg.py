@@ -223,7 +223,8 @@ class Agg(AbstractVariableNode):
             value = None
             for child in self.children:
                 if value is None:
-                    value = specializingPath.getDataAssignedToVariable(child)
+                    value = specializingPath.getDataAssignedToVariable(
+                        child).copy()
                 else:
                     value += specializingPath.getDataAssignedToVariable(child)
 
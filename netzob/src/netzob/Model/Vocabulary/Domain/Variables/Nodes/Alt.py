@@ -45,6 +45,8 @@ import random
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Model.Vocabulary.Domain.Variables.Nodes.AbstractVariableNode import AbstractVariableNode
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
 from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
 from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
 
@@ -99,10 +101,25 @@ class Alt(AbstractVariableNode):
     ---- | ------
     '22' | '0044'
     ---- | ------
+
+    Constant children are indexed by their value, so only the ones
+    matching the beginning of the data are explored, whatever the number
+    of alternatives
+
+    >>> from netzob.all import *
+    >>> commands = ["CMD{0}".format(i) for i in range(1000)]
+    >>> f0 = Field(Alt(commands + [Raw(nbBytes=(6, 7))]), name="f0")
+    >>> s = Symbol([f0])
+    >>> mp = MessageParser()
+    >>> print(mp.parseMessage(RawMessage("CMD999"), s))
+    [bitarray('010000110100110101000100001110010011100100111001')]
+    >>> print(mp.parseMessage(RawMessage("CMD1000"), s))
+    [bitarray('01000011010011010100010000110001001100000011000000110000')]
     """
 
     def __init__(self, children=None, svas=None):
         super(Alt, self).__init__(self.__class__.__name__, children, svas=svas)
+        self.__literalIndex = None
 
     @typeCheck(ParsingPath)
     def parse(self, parsingPath, carnivorous=False):
@@ -117,21 +134,29 @@ class Alt(AbstractVariableNode):
         dataToParse = parsingPath.getDataAssignedToVariable(self)
         self._logger.debug("Parse '{0}' with '{1}'".format(dataToParse, self))
 
+        children = self.children
+        exploredChildren = self.__getExploredChildren(parsingPath,
+                                                      dataToParse)
+        if len(exploredChildren) == 0:
+            return
+
         parserPaths = [parsingPath]
-        parsingPath.assignDataToVariable(dataToParse.copy(), self.children[0])
+        parsingPath.assignDataToVariable(dataToParse.copy(),
+                                         children[exploredChildren[0]])
 
-        # create a path for each child
-        if len(self.children) > 1:
-            for child in self.children[1:]:
-                newParsingPath = parsingPath.duplicate()
-                newParsingPath.assignDataToVariable(dataToParse.copy(), child)
-                parserPaths.append(newParsingPath)
+        # create a path for each explored child
+        for i_child in exploredChildren[1:]:
+            newParsingPath = parsingPath.duplicate()
+            newParsingPath.assignDataToVariable(dataToParse.copy(),
+                                                children[i_child])
+            parserPaths.append(newParsingPath)
 
         # parse each child according to its definition
-        for i_child, child in enumerate(self.children):
-            parsingPath = parserPaths[i_child]
+        for i_path, i_child in enumerate(exploredChildren):
+            child = children[i_child]
+            parsingPath = parserPaths[i_path]
             self._logger.debug("ALT Parse of {0}/{1} with {2}".format(
-                i_child + 1, len(self.children), parsingPath))
+                i_child + 1, len(children), parsingPath))
 
             childParsingPaths = child.parse(parsingPath)
             for childParsingPath in childParsingPaths:
@@ -141,6 +166,64 @@ class Alt(AbstractVariableNode):
                         childParsingPath.getDataAssignedToVariable(child))
                     yield childParsingPath
 
+    def __getExploredChildren(self, parsingPath, dataToParse):
+        """Returns the sorted indexes of the children that may parse the
+        data: constant children whose value is not a prefix of the data
+        cannot succeed and are skipped."""
+
+        (literals, literalPositions, others) = self.__getLiteralIndex()
+        if len(literals) == 0 or parsingPath.memory is None:
+            return list(range(len(self.children)))
+
+        exploredChildren = list(others)
+
+        # a memorized value takes precedence over the constant one
+        memorizedChildren = set()
+        for variable in parsingPath.memory.memory:
+            i_child = literalPositions.get(variable)
+            if i_child is not None:
+                memorizedChildren.add(i_child)
+        exploredChildren.extend(memorizedChildren)
+
+        for size, values in literals.items():
+            if size > len(dataToParse):
+                continue
+            for i_child in values.get(dataToParse[:size].tobytes(), []):
+                if i_child not in memorizedChildren:
+                    exploredChildren.append(i_child)
+
+        return sorted(exploredChildren)
+
+    def __getLiteralIndex(self):
+        """Returns the constant children indexed by size and value, their
+        positions and the positions of the other children. The index is
+        rebuilt whenever the children or their values change."""
+
+        children = self.children
+        signature = [(child, child.svas, getattr(child, "currentValue", None))
+                     for child in children]
+        if self.__literalIndex is not None:
+            (previousSignature, index) = self.__literalIndex
+            if len(previousSignature) == len(signature) and all(
+                    p[0] is c[0] and p[1] == c[1] and p[2] is c[2]
+                    for p, c in zip(previousSignature, signature)):
+                return index
+
+        literals = dict()
+        literalPositions = dict()
+        others = []
+        for i_child, (child, svas, value) in enumerate(signature):
+            if isinstance(child, Data) and svas == SVAS.CONSTANT and value is not None:
+                literals.setdefault(len(value), dict()).setdefault(
+                    value.tobytes(), []).append(i_child)
+                literalPositions[child] = i_child
+            else:
+                others.append(i_child)
+
+        index = (literals, literalPositions, others)
+        self.__literalIndex = (signature, index)
+        return index
+
     @typeCheck(SpecializingPath)
     def specialize(self, specializingPath):
         """Specializes an Alt"""
@@ -205,6 +205,7 @@ class Field(AbstractField):
     def domain(self, domain):
         normalizedDomain = DomainFactory.normalizeDomain(domain)
         self.__domain = normalizedDomain
+        self._updateStructureVersion()
 
     @property
     def messages(self):
@@ -289,6 +289,48 @@ class ASCII(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of data that are
+        valid utf-8 strings (see :meth:`AbstractType.getParsableSizes`).
+        Data is decoded once, valid prefixes end on a character boundary
+        before the first invalid sequence.
+
+        >>> from netzob.all import *
+        >>> data = TypeConverter.convert("héllo", ASCII, BitArray) + TypeConverter.convert(b"\\xff!", Raw, BitArray)
+        >>> print([size // 8 for size in ASCII().getParsableSizes(data)])
+        [6, 5, 4, 3, 1]
+        >>> print([size // 8 for size in ASCII(nbChars=(2, 4)).getParsableSizes(data)])
+        [4, 3]
+        >>> print([size // 8 for size in ASCII().getParsableSizes(data, minSize=24, maxSize=40)])
+        [5, 4, 3]
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+
+        # Ascii must be 8 bits modulo length
+        rawData = data[:maxSize - maxSize % 8].tobytes()
+        try:
+            rawData.decode('utf-8')
+            validLength = len(rawData)
+        except UnicodeDecodeError as e:
+            validLength = e.start
+
+        (minChar, maxChar) = self.nbChars
+        firstLength = max(1, (minSize + 7) // 8)
+        if minChar is not None:
+            firstLength = max(firstLength, minChar)
+        lastLength = validLength
+        if maxChar is not None:
+            lastLength = min(lastLength, maxChar)
+
+        # continuation bytes (10xxxxxx) are not character boundaries
+        return [
+            length * 8 for length in range(lastLength, firstLength - 1, -1)
+            if length == validLength or rawData[length] & 0xC0 != 0x80
+        ]
+
     @property
     def nbChars(self):
         return self.__nbChars
@@ -419,6 +419,35 @@ class AbstractType(object, metaclass=abc.ABCMeta):
         raise NotImplementedError(
             "Internal Error: 'canParse' method not implemented")
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of the specified data
+        that can be parsed with the current type, from the longest to the
+        shortest. The parser uses it instead of calling :meth:`canParse`
+        on every prefix. This default implementation does exactly that,
+        types override it with a single pass over the data.
+
+        >>> from netzob.all import *
+        >>> print(Timestamp().getParsableSizes(TypeConverter.convert("netzob", ASCII, BitArray)))
+        [48, 40, 32]
+
+        :param data: the data to parse
+        :type data: :class:`bitarray.bitarray`
+        :param minSize: the minimum size (in bits) of a prefix
+        :type minSize: :class:`int`
+        :param maxSize: the maximum size (in bits) of a prefix (None means the size of data)
+        :type maxSize: :class:`int`
+        :return: the sizes of the prefixes that can be parsed
+        :rtype: a list of :class:`int`
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        return [
+            size for size in range(maxSize, max(minSize, 1) - 1, -1)
+            if self.canParse(data[:size])
+        ]
+
     @property
     def value(self):
         """The current value of the instance. This value is represented
@@ -113,6 +113,25 @@ class BitArray(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of data that respect
+        the size of the BitArray (see :meth:`AbstractType.getParsableSizes`).
+
+        >>> from netzob.all import *
+        >>> print(BitArray(nbBits=(2, 4)).getParsableSizes(bitarray('010101')))
+        [4, 3, 2]
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        (nbMinBits, nbMaxBits) = self.size
+        if nbMinBits is not None:
+            minSize = max(minSize, nbMinBits)
+        if nbMaxBits is not None:
+            maxSize = min(maxSize, nbMaxBits)
+        return list(range(maxSize, max(minSize, 1) - 1, -1))
+
     def generate(self, generationStrategy=None):
         """Generates a random bitarray that respects the constraints.
         """
@@ -51,6 +51,9 @@ from netzob.Model.Vocabulary.Types.ASCII import ASCII
 
 
 class HexaString(AbstractType):
+
+    HEXADECIMAL_CHARACTERS = b"0123456789abcdef"
+
     def __init__(self, value=None, size=(None, None)):
         if value is not None and not isinstance(value, bitarray):
             from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
@@ -80,6 +83,11 @@ class HexaString(AbstractType):
         >>> print(HexaString().canParse(hex))
         True
 
+        Data can also be specified as a bitarray (such as while parsing)
+
+        >>> HexaString().canParse(TypeConverter.convert("0a1f", ASCII, BitArray))
+        True
+
         :param data: the data to check
         :type data: python raw
         :return: True if data can be parsed as an hexastring
@@ -90,6 +98,11 @@ class HexaString(AbstractType):
         if data is None:
             raise TypeError("data cannot be None")
 
+        if isinstance(data, bitarray):
+            if len(data) % 8 != 0:
+                return False
+            data = data.tobytes()
+
         if len(data) == 0:
             return False
 
@@ -110,13 +123,38 @@ class HexaString(AbstractType):
         allowedValues = [str(i) for i in range(0, 10)]
         allowedValues.extend(["a", "b", "c", "d", "e", "f"])
 
-        str_data = data.decode('utf-8')
+        try:
+            str_data = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
         for i in range(0, len(data)):
             if not str_data[i] in allowedValues:
                 return False
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of data that only
+        include hexadecimal characters (see
+        :meth:`AbstractType.getParsableSizes`).
+
+        >>> from netzob.all import *
+        >>> print(HexaString().getParsableSizes(TypeConverter.convert("0a1z", ASCII, BitArray)))
+        [24, 16, 8]
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        rawData = data[:maxSize - maxSize % 8].tobytes()
+        validLength = 0
+        while validLength < len(rawData) and rawData[validLength] in HexaString.HEXADECIMAL_CHARACTERS:
+            validLength += 1
+        return [
+            length * 8
+            for length in range(validLength, max(1, (minSize + 7) // 8) - 1, -1)
+        ]
+
     @staticmethod
     @typeCheck(str)
     def decode(data,
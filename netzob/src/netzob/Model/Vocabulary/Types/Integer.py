@@ -195,6 +195,21 @@ class Integer(AbstractType):
 
         return True
 
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of data that can be
+        parsed as an Integer, which is the case of any non empty prefix
+        (see :meth:`AbstractType.getParsableSizes`).
+
+        >>> from netzob.all import *
+        >>> print(Integer().getParsableSizes(TypeConverter.convert(b"\\x01", Raw, BitArray), minSize=4))
+        [8, 7, 6, 5, 4]
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        return list(range(maxSize, max(minSize, 1) - 1, -1))
+
     @staticmethod
     def decode(data,
                unitSize=AbstractType.defaultUnitSize(),
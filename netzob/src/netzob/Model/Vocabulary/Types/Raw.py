@@ -244,3 +244,20 @@ class Raw(AbstractType):
                     return False
 
         return True
+
+    def getParsableSizes(self, data, minSize=0, maxSize=None):
+        """Returns the sizes (in bits) of the prefixes of data that can be
+        parsed as raw, i.e. the prefixes aligned on a byte (see
+        :meth:`AbstractType.getParsableSizes`).
+
+        >>> from netzob.all import *
+        >>> print(Raw().getParsableSizes(TypeConverter.convert("hello", ASCII, BitArray), minSize=20))
+        [40, 32, 24]
+        """
+        if data is None:
+            raise TypeError("data cannot be None")
+        if self.alphabet is not None:
+            return super(Raw, self).getParsableSizes(data, minSize, maxSize)
+        if maxSize is None or maxSize > len(data):
+            maxSize = len(data)
+        return list(range(maxSize - maxSize % 8, max(minSize, 1) - 1, -8))
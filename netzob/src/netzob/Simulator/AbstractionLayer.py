@@ -52,6 +52,7 @@ from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
 from netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
 from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
 from netzob.Model.Vocabulary.Domain.Parser.FlowParser import FlowParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
@@ -109,6 +110,20 @@ class AbstractionLayer(object):
         self.parser = MessageParser(memory=self.memory)
         self.flow_parser = FlowParser(memory=self.memory)
 
+    @property
+    def symbols(self):
+        """The symbols used to abstract received messages. The index used to
+        select the symbols to parse follows the modifications of this list.
+
+        :type: a :class:`list` of :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        """
+        return self.__symbols
+
+    @symbols.setter
+    def symbols(self, symbols):
+        self.__symbols = symbols
+        self.symbolIndex = SymbolIndex(symbols)
+
     @typeCheck(Symbol)
     def writeSymbol(self, symbol, rate=None, duration=None, presets=None):
         """Write the specified symbol on the communication channel
@@ -207,6 +222,31 @@ class AbstractionLayer(object):
     @typeCheck(int)
     def readSymbols(self, timeout=EmptySymbol.defaultReceptionTimeout()):
         """Read from the abstraction layer a flow and abstract it with one or more consecutive symbols
+
+        A message received over several reads (e.g. split in several TCP
+        segments) is abstracted once complete. The data that follows the
+        last complete symbol is kept for the next call, unless it cannot be
+        the beginning of a message: it is then returned at once in an
+        :class:`netzob.Model.Vocabulary.UnknownSymbol.UnknownSymbol`.
+
+        >>> from netzob.all import *
+        >>> class ReplayChannel(object):
+        ...     def __init__(self, reads):
+        ...         self.reads = reads
+        ...     def read(self, timeout=None):
+        ...         return self.reads.pop(0) if len(self.reads) > 0 else b""
+        >>> hello = Symbol([Field(b"HELLO")], name="hello")
+        >>> bye = Symbol([Field(b"BYE")], name="bye")
+        >>> channel = ReplayChannel([b"\\x00\\x01junk", b"HELLO", b"BYE", b"HELLO"])
+        >>> abstractionLayer = AbstractionLayer(channel, [hello, bye])
+        >>> for i in range(5):
+        ...     (symbols, data) = abstractionLayer.readSymbols()
+        ...     print([s.__class__.__name__ + ":" + s.name for s in symbols])
+        ["UnknownSymbol:Unknown Symbol b'\\\\x00\\\\x01junk'"]
+        ['Symbol:hello']
+        ['Symbol:bye']
+        ['Symbol:hello']
+        ['EmptySymbol:Empty Symbol']
         
         The timeout parameter represents the amount of time (in millisecond) above which
         no reception of a message triggers the reception of an  :class:`netzob.Model.Vocabulary.EmptySymbol.EmptySymbol`. If timeout set to None
@@ -217,31 +257,40 @@ class AbstractionLayer(object):
         :raise TypeError if the parameter is not valid and Exception if an error occurs.
         """
 
-        self._logger.debug("Reading data from communication channel...")
-        data = self.channel.read(timeout=timeout)
-        self._logger.debug("Received : {}".format(repr(data)))
-
         symbols = []
+        data = b""
+
+        # symbols are returned as soon as they are complete, while an
+        # incomplete message waits for the next reads in the buffer of
+        # the flow parser
+        while len(symbols) == 0:
+            self._logger.debug("Reading data from communication channel...")
+            received = self.channel.read(timeout=timeout)
+            self._logger.debug("Received : {}".format(repr(received)))
+            data += received
+
+            if len(received) == 0:
+                break
 
-        # if we read some bytes, we try to abstract them
-        if len(data) > 0:
             try:
-                symbols_and_data = self.flow_parser.parseFlow(
-                    RawMessage(data), self.symbols)
+                symbols_and_data = self.flow_parser.parseStream(
+                    received, self.symbols)
                 for (symbol, alignment) in symbols_and_data:
                     symbols.append(symbol)
             except Exception as e:
                 self._logger.error(e)
+                break
 
-            if len(symbols) > 0:
-                self.memory = self.flow_parser.memory
-                self.specializer.memory = self.memory
+        if len(symbols) > 0:
+            self.memory = self.flow_parser.memory
+            self.specializer.memory = self.memory
         else:
-            symbols.append(EmptySymbol())
-
-        if len(symbols) == 0 and len(data) > 0:
-            msg = RawMessage(data)
-            symbols.append(UnknownSymbol(message=msg))
+            # nothing more was received, pending data cannot be abstracted
+            pending = self.flow_parser.flush()
+            if len(pending) > 0:
+                symbols.append(UnknownSymbol(message=RawMessage(pending)))
+            else:
+                symbols.append(EmptySymbol())
 
         return (symbols, data)
 
@@ -264,9 +313,11 @@ class AbstractionLayer(object):
 
         symbol = None
 
-        # if we read some bytes, we try to abstract them
+        # if we read some bytes, we try to abstract them with the symbols
+        # that may match them
         if len(data) > 0:
-            for potential in self.symbols:
+            for potential in self.symbolIndex.getCandidates(
+                    data, self.parser.memory):
                 try:
                     self.parser.parseMessage(RawMessage(data), potential)
                     symbol = potential
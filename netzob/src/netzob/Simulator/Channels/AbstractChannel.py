@@ -42,6 +42,7 @@ import os
 import fcntl
 import struct
 import time
+import selectors
 
 #+---------------------------------------------------------------------------+
 #| Related third party imports                                               |
@@ -51,6 +52,7 @@ import time
 #| Local application imports                                                 |
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck
+from netzob.Simulator.Channels.Framers.AbstractFramer import AbstractFramer
 
 
 class ChannelDownException(Exception):
@@ -70,6 +72,7 @@ class AbstractChannel(object, metaclass=abc.ABCMeta):
     TYPE_UDPSERVER = 8
 
     DEFAULT_WRITE_COUNTER_MAX = -1
+    DEFAULT_READING_SEG_SIZE = 1024
 
     def __init__(self, isServer, _id=uuid.uuid4()):
         """Constructor for an Abstract Channel
@@ -87,6 +90,8 @@ class AbstractChannel(object, metaclass=abc.ABCMeta):
         self.type = AbstractChannel.TYPE_UNDEFINED
         self.writeCounter = 0
         self.writeCounterMax = AbstractChannel.DEFAULT_WRITE_COUNTER_MAX
+        self.framer = None
+        self.__readBuffer = b""
 
     def __enter__(self):
         """Enter the runtime channel context.
@@ -162,6 +167,67 @@ class AbstractChannel(object, metaclass=abc.ABCMeta):
         @type timeout: :class:`int`
         """
 
+    def _readFrame(self, sock, timeout=None):
+        """Reads the next frame on the specified socket, as delimited by the
+        framer of the channel. The socket is polled for readiness and the
+        frame is returned as soon as it is complete, the following bytes
+        being kept for the next reads. If the timeout expires or the peer
+        closes the connection before, the received bytes are returned.
+
+        :parameter sock: the socket to read
+        :type sock: :class:`socket.socket`
+        :keyword timeout: the maximum time in millisecond to wait for a frame. If None or negative, the timeout of the socket is used.
+        :type timeout: :class:`int`
+        """
+        if timeout is not None and timeout >= 0:
+            timeout = timeout / 1000.0
+        else:
+            timeout = sock.gettimeout()
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            while True:
+                frameLength = self.framer.getFrameLength(self.__readBuffer)
+                if frameLength is not None:
+                    frame = self.__readBuffer[:frameLength]
+                    self.__readBuffer = self.__readBuffer[frameLength:]
+                    return frame
+
+                # SSL sockets may hold decrypted bytes the selector ignores
+                pending = getattr(sock, "pending", None)
+                if pending is None or pending() == 0:
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            break
+                    if len(selector.select(remaining)) == 0:
+                        break
+
+                try:
+                    recv = sock.recv(AbstractChannel.DEFAULT_READING_SEG_SIZE)
+                except socket.timeout:
+                    break
+                if recv is None or len(recv) == 0:
+                    break
+                self.__readBuffer += recv
+
+        # no complete frame, returns what was received
+        data = self.__readBuffer
+        self.__readBuffer = b""
+        return data
+
+    def _resetReadBuffer(self):
+        """Drops the bytes received but not yet returned by
+        :meth:`_readFrame`. Stream channels call it when they open or
+        close their connection, so the leftovers of a connection are
+        never returned by the reads of the next one.
+        """
+        self.__readBuffer = b""
+
     def setWriteCounterMax(self, maxValue):
         """Change the max number of writings.
         When it is reached, no packet can be sent anymore until
@@ -278,6 +344,21 @@ class AbstractChannel(object, metaclass=abc.ABCMeta):
 
     # Properties
 
+    @property
+    def framer(self):
+        """The framer which delimits the messages read on the channel. If
+        None, a read returns everything received until the reception
+        timeout expires.
+
+        :type: :class:`netzob.Simulator.Channels.Framers.AbstractFramer.AbstractFramer`
+        """
+        return self.__framer
+
+    @framer.setter
+    @typeCheck(AbstractFramer)
+    def framer(self, framer):
+        self.__framer = framer
+
     @property
     def channelType(self):
         """Returns if the communication channel type
@@ -0,0 +1,82 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#|             ANSSI,   https://www.ssi.gouv.fr                              |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Simulator.Channels.Framers.AbstractFramer import AbstractFramer
+
+
+@NetzobLogger
+class DelimiterFramer(AbstractFramer):
+    """Delimits messages ending with a delimiter, which belongs to the
+    frame.
+
+    >>> from netzob.all import *
+    >>> framer = DelimiterFramer(b"\\r\\n")
+    >>> print(framer.getFrameLength(b"USER netzob\\r\\nPASS"))
+    13
+    >>> print(framer.getFrameLength(b"PASS netzob\\r"))
+    None
+    """
+
+    @typeCheck(bytes)
+    def __init__(self, delimiter):
+        """Constructor for a DelimiterFramer
+
+        :parameter delimiter: the bytes ending each message
+        :type delimiter: :class:`bytes`
+        """
+        if delimiter is None or len(delimiter) == 0:
+            raise ValueError("Delimiter cannot be empty")
+        self.delimiter = delimiter
+
+    @typeCheck(bytes)
+    def getFrameLength(self, data):
+        """Returns the size of the data up to the first delimiter
+        (included), or None if no delimiter was received."""
+
+        position = data.find(self.delimiter)
+        if position < 0:
+            return None
+        return position + len(self.delimiter)
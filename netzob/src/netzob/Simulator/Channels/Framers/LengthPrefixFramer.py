@@ -0,0 +1,117 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#|             ANSSI,   https://www.ssi.gouv.fr                              |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Types.AbstractType import AbstractType
+from netzob.Simulator.Channels.Framers.AbstractFramer import AbstractFramer
+
+
+@NetzobLogger
+class LengthPrefixFramer(AbstractFramer):
+    """Delimits messages starting with a header that contains their
+    length. The length is an unsigned integer of `size` bytes located
+    at `offset`. It counts the bytes that follow it, plus `adjustment`
+    (e.g. a negative adjustment when the length includes the header).
+
+    >>> from netzob.all import *
+    >>> framer = LengthPrefixFramer(size=2)
+    >>> print(framer.getFrameLength(b"\\x00\\x05hello\\x00\\x05wor"))
+    7
+    >>> print(framer.getFrameLength(b"\\x00\\x05hel"))
+    None
+    >>> print(framer.getFrameLength(b"\\x00"))
+    None
+
+    The length may be preceded by other fields, be little endian and
+    include the size of the whole message
+
+    >>> framer = LengthPrefixFramer(offset=1, size=2, endianness=AbstractType.ENDIAN_LITTLE, adjustment=-3)
+    >>> print(framer.getFrameLength(b"\\x01\\x08\\x00hello\\x02"))
+    8
+    """
+
+    def __init__(self,
+                 offset=0,
+                 size=2,
+                 endianness=AbstractType.ENDIAN_BIG,
+                 adjustment=0):
+        """Constructor for a LengthPrefixFramer
+
+        :keyword offset: the position (in bytes) of the length in the message
+        :type offset: :class:`int`
+        :keyword size: the size (in bytes) of the length
+        :type size: :class:`int`
+        :keyword endianness: the endianness of the length (AbstractType.ENDIAN_BIG or AbstractType.ENDIAN_LITTLE)
+        :type endianness: :class:`str`
+        :keyword adjustment: the number of bytes to add to the length to obtain the size of what follows it
+        :type adjustment: :class:`int`
+        """
+        if offset < 0:
+            raise ValueError("Offset cannot be negative")
+        if size <= 0:
+            raise ValueError("Size must be strictly positive")
+        if endianness not in AbstractType.supportedEndianness():
+            raise ValueError("Unsupported endianness: {0}".format(endianness))
+
+        self.offset = offset
+        self.size = size
+        self.endianness = endianness
+        self.adjustment = adjustment
+
+    @typeCheck(bytes)
+    def getFrameLength(self, data):
+        """Returns the size of the frame at the beginning of the data, or
+        None if its header or its payload is not yet complete."""
+
+        headerLength = self.offset + self.size
+        if len(data) < headerLength:
+            return None
+
+        length = int.from_bytes(data[self.offset:headerLength],
+                                byteorder=self.endianness)
+        frameLength = max(headerLength, headerLength + length + self.adjustment)
+        if len(data) < frameLength:
+            return None
+        return frameLength
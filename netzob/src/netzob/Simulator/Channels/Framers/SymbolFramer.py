@@ -0,0 +1,111 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#|             ANSSI,   https://www.ssi.gouv.fr                              |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser, InvalidParsingPathException
+from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Model.Vocabulary.Types.BitArray import BitArray
+from netzob.Model.Vocabulary.Types.Raw import Raw
+from netzob.Simulator.Channels.Framers.AbstractFramer import AbstractFramer
+
+
+@NetzobLogger
+class SymbolFramer(AbstractFramer):
+    """Delimits messages that can be abstracted by one of the specified
+    symbols: a frame is complete as soon as the beginning of the data
+    parses with a symbol, the symbols being tried in order as in the
+    :class:`FlowParser`.
+
+    This framer is meant for symbols whose size is defined by their
+    content (fixed sizes, size fields or constant delimiters), as a
+    symbol ending with a variable size field also parses an incomplete
+    message.
+
+    >>> from netzob.all import *
+    >>> f0 = Field(Raw(nbBytes=1))
+    >>> f1 = Field(Raw(nbBytes=(0, 10)))
+    >>> f0.domain = Size(f1)
+    >>> framer = SymbolFramer([Symbol([f0, f1])])
+    >>> print(framer.getFrameLength(b"\\x05hello\\x03wo"))
+    6
+    >>> print(framer.getFrameLength(b"\\x05hel"))
+    None
+    """
+
+    @typeCheck(list)
+    def __init__(self, symbols):
+        """Constructor for a SymbolFramer
+
+        :parameter symbols: the symbols that may abstract a message
+        :type symbols: a :class:`list` of :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        """
+        if symbols is None or len(symbols) == 0:
+            raise ValueError("Symbols cannot be None and must be a list of at least one symbol")
+        self.symbols = symbols
+
+    @typeCheck(bytes)
+    def getFrameLength(self, data):
+        """Returns the size of the first byte-aligned message abstracted
+        by a symbol at the beginning of the data, or None if none
+        matches."""
+
+        if len(data) == 0:
+            return None
+
+        data_bitarray = TypeConverter.convert(data, Raw, BitArray)
+        for symbol in self.symbols:
+            try:
+                mp = MessageParser()
+                for result in mp.parseBitarray(
+                        data_bitarray.copy(),
+                        symbol.getLeafFields(),
+                        must_consume_everything=False):
+                    resultLength = sum([len(value) for value in result])
+                    if resultLength > 0 and resultLength % 8 == 0:
+                        return resultLength // 8
+            except InvalidParsingPathException:
+                pass
+
+        return None
@@ -65,13 +65,15 @@ class SSLClient(AbstractChannel):
                  localPort=None,
                  timeout=2,
                  server_cert_file=None,
-                 alpn_protocols=None):
+                 alpn_protocols=None,
+                 framer=None):
         super(SSLClient, self).__init__(isServer=False)
         self.remoteIP = remoteIP
         self.remotePort = remotePort
         self.localIP = localIP
         self.localPort = localPort
         self.timeout = timeout
+        self.framer = framer
         self.type = AbstractChannel.TYPE_SSLCLIENT
         self.__socket = None
         self.__ssl_socket = None
@@ -115,6 +117,7 @@ class SSLClient(AbstractChannel):
         self._logger.debug("Connect to the SSL server to {0}:{1}".format(
             self.remoteIP, self.remotePort))
         self.__ssl_socket.connect((self.remoteIP, self.remotePort))
+        self._resetReadBuffer()
         self.isOpen = True
 
     def close(self):
@@ -123,17 +126,23 @@ class SSLClient(AbstractChannel):
             self.__ssl_socket.close()
         if self.__socket is not None:
             self.__socket.close()
+        self._resetReadBuffer()
         self.isOpen = False
 
     def read(self, timeout=None):
         """Read the next message on the communication channel.
 
+        If a framer is set, the read returns as soon as a complete
+        frame is received.
+
         @keyword timeout: the maximum time in millisecond to wait before a message can be reached
         @type timeout: :class:`int`
         """
         reading_seg_size = 1024
 
-        if self.__ssl_socket is not None:
+        if self.__ssl_socket is not None and self.framer is not None:
+            return self._readFrame(self.__ssl_socket, timeout)
+        elif self.__ssl_socket is not None:
             data = b""
             finish = False
             while not finish:
@@ -84,6 +84,49 @@ class TCPClient(AbstractChannel):
     >>> client.stop()
     >>> server.stop()
 
+    With a framer, a read returns as soon as a complete message is
+    received, instead of waiting for the timeout of the channel
+
+    >>> import socket
+    >>> peer = socket.socket()
+    >>> peer.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    >>> peer.bind(("127.0.0.1", 8887))
+    >>> peer.listen(1)
+    >>> client = TCPClient(remoteIP="127.0.0.1", remotePort=8887, timeout=5, framer=DelimiterFramer(b"\\n"))
+    >>> client.open()
+    >>> connection, _ = peer.accept()
+    >>> connection.sendall(b"hello\\nworld\\npartial")
+    >>> start = time.time()
+    >>> print(client.read())
+    b'hello\\n'
+    >>> print(client.read())
+    b'world\\n'
+    >>> time.time() - start < 1
+    True
+    >>> connection.close()
+    >>> print(client.read())
+    b'partial'
+    >>> client.close()
+
+    The bytes still buffered when the channel is closed are dropped, they
+    are not returned by the reads of the next connection
+
+    >>> client.open()
+    >>> connection, _ = peer.accept()
+    >>> connection.sendall(b"first\\nleftover")
+    >>> print(client.read())
+    b'first\\n'
+    >>> client.close()
+    >>> connection.close()
+    >>> client.open()
+    >>> connection, _ = peer.accept()
+    >>> connection.sendall(b"second\\n")
+    >>> print(client.read())
+    b'second\\n'
+    >>> client.close()
+    >>> connection.close()
+    >>> peer.close()
+
     """
 
     def __init__(self,
@@ -91,13 +134,15 @@ class TCPClient(AbstractChannel):
                  remotePort,
                  localIP=None,
                  localPort=None,
-                 timeout=5):
+                 timeout=5,
+                 framer=None):
         super(TCPClient, self).__init__(isServer=False)
         self.remoteIP = remoteIP
         self.remotePort = remotePort
         self.localIP = localIP
         self.localPort = localPort
         self.timeout = timeout
+        self.framer = framer
         self.type = AbstractChannel.TYPE_TCPCLIENT
         self.__socket = None
 
@@ -119,12 +164,14 @@ class TCPClient(AbstractChannel):
         self._logger.debug("Connect to the TCP server to {0}:{1}".format(
             self.remoteIP, self.remotePort))
         self.__socket.connect((self.remoteIP, self.remotePort))
+        self._resetReadBuffer()
         self.isOpen = True
 
     def close(self):
         """Close the communication channel."""
         if self.__socket is not None:
             self.__socket.close()
+        self._resetReadBuffer()
         self.isOpen = False
 
     def read(self, timeout=None):
@@ -132,12 +179,17 @@ class TCPClient(AbstractChannel):
         Continues to read while it receives something.
 
 
+        If a framer is set, the read returns as soon as a complete
+        frame is received.
+
         @keyword timeout: the maximum time in millisecond to wait before a message can be reached
         @type timeout: :class:`int`
         """
         reading_seg_size = 1024
 
-        if self.__socket is not None:
+        if self.__socket is not None and self.framer is not None:
+            return self._readFrame(self.__socket, timeout)
+        elif self.__socket is not None:
             data = b""
             finish = False
             while not finish:
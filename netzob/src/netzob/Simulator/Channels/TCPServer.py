@@ -87,11 +87,12 @@ class TCPServer(AbstractChannel):
 
     """
 
-    def __init__(self, localIP, localPort, timeout=5):
+    def __init__(self, localIP, localPort, timeout=5, framer=None):
         super(TCPServer, self).__init__(isServer=True)
         self.localIP = localIP
         self.localPort = localPort
         self.timeout = timeout
+        self.framer = framer
         self.type = AbstractChannel.TYPE_TCPSERVER
         self.__socket = None
         self.__clientSocket = None
@@ -114,6 +115,7 @@ class TCPServer(AbstractChannel):
         self._logger.debug("Ready to accept new TCP connections...")
         self.__clientSocket, addr = self.__socket.accept()
         self._logger.debug("New TCP connection received.")
+        self._resetReadBuffer()
         self.isOpen = True
 
     def close(self):
@@ -122,18 +124,24 @@ class TCPServer(AbstractChannel):
             self.__clientSocket.close()
         if self.__socket is not None:
             self.__socket.close()
+        self._resetReadBuffer()
         self.isOpen = False
         self._logger.info("TCPServer has closed its socket")
 
     def read(self, timeout=None):
         """Read the next message on the communication channel.
 
+        If a framer is set, the read returns as soon as a complete
+        frame is received.
+
         @keyword timeout: the maximum time in millisecond to wait before a message can be reached
         @type timeout: :class:`int`
         """
         reading_seg_size = 1024
 
-        if self.__clientSocket is not None:
+        if self.__clientSocket is not None and self.framer is not None:
+            return self._readFrame(self.__clientSocket, timeout)
+        elif self.__clientSocket is not None:
             data = b""
             finish = False
             while not finish:
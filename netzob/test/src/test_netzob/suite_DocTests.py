@@ -38,6 +38,7 @@ import doctest
 from netzob.all import *
 from netzob.Common.Utils.DataAlignment import ParallelDataAlignment
 from netzob.Common.Utils.DataAlignment import DataAlignment
+from netzob.Common.Utils.DataAlignment import AlignmentCache
 from netzob.Model.Vocabulary import AbstractField
 from netzob.Model.Vocabulary.Domain.Variables import AbstractVariable
 from netzob.Model.Vocabulary.Messages import AbstractMessage
@@ -52,9 +53,11 @@ from netzob.Inference.Vocabulary.FormatOperations import ClusterBySize
 from netzob.Inference.Vocabulary.FormatOperations import FindKeyFields
 from netzob.Common.Utils import SortedTypedList
 from netzob.Common.Utils import MessageCells
+from netzob.Common.C_Extensions import WrapperArgsFactory
 
 from netzob.Inference.Vocabulary.Search import SearchTask
 from netzob.Inference.Vocabulary.Search import SearchResult
+from netzob.Inference.Vocabulary.Search import SearchAutomaton
 from netzob.Inference.Vocabulary.FormatOperations.FieldSplitAligned import FieldSplitAligned
 from netzob.Inference.Vocabulary.FormatOperations import FieldSplitDelimiter
 
@@ -65,10 +68,14 @@ from netzob.Model.Vocabulary.Domain.Specializer.VariableSpecializer import Varia
 from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
 
 from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPlan import ParsingPlan
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
 from netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
 from netzob.Model.Vocabulary.Domain.Parser.FlowParser import FlowParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolIndex import SymbolIndex
 
 from netzob.Simulator.AbstractionLayer import AbstractionLayer
+from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
 
 from netzob.Inference.Vocabulary import EntropyMeasurement
 # from netzob.Inference.Grammar.Angluin import Angluin
@@ -77,6 +84,9 @@ from netzob.Inference.Grammar.AutomataFactories.PTAAutomataFactory import PTAAut
 
 from netzob.Inference.Grammar.ProcessWrappers import ProcessWrapper
 from netzob.Inference.Grammar.ProcessWrappers import NetworkProcessWrapper
+from netzob.Inference.Grammar.PooledMAT import PooledMAT
+from netzob.Inference.Grammar.QueryPlanner import QueryPlanner
+from netzob.Inference.Grammar.BatchRandomWalkMethod import BatchRandomWalkMethod
 
 def getSuite():
     # List of modules to include in the list of tests
@@ -98,6 +108,7 @@ def getSuite():
         Field.__module__,
         DataAlignment, 
         ParallelDataAlignment,        
+        AlignmentCache,
         AbstractField,
         Symbol.__module__,
         EmptySymbol.__module__,
@@ -129,6 +140,7 @@ def getSuite():
         Session.__module__,
         SortedTypedList,
         MessageCells,
+        WrapperArgsFactory,
         ApplicativeData.__module__,
         DomainEncodingFunction.__module__,
         TypeEncodingFunction.__module__,
@@ -137,6 +149,7 @@ def getSuite():
         SearchEngine.__module__,
         SearchTask,
         SearchResult,
+        SearchAutomaton,
         ClusterByApplicativeData,
         ClusterByAlignment,
         ClusterBySize,
@@ -154,9 +167,12 @@ def getSuite():
         SVAS.__module__,
 
         MessageParser.__module__,
+        ParsingPlan.__module__,
+        ParsingPath.__module__,
         MessageSpecializer.__module__,
 
         FlowParser.__module__,
+        SymbolIndex.__module__,
         AbstractionLayer.__module__,
         EntropyMeasurement,
 
@@ -169,6 +185,9 @@ def getSuite():
         Automata.__module__,
         ProcessWrapper,
         NetworkProcessWrapper,
+        PooledMAT.__module__,
+        QueryPlanner.__module__,
+        BatchRandomWalkMethod.__module__,
         
         # Modules related to the protocol simulation
         # ------------------------------------------
@@ -178,11 +197,16 @@ def getSuite():
         UDPServer.__module__,
         UDPClient.__module__,
         SSLClient.__module__,
+        AbstractFramer.__module__,
+        LengthPrefixFramer.__module__,
+        DelimiterFramer.__module__,
+        SymbolFramer.__module__,
         # RawIPClient.__module__,  ## Does not work on Travis CI as raw socket are not supported
 
         # Modules related to the import
         # -----------------------------
         PCAPImporter.__module__,
+        PCAPReader.__module__,
         FileImporter.__module__
 
         # Other